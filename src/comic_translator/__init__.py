@@ -1,7 +1,30 @@
 # src/comic_translator/__init__.py
-from .downloader import ComicDownloader
-from .text_extraction import TextExtractor
-from .translator import Translator
-from .image_generator import ImageGenerator
+from importlib import import_module
 
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+# Public classes are imported on first access, so importing the package (or
+# the CLI) does not load selenium, doctr/torch or OpenCV
+_LAZY = {
+  "ComicDownloader": ".downloader",
+  "TextExtractor": ".text_extraction",
+  "Translator": ".translator",
+  "ImageGenerator": ".image_generator",
+  "ComicTranslator": ".main",
+  "Word": ".records",
+  "TextGroup": ".records",
+  "TranslatedGroup": ".records",
+}
+
+__all__ = list(_LAZY)
+
+def __getattr__(name):
+  module = _LAZY.get(name)
+  if module is None:
+      raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(import_module(module, __name__), name)
+  globals()[name] = value
+  return value
+
+def __dir__():
+  return sorted(list(globals()) + __all__)
@@ -0,0 +1,397 @@
+# src/comic_translator/benchmark.py
+"""
+Offline benchmark of the page pipeline.
+
+Synthetic comic pages with known speech bubbles are served from a local
+reader stand-in, then every stage (download, OCR, grouping, translation,
+rendering) is timed page by page. Results are written as JSON so runs can
+be compared across commits:
+
+  python -m comic_translator.benchmark --pages 8 --strips 2 --output bench.json
+
+`--compare-ocr` instead times OCR configurations (inference backend and
+architecture preset) on the same pages and scores their word accuracy:
+
+  python -m comic_translator.benchmark --compare-ocr torch onnx-int8 onnx:fast
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+import argparse
+import json
+import logging
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+from PIL import Image, ImageDraw
+from .layout import DEFAULT_FONT, load_font
+from .metrics import peak_rss_bytes
+from .ocr_backends import ARCH_PRESETS
+from .page_text import save_page_text
+from .records import as_word
+from .tiling import _iou
+from .utils import save_json
+
+STAGES = ("download", "ocr", "grouping", "translation", "rendering")
+
+# Width, height and number of bubbles of each generated page kind
+PAGE_SIZES = {
+  "small": (600, 900, 4),
+  "page": (800, 1200, 6),
+  "strip": (800, 6000, 18),
+}
+
+WORDS = (
+  "hey what are you doing here I never thought the gacha would give me something "
+  "like this wait run now we have to go back they are coming look out behind you"
+).split()
+
+def synthetic_page(width, height, bubbles, seed=0, font_path=DEFAULT_FONT):
+  """
+  Draw a page with `bubbles` speech bubbles of random text.
+
+  Returns the image and the ground-truth words, in the word format the
+  extractor produces (normalized bbox, line_idx, confidence).
+  """
+  rng = random.Random(seed)
+  image = Image.new("RGB", (width, height), (236, 232, 222))
+  draw = ImageDraw.Draw(image)
+  words = []
+  slot = height / bubbles
+
+  for n in range(bubbles):
+      size = rng.choice((14, 18, 24))
+      font = load_font(font_path, size)
+      lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 3))]
+      line_height = size + 6
+      text_width = max(draw.textlength(line, font=font) for line in lines)
+      box_w, box_h = text_width + 2 * size, line_height * len(lines) + 2 * size
+      left = rng.uniform(10, max(10, width - box_w - 10))
+      top = n * slot + rng.uniform(0, max(0, slot - box_h))
+      draw.ellipse([left - size, top - size / 2, left + box_w + size, top + box_h + size / 2],
+                   fill="white", outline="black", width=2)
+
+      for line_idx, line in enumerate(lines):
+          x, y = left + size, top + size + line_idx * line_height
+          for word in line.split():
+              x0, y0, x1, y1 = draw.textbbox((x, y), word, font=font)
+              draw.text((x, y), word, font=font, fill="black")
+              bbox = [[x0 / width, y0 / height], [x1 / width, y1 / height]]
+              words.append({
+                  "text": word,
+                  "bbox": bbox,
+                  "line_idx": f"{n}_{line_idx}",
+                  "original_bbox": bbox,
+                  "confidence": 1.0
+              })
+              x = x1 + draw.textlength(" ", font=font)
+  return image, words
+
+def percentiles(values):
+  """Latency summary of a list of durations, in milliseconds"""
+  if not values:
+      return None
+  ms = np.asarray(values) * 1000
+  return {
+      "mean": float(ms.mean()),
+      "p50": float(np.percentile(ms, 50)),
+      "p90": float(np.percentile(ms, 90)),
+      "p99": float(np.percentile(ms, 99)),
+      "max": float(ms.max())
+  }
+
+def peak_rss_mb():
+  """Peak resident set size of this process so far in MiB, or None where it is not available"""
+  peak = peak_rss_bytes()
+  return peak / (1024 * 1024) if peak is not None else None
+
+def git_commit():
+  try:
+      return subprocess.run(
+          ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+      ).stdout.strip()
+  except Exception:
+      return None
+
+def _normalize_word(text):
+  return re.sub(r"[^\w]", "", text.lower())
+
+def word_accuracy(found, truth, min_iou=0.5):
+  """Share of ground-truth words read with the right text at the right place"""
+  if not truth:
+      return 1.0
+  if not found:
+      return 0.0
+  truth = [as_word(w) for w in truth]
+  found = [as_word(w) for w in found]
+  overlap = _iou(np.array([w.box for w in truth]), np.array([w.box for w in found]))
+
+  matched, used = 0, set()
+  for i, word in enumerate(truth):
+      for j in np.argsort(-overlap[i]):
+          if overlap[i, j] < min_iou:
+              break
+          if j not in used and _normalize_word(found[j].text) == _normalize_word(word.text):
+              used.add(j)
+              matched += 1
+              break
+  return matched / len(truth)
+
+def parse_ocr_config(spec):
+  """Turn "backend[:preset]" (e.g. "onnx:fast") into TextExtractor options"""
+  inference, _, preset = spec.partition(":")
+  det_arch, reco_arch = ARCH_PRESETS[preset or "default"]
+  return {"inference": inference, "det_arch": det_arch, "reco_arch": reco_arch}
+
+def _no_ocr(pages):
+  raise RuntimeError("OCR is disabled when benchmarking with ground-truth words")
+
+class StageTimer:
+  """Collect per-page durations of one stage; `time` may be called from several threads"""
+  def __init__(self, name):
+      self.name = name
+      self.durations = []
+      self.failures = 0
+      self.started = None
+      self.wall = 0.0
+      self._lock = threading.Lock()
+
+  def __enter__(self):
+      self.started = time.perf_counter()
+      return self
+
+  def __exit__(self, *exc):
+      self.wall = time.perf_counter() - self.started
+
+  def time(self, fn, *args):
+      start = time.perf_counter()
+      try:
+          result = fn(*args)
+      except Exception as e:
+          logging.getLogger(__name__).error(f"{self.name} failed: {str(e)}")
+          result = None
+      duration = time.perf_counter() - start
+      with self._lock:
+          self.durations.append(duration)
+          if not result and result != []:
+              self.failures += 1
+      return result
+
+  def report(self):
+      pages = len(self.durations)
+      return {
+          "pages": pages,
+          "failures": self.failures,
+          "wall_s": self.wall,
+          "throughput_pages_s": pages / self.wall if self.wall else None,
+          "latency_ms": percentiles(self.durations)
+      }
+
+def run_benchmark(pages=6, strips=2, small=2, ocr="truth", latency=0.0, seed=0, workdir="data/benchmark",
+                  text_format="json"):
+  """
+  Generate, serve and process synthetic pages, returning the results dict.
+
+  With `ocr="doctr"` the real predictor runs; with `ocr="truth"` the OCR
+  stage is skipped and the known words of each page are grouped instead,
+  so the rest of the pipeline can be measured without model weights.
+  """
+  from .downloader import ComicDownloader
+  from .drivers import DriverPool
+  from .image_generator import ImageGenerator
+  from .standin import StandinSite
+  from .text_extraction import TextExtractor
+  from .translation_backends import LocalBackend
+  from .translator import Translator
+
+  workdir = Path(workdir)
+  kinds = ["small"] * small + ["page"] * pages + ["strip"] * strips
+  timers = {stage: StageTimer(stage) for stage in STAGES}
+  stats = {"bubbles": 0, "words": 0, "groups": 0, "pixels": 0}
+
+  # Generate pages up front so drawing is not part of any stage
+  generated = []
+  for n, kind in enumerate(kinds, start=1):
+      width, height, bubbles = PAGE_SIZES[kind]
+      image, words = synthetic_page(width, height, bubbles, seed=seed + n)
+      buffer = BytesIO()
+      image.save(buffer, format="PNG")
+      generated.append((f"bench{n}", kind, buffer.getvalue(), words))
+      stats["bubbles"] += bubbles
+      stats["pixels"] += width * height
+
+  extractor = TextExtractor(use_cache=False, predictor=_no_ocr if ocr == "truth" else None, text_format=text_format)
+  extractor.output_dir = workdir / "extracted_text"
+  extractor.output_dir.mkdir(parents=True, exist_ok=True)
+  translator = Translator(use_memory=False, backend=LocalBackend(latency=latency), text_format=text_format)
+  translator.output_dir = workdir / "translated_text"
+  translator.output_dir.mkdir(parents=True, exist_ok=True)
+  generator = ImageGenerator()
+  generator.output_dir = workdir / "output"
+  generator.output_dir.mkdir(parents=True, exist_ok=True)
+
+  with StandinSite() as site:
+      urls = [site.add_reader_page(body, page=n, mode="static") for n, (_, _, body, _) in enumerate(generated, 1)]
+      downloader = ComicDownloader(pool=DriverPool(size=1), use_cache=False)
+      downloader.download_dir = workdir / "downloads"
+      downloader.download_dir.mkdir(parents=True, exist_ok=True)
+
+      with timers["download"] as timer:
+          image_paths = [timer.time(downloader.download_comic_page, url, name)
+                         for url, (name, _, _, _) in zip(urls, generated)]
+
+  with timers["ocr"] as timer:
+      if ocr == "truth":
+          page_words = [words for _, _, _, words in generated]
+      else:
+          page_words = [timer.time(extractor.extract_words, path) if path else None for path in image_paths]
+
+  def group(path, words):
+      with Image.open(path) as image:
+          grouped = extractor.group_words(words, image.size)
+      save_page_text(grouped, extractor.output_path(path))
+      return grouped
+
+  # Text records are handed between stages in memory, as in the pipeline
+  page_groups = [None] * len(image_paths)
+  with timers["grouping"] as timer:
+      for n, (path, words) in enumerate(zip(image_paths, page_words)):
+          if path and words is not None:
+              page_groups[n] = timer.time(group, path, words)
+              stats["words"] += len(words)
+              stats["groups"] += len(page_groups[n] or [])
+
+  page_translations = [None] * len(image_paths)
+  with timers["translation"] as timer:
+      for n, (path, grouped) in enumerate(zip(image_paths, page_groups)):
+          if grouped:
+              output_path = translator.output_path(extractor.output_path(path))
+              page_translations[n] = timer.time(translator.translate_groups, grouped, "pt", output_path)
+
+  with timers["rendering"] as timer:
+      for path, translated in zip(image_paths, page_translations):
+          if path and translated:
+              timer.time(generator.render, path, translated)
+
+  results = {stage: timer.report() for stage, timer in timers.items()}
+  if ocr == "truth":
+      results["ocr"].update({"skipped": True, "latency_ms": None, "throughput_pages_s": None})
+
+  return {
+      "commit": git_commit(),
+      "timestamp": time.time(),
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "config": {"pages": pages, "strips": strips, "small": small, "ocr": ocr,
+                 "translation_latency": latency, "seed": seed, "text_format": text_format},
+      "corpus": {"pages": len(kinds), **stats},
+      "stages": results,
+      # The process-wide high-water mark; stages run one after another, so it is not split per stage
+      "process_peak_rss_mb": peak_rss_mb()
+  }
+
+def compare_ocr(configs=("torch",), pages=4, strips=0, small=2, threads=None, seed=0, workdir="data/benchmark",
+                processes=None):
+  """
+  Run every OCR configuration over the same synthetic pages.
+
+  Reports load time, pages/sec, latency and word accuracy per configuration,
+  plus the speedup over the first one. Configurations that cannot be built
+  (missing runtime or weights) are reported with their error. With
+  `processes`, pages are spread over that many OCR worker processes using
+  `threads` threads each.
+  """
+  from .text_extraction import TextExtractor
+
+  workdir = Path(workdir) / "ocr"
+  workdir.mkdir(parents=True, exist_ok=True)
+  kinds = ["small"] * small + ["page"] * pages + ["strip"] * strips
+  corpus = []
+  for n, kind in enumerate(kinds, start=1):
+      image, words = synthetic_page(*PAGE_SIZES[kind], seed=seed + n)
+      path = workdir / f"ocr{n}.png"
+      image.save(path)
+      corpus.append((path, words))
+
+  results = {}
+  for spec in configs:
+      options = parse_ocr_config(spec)
+      try:
+          start = time.perf_counter()
+          extractor = TextExtractor(use_cache=False, intra_op_threads=threads, processes=processes, **options)
+          if extractor.pool is not None:
+              extractor.pool.start()
+          load_s = time.perf_counter() - start
+      except Exception as e:
+          results[spec] = {**options, "error": str(e)}
+          continue
+
+      with StageTimer(spec) as timer, ThreadPoolExecutor(max_workers=extractor.concurrency) as executor:
+          found = list(executor.map(partial(timer.time, extractor.extract_words), [path for path, _ in corpus]))
+      accuracies = [word_accuracy(words or [], truth) for words, (_, truth) in zip(found, corpus)]
+      results[spec] = {**options, **timer.report(), "load_s": load_s, "word_accuracy": float(np.mean(accuracies))}
+      extractor.close()
+
+  reference = results.get(configs[0], {}).get("throughput_pages_s")
+  for report in results.values():
+      if reference and report.get("throughput_pages_s"):
+          report["speedup"] = report["throughput_pages_s"] / reference
+
+  return {
+      "commit": git_commit(),
+      "timestamp": time.time(),
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "config": {"pages": pages, "strips": strips, "small": small, "threads": threads, "processes": processes,
+                 "seed": seed},
+      "ocr": results
+  }
+
+def build_parser():
+  parser = argparse.ArgumentParser(prog="comic-translator-benchmark", description=__doc__.strip().splitlines()[0])
+  parser.add_argument("--pages", type=int, default=6, help="regular pages (800x1200)")
+  parser.add_argument("--strips", type=int, default=2, help="tall webtoon strips (800x6000)")
+  parser.add_argument("--small", type=int, default=2, help="small pages (600x900)")
+  parser.add_argument("--ocr", choices=["truth", "doctr"], default="truth",
+                      help="'doctr' runs the real predictor, 'truth' uses the known words")
+  parser.add_argument("--latency", type=float, default=0.0,
+                      help="simulated round trip of each translation request, in seconds")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--text-format", choices=["json", "npz"], default="json",
+                      help="format of the intermediate text files")
+  parser.add_argument("--workdir", default="data/benchmark")
+  parser.add_argument("--compare-ocr", nargs="+", metavar="BACKEND[:PRESET]",
+                      help="compare OCR configurations instead, e.g. torch onnx-int8 onnx:fast "
+                           f"(presets: {', '.join(ARCH_PRESETS)})")
+  parser.add_argument("--threads", type=int, help="OCR intra-op threads (per process) for --compare-ocr")
+  parser.add_argument("--processes", type=int, help="OCR worker processes for --compare-ocr")
+  parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+  return parser
+
+def main(argv=None):
+  args = build_parser().parse_args(argv)
+  if args.compare_ocr:
+      results = compare_ocr(
+          args.compare_ocr, pages=args.pages, strips=args.strips, small=args.small,
+          threads=args.threads, seed=args.seed, workdir=args.workdir, processes=args.processes
+      )
+  else:
+      results = run_benchmark(
+          pages=args.pages, strips=args.strips, small=args.small, ocr=args.ocr,
+          latency=args.latency, seed=args.seed, workdir=args.workdir, text_format=args.text_format
+      )
+  if args.output:
+      Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+      save_json(results, args.output)
+  else:
+      print(json.dumps(results, indent=2))
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
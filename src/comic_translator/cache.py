@@ -0,0 +1,228 @@
+# src/comic_translator/cache.py
+from pathlib import Path
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+def file_digest(path, chunk_size=1024 * 1024):
+  """Return the SHA-256 hex digest of a file, read in chunks"""
+  digest = hashlib.sha256()
+  with open(path, "rb") as f:
+      for chunk in iter(lambda: f.read(chunk_size), b""):
+          digest.update(chunk)
+  return digest.hexdigest()
+
+class DownloadCache:
+  """
+  Content-addressed cache for downloaded images.
+
+  Entries are keyed by image URL and point to a blob named after the SHA-256
+  of its bytes, so identical images are stored once. Cached entries are
+  revalidated with If-None-Match / If-Modified-Since, and the least recently
+  used entries are evicted once the blobs exceed `max_bytes`.
+  """
+  def __init__(self, root="data/cache/downloads", max_bytes=2 * 1024 ** 3, fresh_for=0):
+      self.logger = logging.getLogger(__name__)
+      self.root = Path(root)
+      self.objects_dir = self.root / "objects"
+      self.objects_dir.mkdir(parents=True, exist_ok=True)
+      self.max_bytes = max_bytes
+      self.fresh_for = fresh_for
+      self.hits = 0
+      self.misses = 0
+
+      self._lock = threading.Lock()
+      self._db = sqlite3.connect(self.root / "index.sqlite3", check_same_thread=False)
+      self._db.execute("PRAGMA journal_mode=WAL")
+      self._db.execute(
+          "CREATE TABLE IF NOT EXISTS entries ("
+          " url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL,"
+          " etag TEXT, last_modified TEXT, validated REAL NOT NULL, last_used REAL NOT NULL)"
+      )
+      self._db.commit()
+
+  def blob_path(self, digest):
+      return self.objects_dir / digest[:2] / digest
+
+  def lookup(self, url):
+      """Return the cache entry for `url` as a dict, or None"""
+      with self._lock:
+          row = self._db.execute(
+              "SELECT digest, size, etag, last_modified, validated FROM entries WHERE url = ?", (url,)
+          ).fetchone()
+      if row is None:
+          return None
+      entry = dict(zip(("digest", "size", "etag", "last_modified", "validated"), row))
+      if not self.blob_path(entry["digest"]).exists():
+          self.forget(url)
+          return None
+      return entry
+
+  def forget(self, url):
+      with self._lock:
+          self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+          self._db.commit()
+
+  def _touch(self, url, validated=False):
+      now = time.time()
+      with self._lock:
+          if validated:
+              self._db.execute(
+                  "UPDATE entries SET last_used = ?, validated = ? WHERE url = ?", (now, now, url)
+              )
+          else:
+              self._db.execute("UPDATE entries SET last_used = ? WHERE url = ?", (now, url))
+          self._db.commit()
+
+  def store(self, url, file_path, etag=None, last_modified=None):
+      """Move a downloaded file into the cache and record it for `url`"""
+      digest = file_digest(file_path)
+      blob = self.blob_path(digest)
+      blob.parent.mkdir(parents=True, exist_ok=True)
+      size = os.path.getsize(file_path)
+
+      # Placing the blob and recording it is one step, so evict() cannot
+      # delete a blob between the existence check and the new entry
+      now = time.time()
+      with self._lock:
+          if blob.exists():
+              os.unlink(file_path)
+          else:
+              os.replace(file_path, blob)
+          self._db.execute(
+              "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+              (url, digest, size, etag, last_modified, now, now)
+          )
+          self._db.commit()
+      self.evict(keep=url)
+      return digest
+
+  def _total_bytes(self):
+      return self._db.execute(
+          "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY digest)"
+      ).fetchone()[0]
+
+  def total_bytes(self):
+      with self._lock:
+          return self._total_bytes()
+
+  def evict(self, keep=None):
+      """Drop least recently used entries until the blobs fit in max_bytes"""
+      while True:
+          # The size is checked in the same step as the eviction, so concurrent
+          # callers never evict more than needed
+          with self._lock:
+              if self._total_bytes() <= self.max_bytes:
+                  return
+              row = self._db.execute(
+                  "SELECT url, digest FROM entries WHERE url IS NOT ? ORDER BY last_used LIMIT 1", (keep,)
+              ).fetchone()
+              if row is None:
+                  return
+              url, digest = row
+              self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+              shared = self._db.execute(
+                  "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+              ).fetchone()
+              self._db.commit()
+              if not shared:
+                  try:
+                      os.unlink(self.blob_path(digest))
+                  except FileNotFoundError:
+                      pass
+          self.logger.debug(f"Evicted {url} from download cache")
+
+  def materialize(self, digest, output_path):
+      """Copy a cached blob to `output_path` atomically"""
+      output_path = Path(output_path)
+      output_path.parent.mkdir(parents=True, exist_ok=True)
+      fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+      os.close(fd)
+      try:
+          shutil.copyfile(self.blob_path(digest), tmp_path)
+          os.replace(tmp_path, output_path)
+      except BaseException:
+          os.unlink(tmp_path)
+          raise
+      return str(output_path)
+
+  def _is_fresh(self, entry):
+      return entry is not None and time.time() - entry["validated"] < self.fresh_for
+
+  def _hit(self, url, entry, output_path, validated=False):
+      with self._lock:
+          self.hits += 1
+      self._touch(url, validated=validated)
+      return self.materialize(entry["digest"], output_path)
+
+  def _conditional_headers(self, entry):
+      headers = {}
+      if entry and entry["etag"]:
+          headers["If-None-Match"] = entry["etag"]
+      if entry and entry["last_modified"]:
+          headers["If-Modified-Since"] = entry["last_modified"]
+      return headers or None
+
+  def _incoming_path(self):
+      return self.root / "incoming" / uuid.uuid4().hex
+
+  def _complete(self, url, entry, incoming, output_path, status, headers):
+      """Record the answer to a (conditional) download and place the image"""
+      if status == 304 and entry:
+          return self._hit(url, entry, output_path, validated=True)
+      if status != 200:
+          raise ValueError(f"Unexpected status {status} for {url}")
+
+      with self._lock:
+          self.misses += 1
+      digest = self.store(
+          url, incoming,
+          etag=headers.get("ETag"),
+          last_modified=headers.get("Last-Modified")
+      )
+      return self.materialize(digest, output_path)
+
+  def fetch(self, fetcher, url, output_path):
+      """
+      Place the image at `url` in `output_path`, downloading it only if needed.
+
+      Fresh entries are used as is; stale ones are revalidated and a 304
+      answer costs no body transfer. Raises on HTTP or network errors.
+      """
+      entry = self.lookup(url)
+      if self._is_fresh(entry):
+          return self._hit(url, entry, output_path)
+
+      incoming = self._incoming_path()
+      response = fetcher.stream_to_file(url, incoming, headers=self._conditional_headers(entry))
+      response.raise_for_status()
+      return self._complete(url, entry, incoming, output_path, response.status_code, response.headers)
+
+  async def fetch_async(self, fetcher, url, output_path):
+      """
+      Async version of fetch using an AsyncHttpFetcher.
+
+      The index lookup, hashing and copying blobs happen in a worker thread
+      so the event loop is never blocked on disk.
+      """
+      entry = await asyncio.to_thread(self.lookup, url)
+      if self._is_fresh(entry):
+          return await asyncio.to_thread(self._hit, url, entry, output_path)
+
+      incoming = self._incoming_path()
+      response = await fetcher.stream_to_file(url, incoming, headers=self._conditional_headers(entry))
+      response.raise_for_status()
+      return await asyncio.to_thread(
+          self._complete, url, entry, incoming, output_path, response.status, response.headers
+      )
+
+  def close(self):
+      with self._lock:
+          self._db.close()
@@ -0,0 +1,153 @@
+# src/comic_translator/cli.py
+import argparse
+import json
+import sys
+from .ocr_backends import ARCH_PRESETS, INFERENCE_BACKENDS
+
+DEFAULT_URL = "https://mangasee123.com/read-online/Pick-Me-Up-Infinite-Gacha-chapter-1-page-1.html"
+
+def build_parser():
+  """Build the command line parser"""
+  parser = argparse.ArgumentParser(
+      prog="comic-translator",
+      description="Download, OCR, translate and re-render comic pages."
+  )
+  parser.add_argument("urls", nargs="*", default=[DEFAULT_URL], help="comic reader page URLs")
+  parser.add_argument("--lang", nargs="+", default=["en"],
+                      help="target language codes (default: en); several languages share one OCR pass")
+  parser.add_argument("--names", nargs="+", help="output page names, one per URL")
+  parser.add_argument("--backend", default="google", choices=["google", "local"],
+                      help="translation backend; 'local' is an offline stand-in")
+  parser.add_argument("--chapter", action="store_true",
+                      help="process all URLs through the concurrent chapter pipeline")
+  parser.add_argument("--whole-chapter", action="store_true",
+                      help="treat every URL as a chapter: find all of its pages and process them")
+  parser.add_argument("--lookahead", type=int, default=4,
+                      help="pages downloaded ahead of OCR with --whole-chapter (default: 4)")
+  parser.add_argument("--download-workers", type=int, default=1)
+  parser.add_argument("--ocr-workers", type=int, default=1)
+  parser.add_argument("--translate-workers", type=int, default=4)
+  parser.add_argument("--render-workers", type=int, default=2)
+  parser.add_argument("--queue-size", type=int, default=4,
+                      help="maximum pages waiting between two stages")
+  parser.add_argument("--ocr-inference", choices=INFERENCE_BACKENDS, default="torch",
+                      help="OCR runtime; int8 variants are quantized (torch-int8 only on torch < 2.10), "
+                           "onnx needs onnxtr")
+  parser.add_argument("--ocr-preset", choices=list(ARCH_PRESETS), default="default",
+                      help="OCR detection/recognition architectures; 'fast' uses MobileNet models")
+  parser.add_argument("--ocr-threads", type=int,
+                      help="intra-op threads used by OCR inference (per process with --ocr-processes)")
+  parser.add_argument("--ocr-processes", type=int,
+                      help="run OCR in this many worker processes, each with its own model")
+  parser.add_argument("--tile-height", type=int,
+                      help="OCR pages taller than this many pixels in overlapping tiles (for webtoon strips)")
+  parser.add_argument("--text-format", choices=["json", "npz"], default="json",
+                      help="format of the intermediate text files; npz is a compact columnar format")
+  parser.add_argument("--no-text-files", action="store_true",
+                      help="keep extracted and translated text in memory only; such stages are not resumable")
+  parser.add_argument("--force", action="store_true",
+                      help="run every stage again instead of resuming from the page manifests")
+  parser.add_argument("--serve", action="store_true",
+                      help="run a resident worker that keeps the OCR model warm and accepts jobs over HTTP")
+  parser.add_argument("--host", default="127.0.0.1", help="worker address (default: 127.0.0.1)")
+  parser.add_argument("--port", type=int, default=8765, help="worker port (default: 8765)")
+  parser.add_argument("--warm-browsers", type=int, default=0,
+                      help="browser sessions the worker starts up front")
+  parser.add_argument("--submit", metavar="WORKER_URL",
+                      help="send the URLs to a running worker instead of processing them here")
+  parser.add_argument("--metrics-out", metavar="FILE",
+                      help="write stage timings and counters in the Prometheus text format when done")
+  parser.add_argument("--trace", metavar="FILE",
+                      help="append one JSON line per page stage (wall/CPU time, peak RSS, sizes)")
+  parser.add_argument("--profile", metavar="DIR",
+                      help="write a cProfile of every page to DIR/<page>.prof")
+  return parser
+
+def ocr_options(args):
+  """TextExtractor options selected on the command line"""
+  det_arch, reco_arch = ARCH_PRESETS[args.ocr_preset]
+  return {"inference": args.ocr_inference, "det_arch": det_arch, "reco_arch": reco_arch,
+          "intra_op_threads": args.ocr_threads, "processes": args.ocr_processes}
+
+def main(argv=None):
+  args = build_parser().parse_args(argv)
+  names = args.names or [f"page{i}" for i in range(1, len(args.urls) + 1)]
+  if len(names) != len(args.urls):
+      print("--names needs one name per URL", file=sys.stderr)
+      return 2
+  langs = list(dict.fromkeys(args.lang))
+  if len(langs) > 1 and (args.submit or args.chapter or args.whole_chapter):
+      print("Several --lang values are only supported for local page-by-page runs", file=sys.stderr)
+      return 2
+
+  if args.submit and args.whole_chapter:
+      print("--whole-chapter cannot be combined with --submit", file=sys.stderr)
+      return 2
+  if args.submit:
+      from .worker import submit_job
+      pages = submit_job(args.submit, args.urls, names, target_lang=langs[0])
+      print(json.dumps(pages, indent=2))
+      return 0 if all(page["ok"] for page in pages.values()) else 1
+
+  if args.serve:
+      from .worker import WorkerServer
+      WorkerServer(
+          host=args.host, port=args.port, warm_browsers=args.warm_browsers,
+          translation_backend=args.backend, resume=not args.force, text_format=args.text_format,
+          save_text=not args.no_text_files, tile_height=args.tile_height, ocr_options=ocr_options(args),
+          ocr_workers=args.ocr_workers, render_workers=args.render_workers
+      ).serve_forever()
+      return 0
+
+  from .main import ComicTranslator
+  from .metrics import MetricsRegistry
+  metrics = MetricsRegistry(trace_path=args.trace)
+  translator = ComicTranslator(
+      translation_backend=args.backend, resume=not args.force, metrics=metrics, profile_dir=args.profile,
+      text_format=args.text_format, save_text=not args.no_text_files, tile_height=args.tile_height,
+      ocr_options=ocr_options(args)
+  )
+
+  try:
+      if len(langs) > 1:
+          # One download, OCR pass and cleaned background per page for all languages
+          results = {}
+          for url, name in zip(args.urls, names):
+              for lang, ok in translator.process_comic_page_languages(url, name, langs).items():
+                  results[f"{name}:{lang}"] = ok
+      elif args.whole_chapter:
+          # Every URL names a chapter; its pages are discovered and downloaded ahead
+          results = {}
+          for url in args.urls:
+              results.update(translator.process_chapter_url(
+                  url, target_lang=langs[0], lookahead=args.lookahead,
+                  download_workers=args.download_workers,
+                  ocr_workers=args.ocr_workers,
+                  translate_workers=args.translate_workers,
+                  render_workers=args.render_workers,
+                  queue_size=args.queue_size
+              ) or {url: False})
+      # Profiles are per page, so profiled runs take the pages one at a time
+      elif (args.chapter or len(args.urls) > 1) and not args.profile:
+          results = translator.process_chapter(
+              args.urls, names, target_lang=langs[0],
+              download_workers=args.download_workers,
+              ocr_workers=args.ocr_workers,
+              translate_workers=args.translate_workers,
+              render_workers=args.render_workers,
+              queue_size=args.queue_size
+          )
+      else:
+          results = {
+              name: translator.process_comic_page(url, name, target_lang=langs[0])
+              for url, name in zip(args.urls, names)
+          }
+  finally:
+      translator.close()
+      if args.metrics_out:
+          metrics.write_prometheus(args.metrics_out)
+      metrics.close()
+  return 0 if all(results.values()) else 1
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -1,54 +1,155 @@
 # src/comic_translator/downloader.py
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import os
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import asyncio
 import logging
+from .cache import DownloadCache
+from .drivers import get_default_pool
+from .fetch import AsyncHttpFetcher, HttpFetcher
+from .prefetch import PagePrefetcher
+from .scheduler import RequestScheduler
+from .scraper import chapter_name, fetch_chapter_pages, fetch_image_url, fetch_image_url_async, parse_chapter_pages
 
 class ComicDownloader:
-  def __init__(self):
+  def __init__(self, pool=None, browserless=True, fetcher=None, per_host_limit=4,
+               use_cache=True, cache=None, async_fetcher=None, scheduler=None):
       self.logger = logging.getLogger(__name__)
       self.download_dir = Path("data/downloads")
       self.download_dir.mkdir(parents=True, exist_ok=True)
-      
-      chrome_options = Options()
-      chrome_options.add_argument("--headless")
-      chrome_options.add_argument("--disable-gpu")
-      
-      self.driver = webdriver.Chrome(options=chrome_options)
-      
-  def download_comic_page(self, url, page_name):
-      """Download a single comic page"""
-      try:
-          self.driver.get(url)
-          WebDriverWait(self.driver, 10).until(
+
+      # Browsers are leased from a shared pool and only started when needed
+      self.pool = pool or get_default_pool()
+      self.browserless = browserless
+      # Sync and async requests share one scheduler, so what it learns about a host applies to both
+      self.scheduler = scheduler or RequestScheduler(max_concurrency=per_host_limit)
+      self.fetcher = fetcher or HttpFetcher(per_host_limit=per_host_limit, scheduler=self.scheduler)
+      self.async_fetcher = async_fetcher or AsyncHttpFetcher(per_host_limit=per_host_limit, scheduler=self.scheduler)
+
+      # Images are cached by URL so re-runs only revalidate them
+      self.cache = (cache or DownloadCache()) if use_cache else None
+
+  def find_image_url_with_browser(self, url):
+      """Render the reader page in a pooled browser and read the comic image URL"""
+      from selenium.webdriver.common.by import By
+      from selenium.webdriver.support.ui import WebDriverWait
+      from selenium.webdriver.support import expected_conditions as EC
+
+      with self.pool.lease() as driver:
+          driver.get(url)
+          WebDriverWait(driver, 10).until(
               EC.presence_of_element_located((By.TAG_NAME, "img"))
           )
-          
+
           # Find comic image
-          image_element = self.driver.find_element(By.CSS_SELECTOR, "img.img-fluid[ng-src]")
-          image_url = image_element.get_attribute("ng-src")
-          
-          # Download image
-          response = requests.get(image_url)
-          if response.status_code == 200:
-              output_path = self.download_dir / f"{page_name}.jpg"
-              with open(output_path, "wb") as f:
-                  f.write(response.content)
-              self.logger.info(f"Successfully downloaded {page_name}")
-              return str(output_path)
+          image_element = driver.find_element(By.CSS_SELECTOR, "img.img-fluid[ng-src]")
+          return image_element.get_attribute("ng-src")
+
+  def find_image_url(self, url):
+      """Find the comic image URL, trying plain HTTP before starting a browser"""
+      if self.browserless:
+          image_url = fetch_image_url(url, self.fetcher)
+          if image_url:
+              return image_url
+          self.logger.info(f"Browserless lookup failed, falling back to Selenium: {url}")
+      return self.find_image_url_with_browser(url)
+
+  def find_chapter_pages_with_browser(self, url):
+      """Render a reader page in a pooled browser and read the chapter payload from it"""
+      from selenium.webdriver.common.by import By
+      from selenium.webdriver.support.ui import WebDriverWait
+      from selenium.webdriver.support import expected_conditions as EC
+
+      with self.pool.lease() as driver:
+          driver.get(url)
+          WebDriverWait(driver, 10).until(
+              EC.presence_of_element_located((By.TAG_NAME, "img"))
+          )
+          return parse_chapter_pages(driver.page_source, url)
+
+  def find_chapter_pages(self, url):
+      """
+      List every page of the chapter that `url` belongs to.
+
+      One reader page (the chapter URL or any of its pages) is fetched, and
+      the page count in its chapter payload gives all other pages. Returns
+      (reader page URL, image URL) pairs in reading order, or None.
+      """
+      try:
+          pages = fetch_chapter_pages(url, self.fetcher) if self.browserless else None
+          if pages is None:
+              self.logger.info(f"Browserless chapter lookup failed, falling back to Selenium: {url}")
+              pages = self.find_chapter_pages_with_browser(url)
+      except Exception as e:
+          self.logger.error(f"Error listing chapter pages: {str(e)}")
+          return None
+      if pages:
+          self.logger.info(f"Found {len(pages)} pages in {chapter_name(url)}")
+      return pages
+
+  def download_image(self, image_url, page_name):
+      """Download a comic image whose URL is already known"""
+      try:
+          # Stream the image to disk, or reuse the cached copy
+          output_path = self.download_dir / f"{page_name}.jpg"
+          if self.cache is not None:
+              output_path = self.cache.fetch(self.fetcher, image_url, output_path)
           else:
-              self.logger.error(f"Failed to download image: {response.status_code}")
-              return None
-              
+              output_path = self.fetcher.fetch_to_file(image_url, output_path)
+          self.logger.info(f"Successfully downloaded {page_name}")
+          return output_path
+
+      except Exception as e:
+          self.logger.error(f"Error downloading comic page: {str(e)}")
+          return None
+
+  def download_comic_page(self, url, page_name):
+      """Download a single comic page"""
+      try:
+          image_url = self.find_image_url(url)
+      except Exception as e:
+          self.logger.error(f"Error downloading comic page: {str(e)}")
+          return None
+      return self.download_image(image_url, page_name)
+
+  def prefetcher(self, pages, lookahead=4, workers=None):
+      """A PagePrefetcher downloading (image URL, page name) pairs ahead of use"""
+      return PagePrefetcher(self.download_image, pages, lookahead=lookahead, workers=workers)
+
+  async def find_image_url_async(self, url):
+      """Async version of find_image_url; the browser fallback runs in a thread"""
+      if self.browserless:
+          image_url = await fetch_image_url_async(url, self.async_fetcher)
+          if image_url:
+              return image_url
+          self.logger.info(f"Browserless lookup failed, falling back to Selenium: {url}")
+      return await asyncio.to_thread(self.find_image_url_with_browser, url)
+
+  async def download_comic_page_async(self, url, page_name):
+      """Download a single comic page without blocking the event loop"""
+      try:
+          image_url = await self.find_image_url_async(url)
+
+          output_path = self.download_dir / f"{page_name}.jpg"
+          if self.cache is not None:
+              output_path = await self.cache.fetch_async(self.async_fetcher, image_url, output_path)
+          else:
+              output_path = await self.async_fetcher.fetch_to_file(image_url, output_path)
+          self.logger.info(f"Successfully downloaded {page_name}")
+          return output_path
+
       except Exception as e:
           self.logger.error(f"Error downloading comic page: {str(e)}")
           return None
-          
-  def __del__(self):
-      self.driver.quit()
\ No newline at end of file
+
+  def download_comic_pages(self, urls, page_names, workers=8):
+      """
+      Download many comic pages concurrently.
+
+      Returns the image paths in input order, with None for failed pages.
+      The fetcher's per-host limit still caps requests to any single host.
+      """
+      urls, page_names = list(urls), list(page_names)
+      if not urls:
+          return []
+      with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+          return list(executor.map(self.download_comic_page, urls, page_names))
@@ -0,0 +1,112 @@
+# src/comic_translator/drivers.py
+from contextlib import contextmanager
+import atexit
+import logging
+import queue
+import threading
+
+def chrome_factory():
+  """Start a headless Chrome session"""
+  from selenium import webdriver
+  from selenium.webdriver.chrome.options import Options
+
+  chrome_options = Options()
+  chrome_options.add_argument("--headless")
+  chrome_options.add_argument("--disable-gpu")
+  return webdriver.Chrome(options=chrome_options)
+
+class DriverPool:
+  """
+  A bounded pool of warm WebDriver sessions.
+
+  Drivers are created lazily on first lease and handed back to the pool when
+  the lease ends, so concurrent downloads share a few long-lived browsers
+  instead of starting one per page.
+  """
+  def __init__(self, size=2, factory=chrome_factory):
+      self.logger = logging.getLogger(__name__)
+      self.size = size
+      self.factory = factory
+      self._idle = queue.LifoQueue()
+      self._slots = threading.BoundedSemaphore(size)
+      self._lock = threading.Lock()
+      self._drivers = []
+      self.created = 0
+
+  def _create(self):
+      driver = self.factory()
+      with self._lock:
+          self._drivers.append(driver)
+          self.created += 1
+      self.logger.info(f"Started WebDriver session {self.created}")
+      return driver
+
+  def _discard(self, driver):
+      with self._lock:
+          if driver in self._drivers:
+              self._drivers.remove(driver)
+      try:
+          driver.quit()
+      except Exception:
+          pass
+
+  def _healthy(self, driver):
+      try:
+          driver.current_url
+          return True
+      except Exception:
+          return False
+
+  def warm(self, count=None):
+      """Start drivers ahead of time so the first pages do not wait for them"""
+      count = self.size if count is None else min(count, self.size)
+      with self._lock:
+          missing = count - len(self._drivers)
+      for _ in range(missing):
+          self._idle.put(self._create())
+
+  @contextmanager
+  def lease(self, timeout=None):
+      """Borrow a driver for the duration of a with block"""
+      if not self._slots.acquire(timeout=timeout):
+          raise TimeoutError("No WebDriver available in the pool")
+      driver = None
+      try:
+          try:
+              driver = self._idle.get_nowait()
+          except queue.Empty:
+              driver = self._create()
+          yield driver
+      except Exception:
+          # A failed page may have left the session unusable
+          if driver is not None and not self._healthy(driver):
+              self._discard(driver)
+              driver = None
+          raise
+      finally:
+          if driver is not None:
+              self._idle.put(driver)
+          self._slots.release()
+
+  def close(self):
+      """Quit every driver owned by the pool"""
+      with self._lock:
+          drivers, self._drivers = self._drivers, []
+      for driver in drivers:
+          try:
+              driver.quit()
+          except Exception:
+              pass
+      self._idle = queue.LifoQueue()
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+def get_default_pool(size=2, factory=chrome_factory):
+  """Return the process-wide driver pool, creating it on first use"""
+  global _default_pool
+  with _default_lock:
+      if _default_pool is None:
+          _default_pool = DriverPool(size=size, factory=factory)
+          atexit.register(_default_pool.close)
+      return _default_pool
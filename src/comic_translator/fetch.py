@@ -0,0 +1,297 @@
+# src/comic_translator/fetch.py
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from .scheduler import RequestScheduler
+from .scraper import HEADERS
+
+# Validators that must not be sent again when resuming a partial download
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+def resume_headers(headers, complete, position):
+  """Headers asking for the rest of a body that stopped after `position` bytes"""
+  headers = {name: value for name, value in (headers or {}).items() if name not in CONDITIONAL_HEADERS}
+  headers["Range"] = f"bytes={position}-"
+  # Only accept the remainder of the same version of the resource
+  validator = complete.headers.get("ETag") or complete.headers.get("Last-Modified")
+  if validator:
+      headers["If-Range"] = validator
+  return headers
+
+class HttpFetcher:
+  """
+  Shared HTTP layer for page and image downloads.
+
+  Keeps one keep-alive `requests.Session` per host and streams response
+  bodies to disk so memory use does not grow with image size. Requests are
+  admitted, throttled and retried by a RequestScheduler; `per_host_limit` is
+  the most requests it ever sends to one host at once.
+  """
+  def __init__(self, per_host_limit=4, chunk_size=64 * 1024, timeout=30, scheduler=None):
+      self.logger = logging.getLogger(__name__)
+      self.per_host_limit = per_host_limit
+      self.chunk_size = chunk_size
+      self.timeout = timeout
+      self.scheduler = scheduler or RequestScheduler(max_concurrency=per_host_limit)
+      self._sessions = {}
+      self._lock = threading.Lock()
+
+  def _host(self, url):
+      return urlparse(url).netloc
+
+  def session_for(self, url):
+      """Return the pooled session for the host of `url`"""
+      host = self._host(url)
+      with self._lock:
+          session = self._sessions.get(host)
+          if session is None:
+              session = requests.Session()
+              session.headers.update(HEADERS)
+              adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host_limit)
+              session.mount("http://", adapter)
+              session.mount("https://", adapter)
+              self._sessions[host] = session
+          return session
+
+  def get(self, url, **kwargs):
+      """GET `url` through the host's session, reading the whole body"""
+      kwargs.setdefault("timeout", self.timeout)
+      session = self.session_for(url)
+      return self.scheduler.call(url, lambda: session.get(url, **kwargs))
+
+  def stream_to_file(self, url, output_path, headers=None):
+      """
+      Stream the body of `url` into `output_path` and return the response.
+
+      The body is written in chunks to a temporary file next to the target
+      and renamed into place once complete, so readers never see a partial
+      image. Nothing is written unless the server answers 200, which lets
+      callers send conditional requests and handle 304 themselves. A body cut
+      off mid-transfer is resumed with a Range request.
+      """
+      output_path = Path(output_path)
+      output_path.parent.mkdir(parents=True, exist_ok=True)
+
+      session = self.session_for(url)
+      fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+      try:
+          with os.fdopen(fd, "wb") as f:
+              response = self._stream(session, url, f, headers)
+          if response.status_code == 200:
+              os.replace(tmp_path, output_path)
+          else:
+              os.unlink(tmp_path)
+          return response
+      except BaseException:
+          os.unlink(tmp_path)
+          raise
+
+  def _stream(self, session, url, f, headers):
+      """Write the body of `url` to `f` and return the response it started with"""
+      complete = response = None
+      for attempt in self.scheduler.attempts(url):
+          with attempt:
+              request_headers = headers
+              if complete is not None and f.tell():
+                  # Ask for the rest of the interrupted body
+                  request_headers = resume_headers(headers, complete, f.tell())
+              with session.get(url, headers=request_headers, stream=True, timeout=self.timeout) as response:
+                  if attempt.report(response):
+                      continue
+                  if response.status_code == 200:
+                      # A full body, also when the server ignored the Range request
+                      complete = response
+                      f.seek(0)
+                      f.truncate()
+                  elif not (response.status_code == 206 and complete is not None):
+                      return response
+                  for chunk in response.iter_content(chunk_size=self.chunk_size):
+                      f.write(chunk)
+                  return complete
+      return response
+
+  def fetch_to_file(self, url, output_path):
+      """Stream `url` into `output_path`. Raises on HTTP or network errors."""
+      response = self.stream_to_file(url, output_path)
+      response.raise_for_status()
+      if response.status_code != 200:
+          raise requests.HTTPError(f"Unexpected status {response.status_code} for {url}", response=response)
+      return str(output_path)
+
+  def fetch_many(self, items, workers=None):
+      """
+      Download many `(url, output_path)` pairs concurrently.
+
+      Returns the output paths in input order, with None for failed downloads.
+      Per-host limits still apply, so `workers` only bounds the total.
+      """
+      items = list(items)
+      if not items:
+          return []
+      hosts = {self._host(url) for url, _ in items}
+      workers = workers or min(len(items), self.per_host_limit * len(hosts))
+
+      def fetch(item):
+          url, output_path = item
+          try:
+              return self.fetch_to_file(url, output_path)
+          except Exception as e:
+              self.logger.error(f"Error downloading {url}: {str(e)}")
+              return None
+
+      with ThreadPoolExecutor(max_workers=workers) as executor:
+          return list(executor.map(fetch, items))
+
+  def close(self):
+      with self._lock:
+          for session in self._sessions.values():
+              session.close()
+          self._sessions.clear()
+          self._slots.clear()
+
+class AsyncHttpFetcher:
+  """
+  asyncio counterpart of HttpFetcher, built on aiohttp.
+
+  A single keep-alive `ClientSession` is shared by all coroutines of an event
+  loop and its connector caps concurrent connections per host, so hundreds of
+  pages can be in flight without a thread each. Bodies are streamed to disk,
+  and requests scheduled and retried, exactly like HttpFetcher does.
+  """
+  def __init__(self, per_host_limit=4, chunk_size=64 * 1024, timeout=30, scheduler=None, write_size=1024 * 1024):
+      self.logger = logging.getLogger(__name__)
+      self.per_host_limit = per_host_limit
+      self.chunk_size = chunk_size
+      # Chunks are written to disk from a thread in blocks of about this size
+      self.write_size = write_size
+      self.timeout = timeout
+      self.scheduler = scheduler or RequestScheduler(max_concurrency=per_host_limit)
+      self._session = None
+      self._loop = None
+
+  async def session(self):
+      """Return the session of the running event loop, creating it if needed"""
+      import aiohttp
+
+      loop = asyncio.get_running_loop()
+      if self._session is None or self._session.closed or self._loop is not loop:
+          # Sessions are bound to the loop that created them
+          stale, stale_loop = self._session, self._loop
+          connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.per_host_limit)
+          self._session = aiohttp.ClientSession(
+              headers=HEADERS, connector=connector,
+              timeout=aiohttp.ClientTimeout(total=self.timeout)
+          )
+          self._loop = loop
+          if stale is not None and not stale.closed:
+              await self._close_stale(stale, stale_loop)
+      return self._session
+
+  async def _close_stale(self, session, loop):
+      """Close the session of an earlier event loop, on that loop if it still runs"""
+      try:
+          if loop is not None and loop.is_running():
+              await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+          else:
+              await session.close()
+      except Exception as e:
+          self.logger.debug(f"Could not close the previous HTTP session: {str(e)}")
+
+  async def get_text(self, url, **kwargs):
+      """GET `url` and return the response together with its decoded body"""
+      session = await self.session()
+      response = text = None
+      async for attempt in self.scheduler.attempts_async(url):
+          async with attempt:
+              async with session.get(url, **kwargs) as response:
+                  text = await response.text()
+              if attempt.report(response):
+                  continue
+              return response, text
+      return response, text
+
+  async def stream_to_file(self, url, output_path, headers=None):
+      """
+      Stream the body of `url` into `output_path` and return the response.
+
+      Same contract as HttpFetcher.stream_to_file: the file is only written,
+      atomically, when the server answers 200.
+      """
+      output_path = Path(output_path)
+      output_path.parent.mkdir(parents=True, exist_ok=True)
+
+      session = await self.session()
+      fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".part")
+      try:
+          with os.fdopen(fd, "wb") as f:
+              response = await self._stream(session, url, f, headers)
+          if response.status == 200:
+              os.replace(tmp_path, output_path)
+          else:
+              os.unlink(tmp_path)
+          return response
+      except BaseException:
+          os.unlink(tmp_path)
+          raise
+
+  async def _stream(self, session, url, f, headers):
+      """Async version of HttpFetcher._stream"""
+      complete = response = None
+      async for attempt in self.scheduler.attempts_async(url):
+          async with attempt:
+              request_headers = headers
+              if complete is not None and f.tell():
+                  # Ask for the rest of the interrupted body
+                  request_headers = resume_headers(headers, complete, f.tell())
+              async with session.get(url, headers=request_headers) as response:
+                  if attempt.report(response):
+                      continue
+                  if response.status == 200:
+                      complete = response
+                      f.seek(0)
+                      f.truncate()
+                  elif not (response.status == 206 and complete is not None):
+                      return response
+                  await self._write_body(response, f)
+                  return complete
+      return response
+
+  async def _write_body(self, response, f):
+      """
+      Write a response body to `f` off the event loop.
+
+      Chunks are collected in memory and written in blocks of `write_size`,
+      so a body costs a few thread hops rather than one per chunk. What was
+      received is still written when the transfer breaks, so it can resume.
+      """
+      buffer = bytearray()
+      try:
+          async for chunk in response.content.iter_chunked(self.chunk_size):
+              buffer += chunk
+              if len(buffer) >= self.write_size:
+                  block, buffer = bytes(buffer), bytearray()
+                  await asyncio.to_thread(f.write, block)
+      finally:
+          if buffer:
+              await asyncio.to_thread(f.write, bytes(buffer))
+
+  async def fetch_to_file(self, url, output_path):
+      """Stream `url` into `output_path`. Raises on HTTP or network errors."""
+      response = await self.stream_to_file(url, output_path)
+      response.raise_for_status()
+      if response.status != 200:
+          raise ValueError(f"Unexpected status {response.status} for {url}")
+      return str(output_path)
+
+  async def close(self):
+      if self._session is not None and not self._session.closed:
+          await self._session.close()
+      self._session = None
+      self._loop = None
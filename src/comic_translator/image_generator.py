@@ -1,14 +1,33 @@
 # src/comic_translator/image_generator.py
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
-from .utils import load_json
+from .layout import TextLayout, draw_fitted
+from .page_text import load_page_text
 
 class ImageGenerator:
-  def __init__(self):
+  def __init__(self, erase_mode="box", inpaint_workers=1):
       self.logger = logging.getLogger(__name__)
       self.output_dir = Path("data/output")
       self.output_dir.mkdir(parents=True, exist_ok=True)
+      self.layout = TextLayout(max_size=72)
+
+      # "box" paints white rectangles over the text, "inpaint" reconstructs
+      # the background around it
+      if erase_mode not in ("box", "inpaint"):
+          raise ValueError(f"Unknown erase mode: {erase_mode}")
+      self.erase_mode = erase_mode
+      self.inpaint_workers = inpaint_workers
+
+  def params(self):
+      """Settings that change the rendered page"""
+      return {
+          "erase_mode": self.erase_mode,
+          "font": self.layout.font_path,
+          "min_size": self.layout.min_size,
+          "max_size": self.layout.max_size
+      }
 
   def erase_original_text(self, draw, bbox, background_color="white"):
       """Erase the original text by drawing a filled rectangle"""
@@ -28,68 +47,112 @@ class ImageGenerator:
           fill=background_color
       )
 
+  def inpaint_original_text(self, translated_data, padding=2):
+      """Erase the original text of every entry by inpainting around it"""
+      from .inpainting import inpaint_regions  # OpenCV is only loaded in inpaint mode
+
+      boxes = []
+      for entry in translated_data:
+          for word in entry.words:
+              x1, y1, x2, y2 = word.box
+              x1, x2 = x1 * self.image.width - padding, x2 * self.image.width + padding
+              y1, y2 = y1 * self.image.height - padding, y2 * self.image.height + padding
+              boxes.append((x1, y1, x2 - x1, y2 - y1))
+      self.image = inpaint_regions(self.image, boxes, workers=self.inpaint_workers)
+
       
   def generate_translated_image(self, original_image_path, translated_text_path):
-      """Generate new image with translated text"""
+      """Generate new image with the translated text saved for the page"""
       try:
-          # Load original image
-          self.image = Image.open(original_image_path)
+          translated_data = load_page_text(translated_text_path)
+      except Exception as e:
+          self.logger.error(f"Error loading translated text: {str(e)}")
+          return None
+      return self.render(original_image_path, translated_data)
+
+  def erase_text(self, image, groups):
+      """Return a copy of `image` with the original words of every group erased"""
+      self.image = image.copy()
+      if self.erase_mode == "inpaint":
+          self.inpaint_original_text(groups)
+      else:
           draw = ImageDraw.Draw(self.image)
-          
-          # Load translated text data
-          translated_data = load_json(translated_text_path)
-          
-          # Add translated text to image
-          #font = ImageFont.truetype("arial.ttf", 20)  # Adjust font and size as needed
-          
-          for entry in translated_data:
-              # First, erase original text
-              for word in entry["original_words"]:
-                  self.erase_original_text(draw, word["bbox"])
-              
-              # Calculate the space needed for translated text
-              bbox = entry["bbox"]
-              text = entry["translated_text"]
-              
-              # Convert coordinates
-              x1, y1 = bbox[0]
-              x2, y2 = bbox[1]
-              x1 = int(x1 * self.image.width)
-              y1 = int(y1 * self.image.height)
-              x2 = int(x2 * self.image.width)
-              y2 = int(y2 * self.image.height)
-              
-              # Calculate text size and position
-              font_size = int((y2 - y1) * 0.8)  # 80% of height
-              font = ImageFont.truetype("arial.ttf", font_size)
-              
-              # Adjust font size if text is too wide
-              while True:
-                  text_bbox = draw.textbbox((0, 0), text, font=font)
-                  text_width = text_bbox[2] - text_bbox[0]
-                  if text_width <= (x2 - x1) or font_size <= 10:
-                      break
-                  font_size -= 1
-                  font = ImageFont.truetype("arial.ttf", font_size)
-              
-              # Center text in the space
-              text_bbox = draw.textbbox((0, 0), text, font=font)
-              text_width = text_bbox[2] - text_bbox[0]
-              text_height = text_bbox[3] - text_bbox[1]
-              
-              text_x = x1 + ((x2 - x1) - text_width) // 2
-              text_y = y1 + ((y2 - y1) - text_height) // 2
-              
-              # Draw text
-              draw.text((text_x, text_y), text, font=font, fill="black")
+          for entry in groups:
+              for word in entry.words:
+                  self.erase_original_text(draw, word.bbox)
+      return self.image
+
+  def draw_text(self, background, translated_data):
+      """
+      Return a copy of `background` with every translation drawn in its box.
+
+      Only the layout (stateless) is used, so several languages can be drawn
+      onto the same background from different threads.
+      """
+      image = background.copy()
+      draw = ImageDraw.Draw(image)
+      for entry in translated_data:
+          # Convert coordinates
+          x1, y1, x2, y2 = entry.box
+          x1 = int(x1 * image.width)
+          y1 = int(y1 * image.height)
+          x2 = int(x2 * image.width)
+          y2 = int(y2 * image.height)
+
+          # Fit the text in the space, wrapping it over several lines if needed
+          fitted = self.layout.fit(entry.translated_text, x2 - x1, y2 - y1, max_size=int((y2 - y1) * 0.8))
+          draw_fitted(draw, fitted, (x1, y1, x2 - x1, y2 - y1), fill="black")
+      return image
+
+  def render(self, original_image_path, translated_data, output_path=None):
+      """Generate new image from TranslatedGroup records held in memory"""
+      try:
+          # Load original image, erase its text and draw the translations
+          with Image.open(original_image_path) as original:
+              background = self.erase_text(original, translated_data)
+          image = self.draw_text(background, translated_data)
           
           # Save new image
-          output_path = self.output_dir / f"{Path(original_image_path).stem}_translated.jpg"
-          self.image.save(output_path)
+          output_path = output_path or self.output_dir / f"{Path(original_image_path).stem}_translated.jpg"
+          image.save(output_path)
           
           self.logger.info(f"Successfully generated translated image: {output_path}")
           return str(output_path)
           
       except Exception as e:
           self.logger.error(f"Error generating translated image: {str(e)}")
-          return None
\ No newline at end of file
+          return None
+
+  def render_languages(self, original_image_path, translations, workers=None):
+      """
+      Render one page in several languages from a single cleaned background.
+
+      `translations` maps a language code to its TranslatedGroup records; all
+      of them share the words of the same page. The original text is erased
+      once, the background is saved as `{page}_clean.png`, and every language
+      is drawn onto it in parallel and saved as `{page}_translated_{lang}.jpg`.
+      Returns {lang: output path or None}.
+      """
+      stem = Path(original_image_path).stem
+      try:
+          groups = next(iter(translations.values()))
+          with Image.open(original_image_path) as original:
+              background = self.erase_text(original, groups)
+          background.save(self.output_dir / f"{stem}_clean.png")
+      except Exception as e:
+          self.logger.error(f"Error erasing text of {original_image_path}: {str(e)}")
+          return {lang: None for lang in translations}
+
+      def draw(lang):
+          try:
+              output_path = self.output_dir / f"{stem}_translated_{lang}.jpg"
+              self.draw_text(background, translations[lang]).save(output_path)
+              return str(output_path)
+          except Exception as e:
+              self.logger.error(f"Error drawing {lang} text on {original_image_path}: {str(e)}")
+              return None
+
+      with ThreadPoolExecutor(max_workers=workers or len(translations), thread_name_prefix="comic-draw") as executor:
+          outputs = dict(zip(translations, executor.map(draw, translations)))
+      self.logger.info(f"Generated {sum(bool(p) for p in outputs.values())} languages of {stem}")
+      return outputs
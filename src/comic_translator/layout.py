@@ -0,0 +1,113 @@
+# src/comic_translator/layout.py
+from functools import lru_cache
+import logging
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FONT = "arial.ttf"
+
+@lru_cache(maxsize=128)
+def load_font(path, size):
+  """Load a TrueType font once per (path, size)"""
+  try:
+      return ImageFont.truetype(path, size)
+  except OSError:
+      logger.warning(f"Font {path} not found, using the default font")
+      return ImageFont.load_default(size)
+
+@lru_cache(maxsize=65536)
+def text_width(path, size, text):
+  """Advance width of `text` in pixels, memoized per font and size"""
+  return load_font(path, size).getlength(text)
+
+@lru_cache(maxsize=1024)
+def line_height(path, size):
+  """Height of one line of text (ascent + descent) in pixels"""
+  ascent, descent = load_font(path, size).getmetrics()
+  return ascent + descent
+
+class FittedText:
+  """Result of fitting text into a box: the font to use and the wrapped lines"""
+  __slots__ = ("font", "size", "lines", "line_height", "widths")
+
+  def __init__(self, font, size, lines, line_height, widths):
+      self.font = font
+      self.size = size
+      self.lines = lines
+      self.line_height = line_height
+      self.widths = widths
+
+  @property
+  def width(self):
+      return max(self.widths, default=0)
+
+  @property
+  def height(self):
+      return self.line_height * len(self.lines)
+
+  def positions(self, x, y, w, h):
+      """Top-left corner of every line when centered in the (x, y, w, h) box"""
+      top = y + (h - self.height) / 2
+      return [
+          (x + (w - width) / 2, top + n * self.line_height)
+          for n, width in enumerate(self.widths)
+      ]
+
+class TextLayout:
+  """
+  Fit translated text into speech bubbles.
+
+  Fonts and glyph metrics are cached, words are wrapped greedily to the box
+  width, and the font size is found by binary search, so laying out a page
+  needs only a handful of font loads no matter how many bubbles it has.
+  """
+  def __init__(self, font_path=DEFAULT_FONT, min_size=10, max_size=40):
+      self.font_path = font_path
+      self.min_size = min_size
+      self.max_size = max_size
+
+  def wrap(self, text, size, max_width):
+      """Break text into lines no wider than max_width where possible"""
+      space = text_width(self.font_path, size, " ")
+      lines, current, current_width = [], [], 0.0
+      for word in text.split():
+          width = text_width(self.font_path, size, word)
+          if current and current_width + space + width > max_width:
+              lines.append(" ".join(current))
+              current, current_width = [word], width
+          else:
+              current_width += (space if current else 0) + width
+              current.append(word)
+      if current:
+          lines.append(" ".join(current))
+      return lines
+
+  def _layout(self, text, size, max_width):
+      lines = self.wrap(text, size, max_width)
+      widths = [text_width(self.font_path, size, line) for line in lines]
+      return lines, widths
+
+  def fits(self, text, size, box_width, box_height):
+      lines, widths = self._layout(text, size, box_width)
+      return max(widths, default=0) <= box_width and line_height(self.font_path, size) * len(lines) <= box_height
+
+  def fit(self, text, box_width, box_height, max_size=None):
+      """Return the largest FittedText that fits the box, or the smallest size"""
+      high = self.max_size if max_size is None else min(self.max_size, max_size)
+      low, high = self.min_size, max(self.min_size, high)
+      best = low
+      while low <= high:
+          size = (low + high) // 2
+          if self.fits(text, size, box_width, box_height):
+              best, low = size, size + 1
+          else:
+              high = size - 1
+
+      lines, widths = self._layout(text, best, box_width)
+      return FittedText(load_font(self.font_path, best), best, lines, line_height(self.font_path, best), widths)
+
+def draw_fitted(draw, fitted, box, fill="black"):
+  """Draw a FittedText centered in an (x, y, w, h) box"""
+  for line, position in zip(fitted.lines, fitted.positions(*box)):
+      draw.text(position, line, font=fitted.font, fill=fill)
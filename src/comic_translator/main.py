@@ -3,42 +3,448 @@ from .downloader import ComicDownloader
 from .text_extraction import TextExtractor
 from .translator import Translator
 from .image_generator import ImageGenerator
+from .manifest import PageManifest
+from .metrics import MetricsRegistry, profiled
+from .pipeline import PageJob, Stage, StagedPipeline
+from .page_text import load_page_text
+from .scraper import chapter_name
 from .utils import setup_logging, ensure_directories
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+import asyncio
+import os
+import threading
 
 class ComicTranslator:
-  def __init__(self):
+  # Job attribute holding the output file of each stage
+  _STAGE_OUTPUTS = {
+      "download": "image_path",
+      "extract": "extracted_path",
+      "translate": "translated_path",
+      "render": "output_path",
+  }
+
+  def __init__(self, translation_backend="google", ocr_workers=1, render_workers=2, resume=True,
+               manifest_dir="data/manifests", metrics=None, profile_dir=None, text_format="json",
+               save_text=True, tile_height=None, ocr_options=None, downloader=None, extractor=None,
+               translator=None, generator=None):
       self.logger = setup_logging()
       ensure_directories()
-      
-      self.downloader = ComicDownloader()
-      self.extractor = TextExtractor()
-      self.translator = Translator()
-      self.generator = ImageGenerator()
-      
-  def process_comic_page(self, url, page_name, target_lang="en"):
-      """Process a single comic page"""
-      # Download page
-      image_path = self.downloader.download_comic_page(url, page_name)
-      if not image_path:
-          return False
-          
-      # Extract text
-      extracted_data = self.extractor.extract_text(image_path)
-      if not extracted_data:
-          return False
-          
-      # Translate text
-      extracted_text_path = Path("data/extracted_text") / f"{page_name}_text.json"
-      translated_data = self.translator.translate_text(extracted_text_path, target_lang)
-      if not translated_data:
+
+      # Components passed in are used as they are, instead of building the default ones
+      self.downloader = downloader or ComicDownloader()
+      # Grouped and translated text are saved as JSON or in the columnar npz format
+      # `ocr_options` picks the OCR inference backend, architectures and threads
+      self.extractor = extractor or TextExtractor(
+          text_format=text_format, tile_height=tile_height, **(ocr_options or {})
+      )
+      self.translator = translator or Translator(backend=translation_backend, text_format=text_format)
+      # Render threads each build their own ImageGenerator; a generator passed in is shared by them
+      self.generator = generator or ImageGenerator()
+      self._generator_per_thread = generator is None
+
+      # Text records are handed from stage to stage in memory; the files are
+      # only written for inspection and resuming
+      self.save_text = save_text
+
+      # Completed stages are recorded per page; with `resume` they are skipped
+      # on later runs while their inputs and settings are unchanged
+      self.manifest_dir = Path(manifest_dir) if manifest_dir else None
+      self.resume = resume
+
+      # Executors for the CPU-bound stages of the async API, created on first use;
+      # OCR worker processes each need a thread feeding them
+      self.ocr_workers = max(ocr_workers, self.extractor.concurrency)
+      self.render_workers = render_workers
+      self._executors = {}
+      self._executors_lock = threading.Lock()
+      self._render_local = threading.local()
+
+      # Stage timings and counters; cProfile output per page when profile_dir is set
+      self.metrics = metrics or MetricsRegistry()
+      self.metrics.add_collector(self._collect_metrics)
+      self.profile_dir = Path(profile_dir) if profile_dir else None
+
+  def _download(self, job):
+      if job.prefetch is not None:
+          job.image_path = job.prefetch.get(job.page_name)
+      else:
+          job.image_path = self.downloader.download_comic_page(job.url, job.page_name)
+      return job.image_path
+
+  def _extract(self, job):
+      job.extracted_data = self.extractor.extract_text(job.image_path, save=self.save_text)
+      if self.save_text:
+          job.extracted_path = self.extractor.output_path(job.image_path)
+      return job.extracted_data
+
+  def _translated_path(self, job):
+      """Where the translation of a job is saved, or None when text files are off"""
+      if not self.save_text or job.extracted_path is None:
+          return None
+      return self.translator.output_path(job.extracted_path)
+
+  def _translate(self, job):
+      job.translated_path = self._translated_path(job)
+      job.translated_data = self.translator.translate_groups(job.extracted_data, job.target_lang, job.translated_path)
+      return job.translated_data
+
+  def _render(self, job, generator=None):
+      generator = generator or self.generator
+      job.output_path = generator.render(job.image_path, job.translated_data)
+      return job.output_path
+
+  def _manifest(self, job):
+      if job.manifest is None:
+          job.manifest = PageManifest.for_page(job.page_name, self.manifest_dir)
+      return job.manifest
+
+  def _stage_spec(self, job, name):
+      """Return the (inputs, params) that decide whether a stage must run again"""
+      manifest = self._manifest(job)
+      if name == "download":
+          return {"url": job.url}, {}
+      if name == "extract":
+          return {"image": manifest.digest("download")}, self.extractor.params()
+      if name == "translate":
+          return {"text": manifest.digest("extract")}, self.translator.params(job.target_lang)
+      return {"image": manifest.digest("download"), "text": manifest.digest("translate")}, self.generator.params()
+
+  def _restore(self, job, name):
+      """Reuse the recorded output of a stage if it is still current"""
+      if self.manifest_dir is None or not self.resume:
           return False
-          
-      # Generate new image
-      translated_text_path = Path("data/translated_text") / f"{page_name}_text_translated.json"
-      final_image_path = self.generator.generate_translated_image(image_path, translated_text_path)
-      if not final_image_path:
+      try:
+          output = self._manifest(job).current_output(name, *self._stage_spec(job, name))
+          if output is None:
+              return False
+          setattr(job, self._STAGE_OUTPUTS[name], output)
+          if name == "extract":
+              job.extracted_data = load_page_text(output)
+          elif name == "translate":
+              job.translated_data = load_page_text(output)
+      except Exception as e:
+          self.logger.warning(f"Could not reuse {name} output for {job.page_name}: {str(e)}")
           return False
-          
+      self.logger.info(f"Skipping {name} for {job.page_name}: inputs unchanged")
+      return True
+
+  def _record(self, job, name):
+      """Record a completed stage in the page manifest"""
+      # Stages whose output only lives in memory cannot be resumed
+      if self.manifest_dir is None or getattr(job, self._STAGE_OUTPUTS[name]) is None:
+          return
+      try:
+          inputs, params = self._stage_spec(job, name)
+          self._manifest(job).record(name, inputs, params, getattr(job, self._STAGE_OUTPUTS[name]))
+      except Exception as e:
+          self.logger.warning(f"Could not record {name} for {job.page_name}: {str(e)}")
+
+  def _measure(self, job, name, span):
+      """Count what a completed stage produced"""
+      if name == "download":
+          if os.path.exists(job.image_path):
+              span["bytes"] = os.path.getsize(job.image_path)
+              self.metrics.inc("comic_download_bytes_total", span["bytes"])
+      elif name == "extract":
+          span["groups"] = len(job.extracted_data)
+          span["words"] = sum(len(group.words) for group in job.extracted_data)
+          self.metrics.inc("comic_groups_total", span["groups"])
+          self.metrics.inc("comic_words_total", span["words"])
+      elif name == "translate":
+          span["texts"] = len(job.translated_data)
+          self.metrics.inc("comic_translated_texts_total", span["texts"])
+
+  def _collect_metrics(self):
+      """Counters kept by the components, read when metrics are exported"""
+      values = {}
+      for name, value in self.translator.stats().items():
+          suffix = "" if name == "memory_entries" else "_total"
+          values[f"comic_translation_{name}{suffix}"] = value
+      for prefix, component in (("download", self.downloader), ("ocr", self.extractor)):
+          cache = getattr(component, "cache", None)
+          if cache is not None:
+              values[f"comic_{prefix}_cache_hits_total"] = cache.hits
+              values[f"comic_{prefix}_cache_misses_total"] = cache.misses
+      for host, state in self.request_state().items():
+          labels = (("host", host),)
+          for name in ("concurrency_limit", "in_flight", "rate_limit", "latency_s", "paused_s"):
+              if state[name] is not None:
+                  values[(f"comic_remote_{name}", labels)] = state[name]
+          for name in ("requests", "throttled", "errors", "retries"):
+              values[(f"comic_remote_{name}_total", labels)] = state[name]
+      return values
+
+  def request_state(self):
+      """Adaptive limits and counters of every remote host, by host"""
+      state = {}
+      for component in (self.downloader, getattr(self.translator, "backend", None)):
+          scheduler = getattr(component, "scheduler", None)
+          if scheduler is not None:
+              state.update(scheduler.state())
+      return state
+
+  def _resumable(self, name, handler):
+      """Wrap a stage handler so it is timed, and skipped when its manifest entry is current"""
+      def run(job):
+          with self.metrics.span(name, job.page_name) as span:
+              if self._restore(job, name):
+                  span["status"] = "skipped"
+                  return True
+              if not handler(job):
+                  span["status"] = "failed"
+                  return False
+              self._measure(job, name, span)
+              self._record(job, name)
+              return True
+      return run
+
+  def _page_names(self, urls, page_names):
+      urls = list(urls)
+      if page_names is None:
+          page_names = [f"page{i}" for i in range(1, len(urls) + 1)]
+      page_names = list(page_names)
+      if len(page_names) != len(urls):
+          raise ValueError("page_names must have one entry per url")
+      return urls, page_names
+
+  def _report(self, jobs):
+      results = {}
+      for job in jobs:
+          results[job.page_name] = job.succeeded
+          if job.succeeded:
+              self.logger.info(f"Successfully processed comic page: {job.page_name}")
+          else:
+              self.logger.error(f"Failed to process {job.page_name} at stage {job.failed_stage}")
+
+      self.logger.info(f"Processed {sum(results.values())}/{len(results)} pages")
+      return results
+
+  def process_comic_page(self, url, page_name, target_lang="en"):
+      """Process a single comic page"""
+      job = PageJob(url, page_name, target_lang)
+      profile = profiled(self.profile_dir / f"{page_name}.prof") if self.profile_dir else nullcontext()
+
+      # Download page, extract text, translate it and generate the new image
+      stages = (("download", self._download), ("extract", self._extract),
+                ("translate", self._translate), ("render", self._render))
+      with profile:
+          for name, stage in stages:
+              if not self._resumable(name, stage)(job):
+                  return False
+
       self.logger.info(f"Successfully processed comic page: {page_name}")
-      return True
\ No newline at end of file
+      return True
+
+  def process_comic_page_languages(self, url, page_name, target_langs, workers=None):
+      """
+      Process a single comic page into several languages at once.
+
+      The page is downloaded, read and erased once. Translations into every
+      language run concurrently and each is drawn onto the shared cleaned
+      background in parallel, saved as `{page}_translated_{lang}.jpg`.
+      Returns a dict mapping every language to True or False.
+      """
+      target_langs = list(dict.fromkeys(target_langs))
+      job = PageJob(url, page_name, target_langs[0])
+      for name, stage in (("download", self._download), ("extract", self._extract)):
+          if not self._resumable(name, stage)(job):
+              return {lang: False for lang in target_langs}
+
+      def translate(lang):
+          with self.metrics.span("translate", f"{page_name}:{lang}") as span:
+              output_path = self.translator.output_path(job.extracted_path, lang) if job.extracted_path else None
+              translated = self.translator.translate_groups(job.extracted_data, lang, output_path)
+              if not translated:
+                  span["status"] = "failed"
+              return translated
+
+      with ThreadPoolExecutor(max_workers=workers or len(target_langs), thread_name_prefix="comic-translate") as pool:
+          translations = dict(zip(target_langs, pool.map(translate, target_langs)))
+
+      failed = [lang for lang, translated in translations.items() if not translated]
+      for lang in failed:
+          self.logger.error(f"Failed to translate {page_name} to {lang}")
+          del translations[lang]
+      outputs = {}
+      if translations:
+          with self.metrics.span("render", page_name) as span:
+              outputs = self.generator.render_languages(job.image_path, translations, workers)
+              span["languages"] = len(translations)
+
+      results = {lang: bool(outputs.get(lang)) for lang in target_langs}
+      self.logger.info(f"Processed {page_name} into {sum(results.values())}/{len(results)} languages")
+      return results
+
+  def process_chapter(self, urls, page_names=None, target_lang="en", download_workers=1,
+                      ocr_workers=1, translate_workers=4, render_workers=2, queue_size=4):
+      """
+      Process many comic pages through a staged concurrent pipeline.
+
+      Download, OCR, translation and rendering each run in their own worker
+      pool connected by bounded queues. Returns a dict mapping every page name
+      to True or False, like process_comic_page does for a single page.
+      """
+      urls, page_names = self._page_names(urls, page_names)
+      jobs = [PageJob(url, name, target_lang) for url, name in zip(urls, page_names)]
+      return self._report(self._run_pipeline(
+          jobs, download_workers, ocr_workers, translate_workers, render_workers, queue_size
+      ))
+
+  def _run_pipeline(self, jobs, download_workers, ocr_workers, translate_workers, render_workers, queue_size):
+      """Run jobs through the download, OCR, translation and rendering stages"""
+      def render_handler():
+          generator = self._thread_generator()
+          return self._resumable("render", lambda job: self._render(job, generator))
+
+      pipeline = StagedPipeline([
+          # Download workers share the downloader's pool of browser sessions
+          Stage("download", self._resumable("download", self._download), workers=download_workers),
+          Stage("extract", self._resumable("extract", self._extract),
+                workers=max(ocr_workers, self.extractor.concurrency)),
+          Stage("translate", self._resumable("translate", self._translate), workers=translate_workers),
+          Stage("render", workers=render_workers, handler_factory=render_handler),
+      ], queue_size=queue_size, metrics=self.metrics)
+      return pipeline.run(jobs)
+
+  def process_chapter_url(self, url, target_lang="en", lookahead=4, name_prefix=None, download_workers=1,
+                          ocr_workers=1, translate_workers=4, render_workers=2, queue_size=4):
+      """
+      Discover every page of a chapter from one reader URL and process them all.
+
+      `url` is the chapter URL or any of its pages. Page images are listed
+      from a single reader page, then downloaded `lookahead` pages ahead of
+      the pipeline so OCR does not wait on the network. Pages are named
+      `<chapter>-page-<n>`, or `<name_prefix><n>`. Returns a dict mapping every
+      page name to True or False, or an empty dict if no pages were found.
+      """
+      pages = self.downloader.find_chapter_pages(url)
+      if not pages:
+          self.logger.error(f"Could not list the pages of {url}")
+          return {}
+
+      prefix = name_prefix if name_prefix is not None else f"{chapter_name(url)}-page-"
+      names = [f"{prefix}{n}" for n in range(1, len(pages) + 1)]
+      jobs = [PageJob(page_url, name, target_lang) for (page_url, _), name in zip(pages, names)]
+      with self.downloader.prefetcher(
+          [(image_url, name) for (_, image_url), name in zip(pages, names)], lookahead=lookahead
+      ) as prefetcher:
+          for job in jobs:
+              job.prefetch = prefetcher
+          jobs = self._run_pipeline(jobs, download_workers, ocr_workers, translate_workers, render_workers,
+                                    queue_size)
+      return self._report(jobs)
+
+  async def _download_async(self, job):
+      job.image_path = await self.downloader.download_comic_page_async(job.url, job.page_name)
+      return job.image_path
+
+  async def _translate_async(self, job):
+      job.translated_path = self._translated_path(job)
+      job.translated_data = await self.translator.translate_groups_async(
+          job.extracted_data, job.target_lang, job.translated_path
+      )
+      return job.translated_data
+
+  def _render_in_worker(self, job):
+      """Render with the ImageGenerator of the current executor thread"""
+      generator = getattr(self._render_local, "generator", None)
+      if generator is None:
+          generator = self._render_local.generator = self._thread_generator()
+      return self._render(job, generator)
+
+  def _thread_generator(self):
+      """The ImageGenerator a new render thread draws with"""
+      return ImageGenerator() if self._generator_per_thread else self.generator
+
+  def _executor(self, name, workers):
+      with self._executors_lock:
+          executor = self._executors.get(name)
+          if executor is None:
+              executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"comic-{name}")
+              self._executors[name] = executor
+          return executor
+
+  async def _run_job_async(self, job):
+      """Run one job through all stages, handing CPU-bound ones to executors"""
+      loop = asyncio.get_running_loop()
+      ocr = self._executor("ocr", self.ocr_workers)
+      render = self._executor("render", self.render_workers)
+      stages = (
+          ("download", lambda: self._download_async(job)),
+          ("extract", lambda: loop.run_in_executor(ocr, self._extract, job)),
+          ("translate", lambda: self._translate_async(job)),
+          ("render", lambda: loop.run_in_executor(render, self._render_in_worker, job)),
+      )
+      for name, stage in stages:
+          # CPU time is not attributable to one page while awaiting
+          with self.metrics.span(name, job.page_name, cpu=False) as span:
+              # Manifest checks hash files, so they run off the event loop
+              if await asyncio.to_thread(self._restore, job, name):
+                  span["status"] = "skipped"
+                  continue
+              try:
+                  ok = await stage()
+              except Exception as e:
+                  self.logger.error(f"Stage {name} failed for {job.page_name}: {str(e)}")
+                  ok = False
+              if not ok:
+                  span["status"] = "failed"
+                  job.failed_stage = name
+                  return job
+              self._measure(job, name, span)
+              await asyncio.to_thread(self._record, job, name)
+      return job
+
+  async def process_comic_page_async(self, url, page_name, target_lang="en"):
+      """
+      Process a single comic page from an event loop.
+
+      Downloads and translation requests are awaited, while OCR and rendering
+      run in executors, so many pages can be processed concurrently.
+      """
+      job = await self._run_job_async(PageJob(url, page_name, target_lang))
+      if job.succeeded:
+          self.logger.info(f"Successfully processed comic page: {page_name}")
+      return job.succeeded
+
+  async def process_many(self, urls, page_names=None, target_lang="en", max_in_flight=64):
+      """
+      Process many comic pages concurrently from an event loop.
+
+      At most `max_in_flight` pages are in progress at once. Returns a dict
+      mapping every page name to True or False, like process_chapter.
+      """
+      urls, page_names = self._page_names(urls, page_names)
+      jobs = [PageJob(url, name, target_lang) for url, name in zip(urls, page_names)]
+      return self._report(await self.process_jobs(jobs, max_in_flight))
+
+  async def process_jobs(self, jobs, max_in_flight=64):
+      """Run PageJobs concurrently and return them, in order, once all finished"""
+      in_flight = asyncio.Semaphore(max(1, max_in_flight))
+
+      async def run(job):
+          async with in_flight:
+              active = self.metrics.add_gauge("comic_pages_in_flight", 1)
+              self.metrics.max_gauge("comic_pages_in_flight_peak", active)
+              try:
+                  return await self._run_job_async(job)
+              finally:
+                  self.metrics.add_gauge("comic_pages_in_flight", -1)
+
+      return await asyncio.gather(*(run(job) for job in jobs))
+
+  async def aclose(self):
+      """Shut down the async executors and HTTP session"""
+      with self._executors_lock:
+          executors = list(self._executors.values())
+          self._executors.clear()
+      for executor in executors:
+          executor.shutdown(wait=False)
+      await asyncio.to_thread(self.extractor.close)
+      await self.downloader.async_fetcher.close()
+
+  def close(self):
+      """Stop the OCR worker processes, if any"""
+      self.extractor.close()
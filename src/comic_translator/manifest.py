@@ -0,0 +1,91 @@
+# src/comic_translator/manifest.py
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from .cache import file_digest
+
+def fingerprint(inputs, params):
+  """Hash the inputs and parameters of a stage into a single key"""
+  blob = json.dumps({"inputs": inputs, "params": params}, sort_keys=True, default=str)
+  return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+class PageManifest:
+  """
+  Record of the stages already completed for one page.
+
+  Every stage is stored with a fingerprint of its inputs (the URL or the
+  digests of the files it reads) and parameters, plus the path and digest of
+  the file it produced. A stage whose fingerprint is unchanged and whose
+  output is still on disk can be skipped. Because inputs are content
+  digests, a stage that re-runs and produces identical output does not
+  invalidate the stages after it.
+  """
+  def __init__(self, path):
+      self.logger = logging.getLogger(__name__)
+      self.path = Path(path)
+      self.stages = {}
+      if self.path.exists():
+          try:
+              with open(self.path, "r", encoding="utf-8") as f:
+                  self.stages = json.load(f)["stages"]
+          except (ValueError, KeyError) as e:
+              self.logger.warning(f"Ignoring corrupt manifest {self.path}: {str(e)}")
+
+  @classmethod
+  def for_page(cls, page_name, root="data/manifests"):
+      return cls(Path(root) / f"{page_name}.json")
+
+  def output(self, stage):
+      """Return the recorded output path of a stage, or None"""
+      entry = self.stages.get(stage)
+      return entry["output"] if entry else None
+
+  def digest(self, stage):
+      """Return the recorded output digest of a stage, or None"""
+      entry = self.stages.get(stage)
+      return entry["digest"] if entry else None
+
+  def current_output(self, stage, inputs, params):
+      """
+      Return the output path of `stage` if it can be reused, else None.
+
+      The stage must have been recorded with the same inputs and parameters,
+      and its output must still exist with the recorded content.
+      """
+      entry = self.stages.get(stage)
+      if entry is None or None in inputs.values() or entry["key"] != fingerprint(inputs, params):
+          return None
+      try:
+          if file_digest(entry["output"]) != entry["digest"]:
+              return None
+      except OSError:
+          return None
+      return entry["output"]
+
+  def record(self, stage, inputs, params, output):
+      """Record a completed stage and save the manifest"""
+      self.stages[stage] = {
+          "key": fingerprint(inputs, params),
+          "inputs": inputs,
+          "params": params,
+          "output": str(output),
+          "digest": file_digest(output),
+          "completed": time.time()
+      }
+      self.save()
+
+  def save(self):
+      """Write the manifest atomically"""
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".part")
+      try:
+          with os.fdopen(fd, "w", encoding="utf-8") as f:
+              json.dump({"stages": self.stages}, f, ensure_ascii=False, indent=2, default=str)
+          os.replace(tmp_path, self.path)
+      except BaseException:
+          os.unlink(tmp_path)
+          raise
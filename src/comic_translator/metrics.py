@@ -0,0 +1,260 @@
+# src/comic_translator/metrics.py
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import json
+import logging
+import sys
+import threading
+import time
+
+try:
+  import resource
+except ImportError:
+  # Unix only; peak memory is not reported on Windows
+  resource = None
+
+# Upper bounds of the stage duration histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def peak_rss_bytes():
+  """Peak resident set size of this process so far, or None where it is not available"""
+  if resource is None:
+      return None
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # Linux reports KiB, macOS bytes
+  return peak if sys.platform == "darwin" else peak * 1024
+
+def _escape(value):
+  return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+  pairs = list(labels) + list(extra)
+  if not pairs:
+      return ""
+  return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+  if value == float("inf"):
+      return "+Inf"
+  return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+  """
+  In-process metrics for the page pipeline.
+
+  Counters, gauges and duration histograms are keyed by name and labels and
+  can be exported in the Prometheus text format. Every timed stage is also
+  appended as one JSON object per line to an optional trace file.
+  Collectors are callables returning {name: value} that are read at export
+  time, for counters other components already keep (caches, backends). A
+  key can also be a (name, labels) pair with labels as ((label, value), ...).
+  """
+  def __init__(self, trace_path=None):
+      self.logger = logging.getLogger(__name__)
+      self._lock = threading.Lock()
+      self._counters = {}
+      self._gauges = {}
+      self._histograms = {}
+      self._collectors = []
+      self._trace = None
+      if trace_path is not None:
+          trace_path = Path(trace_path)
+          trace_path.parent.mkdir(parents=True, exist_ok=True)
+          self._trace = open(trace_path, "a", encoding="utf-8", buffering=1)
+
+  def _key(self, name, labels):
+      return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+  def inc(self, name, value=1, **labels):
+      """Add `value` to a counter"""
+      key = self._key(name, labels)
+      with self._lock:
+          self._counters[key] = self._counters.get(key, 0) + value
+
+  def set_gauge(self, name, value, **labels):
+      key = self._key(name, labels)
+      with self._lock:
+          self._gauges[key] = value
+
+  def add_gauge(self, name, delta, **labels):
+      """Move a gauge up or down and return its new value"""
+      key = self._key(name, labels)
+      with self._lock:
+          self._gauges[key] = self._gauges.get(key, 0) + delta
+          return self._gauges[key]
+
+  def max_gauge(self, name, value, **labels):
+      """Raise a gauge to `value` if it is higher, to track peaks"""
+      key = self._key(name, labels)
+      with self._lock:
+          self._gauges[key] = max(self._gauges.get(key, value), value)
+
+  def observe(self, name, value, **labels):
+      """Record a duration in a histogram"""
+      key = self._key(name, labels)
+      with self._lock:
+          histogram = self._histograms.get(key)
+          if histogram is None:
+              histogram = self._histograms[key] = {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0}
+          for n, bound in enumerate(DURATION_BUCKETS):
+              if value <= bound:
+                  histogram["buckets"][n] += 1
+          histogram["sum"] += value
+          histogram["count"] += 1
+
+  def value(self, name, **labels):
+      """Current value of a counter or gauge, or 0"""
+      key = self._key(name, labels)
+      with self._lock:
+          return self._counters.get(key, self._gauges.get(key, 0))
+
+  def add_collector(self, collector):
+      self._collectors.append(collector)
+
+  def trace(self, event):
+      """Append an event to the JSON-lines trace, if one is open"""
+      if self._trace is None:
+          return
+      line = json.dumps({"ts": time.time(), **event}, default=str)
+      with self._lock:
+          self._trace.write(line + "\n")
+
+  @contextmanager
+  def span(self, stage, page=None, cpu=True):
+      """
+      Time one stage of one page.
+
+      Yields a dict the caller can fill with extra fields for the trace
+      (bytes, words...) or a "status" other than "ok". Wall time, CPU time of
+      the calling thread and peak RSS are recorded when the block ends;
+      `cpu=False` skips CPU time for code that awaits on an event loop.
+      """
+      record = {}
+      status = "ok"
+      wall_start, cpu_start = time.perf_counter(), time.thread_time()
+      try:
+          yield record
+      except BaseException:
+          status = "error"
+          raise
+      finally:
+          wall = time.perf_counter() - wall_start
+          status = record.pop("status", status)
+          self.observe("comic_stage_duration_seconds", wall, stage=stage)
+          self.inc("comic_stage_total", stage=stage, status=status)
+          event = {"event": "stage", "stage": stage, "page": page, "status": status, "wall_s": wall}
+          if cpu:
+              event["cpu_s"] = time.thread_time() - cpu_start
+              self.inc("comic_stage_cpu_seconds_total", event["cpu_s"], stage=stage)
+          event["peak_rss_bytes"] = peak_rss_bytes()
+          if event["peak_rss_bytes"] is not None:
+              self.max_gauge("comic_peak_rss_bytes", event["peak_rss_bytes"])
+          self.trace({**event, **record})
+
+  def _collected(self):
+      """Collector values keyed by (name, labels)"""
+      values = {}
+      for collector in self._collectors:
+          try:
+              for key, value in collector().items():
+                  values[key if isinstance(key, tuple) else (key, ())] = value
+          except Exception as e:
+              self.logger.warning(f"Metrics collector failed: {str(e)}")
+      return values
+
+  def snapshot(self):
+      """All current values as a JSON-friendly dict"""
+      def flatten(items):
+          return [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in items]
+
+      with self._lock:
+          counters = flatten(self._counters.items())
+          gauges = flatten(self._gauges.items())
+          histograms = [
+              {"name": name, "labels": dict(labels), "sum": h["sum"], "count": h["count"]}
+              for (name, labels), h in self._histograms.items()
+          ]
+      for (name, labels), value in self._collected().items():
+          (counters if name.endswith("_total") else gauges).append(
+              {"name": name, "labels": dict(labels), "value": value}
+          )
+      return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+  def to_prometheus(self):
+      """Export every metric in the Prometheus text exposition format"""
+      with self._lock:
+          counters = dict(self._counters)
+          gauges = dict(self._gauges)
+          histograms = {key: dict(h, buckets=list(h["buckets"])) for key, h in self._histograms.items()}
+      for (name, labels), value in self._collected().items():
+          (counters if name.endswith("_total") else gauges)[(name, labels)] = value
+
+      lines = []
+      for kind, metrics in (("counter", counters), ("gauge", gauges)):
+          for name in sorted({name for name, _ in metrics}):
+              lines.append(f"# TYPE {name} {kind}")
+              for (metric, labels), value in sorted(metrics.items()):
+                  if metric == name:
+                      lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+      for name in sorted({name for name, _ in histograms}):
+          lines.append(f"# TYPE {name} histogram")
+          for (metric, labels), h in sorted(histograms.items()):
+              if metric != name:
+                  continue
+              for bound, count in zip(DURATION_BUCKETS + (float("inf"),), h["buckets"] + [h["count"]]):
+                  lines.append(f"{name}_bucket{_format_labels(labels, [('le', _format_value(bound))])} {count}")
+              lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(h['sum'])}")
+              lines.append(f"{name}_count{_format_labels(labels)} {h['count']}")
+      return "\n".join(lines) + "\n"
+
+  def write_prometheus(self, path):
+      Path(path).parent.mkdir(parents=True, exist_ok=True)
+      Path(path).write_text(self.to_prometheus(), encoding="utf-8")
+
+  def close(self):
+      with self._lock:
+          if self._trace is not None:
+              self._trace.close()
+              self._trace = None
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+def get_default_registry():
+  """Registry shared by module-level helpers such as traducao.py"""
+  global _default_registry
+  with _default_lock:
+      if _default_registry is None:
+          _default_registry = MetricsRegistry()
+      return _default_registry
+
+def timed(stage, registry=None):
+  """Decorator recording every call of a function as a stage span"""
+  def decorate(fn):
+      @wraps(fn)
+      def wrapper(*args, **kwargs):
+          with (registry or get_default_registry()).span(stage) as record:
+              result = fn(*args, **kwargs)
+              # Some stages return a tuple of Nones when they fail
+              failed_tuple = isinstance(result, tuple) and result and all(item is None for item in result)
+              if result is None or result is False or failed_tuple:
+                  record["status"] = "failed"
+              return result
+      return wrapper
+  return decorate
+
+@contextmanager
+def profiled(path):
+  """Capture a cProfile of the block into `path`"""
+  import cProfile
+
+  path = Path(path)
+  profiler = cProfile.Profile()
+  profiler.enable()
+  try:
+      yield profiler
+  finally:
+      profiler.disable()
+      path.parent.mkdir(parents=True, exist_ok=True)
+      profiler.dump_stats(path)
@@ -0,0 +1,91 @@
+# src/comic_translator/ocr_backends.py
+"""
+CPU inference options for the OCR predictor.
+
+  torch       the doctr PyTorch models (default)
+  torch-int8  the same models with dynamic int8 quantization of their
+              Linear and LSTM layers (the recognition head); only on
+              torch before 2.10, which deprecates torch.ao.quantization
+  onnx        exported models run by ONNX Runtime through onnxtr
+  onnx-int8   onnxtr's 8-bit quantized exports
+
+Lighter architectures are picked with the `det_arch` / `reco_arch` options
+or one of the ARCH_PRESETS; thread counts apply to either runtime.
+"""
+import logging
+
+INFERENCE_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Detection and recognition architectures, from most accurate to fastest on CPU
+ARCH_PRESETS = {
+  "accurate": ("db_resnet50", "crnn_vgg16_bn"),
+  "default": ("fast_base", "crnn_vgg16_bn"),
+  "fast": ("db_mobilenet_v3_large", "crnn_mobilenet_v3_small"),
+}
+
+logger = logging.getLogger(__name__)
+
+def configure_threads(intra_op=None, inter_op=None):
+  """Size torch's intra-op and inter-op thread pools for this process"""
+  if not intra_op and not inter_op:
+      return
+  import torch
+
+  if intra_op:
+      torch.set_num_threads(intra_op)
+  if inter_op:
+      try:
+          torch.set_num_interop_threads(inter_op)
+      except RuntimeError as e:
+          # Only possible once, before any inter-op parallel work has started
+          logger.warning(f"Could not set inter-op threads: {str(e)}")
+
+# torch.ao.quantization is deprecated for removal from this release on
+TORCH_INT8_MAX_VERSION = "2.10"
+
+def check_torch_int8():
+  """Raise if the installed torch no longer supports dynamic int8 quantization"""
+  import torch
+
+  if torch.__version__ >= TORCH_INT8_MAX_VERSION:
+      raise RuntimeError(
+          f"torch-int8 needs torch < {TORCH_INT8_MAX_VERSION} (installed: {torch.__version__}), "
+          "whose torch.ao.quantization is deprecated for removal; use onnx-int8 instead"
+      )
+
+def quantize_predictor(predictor):
+  """Quantize the Linear and LSTM layers of a doctr predictor's models to int8"""
+  import torch
+  from torch import nn
+
+  check_torch_int8()
+
+  for part in ("det_predictor", "reco_predictor"):
+      stage = getattr(predictor, part, None)
+      model = getattr(stage, "model", None)
+      if model is not None:
+          stage.model = torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear, nn.LSTM}, dtype=torch.qint8)
+  return predictor
+
+def onnx_predictor(det_arch, reco_arch, det_bs=2, reco_bs=128, intra_op=None, inter_op=None, int8=False,
+                   **options):
+  """Build an onnxtr predictor running on ONNX Runtime's CPU provider"""
+  try:
+      import onnxruntime
+      from onnxtr.models import EngineConfig, ocr_predictor
+  except ImportError as e:
+      raise ImportError("The onnx OCR backend needs onnxtr: pip install 'onnxtr[cpu]'") from e
+
+  def engine():
+      session = onnxruntime.SessionOptions()
+      session.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+      if intra_op:
+          session.intra_op_num_threads = intra_op
+      if inter_op:
+          session.inter_op_num_threads = inter_op
+      return EngineConfig(providers=["CPUExecutionProvider"], session_options=session)
+
+  return ocr_predictor(
+      det_arch=det_arch, reco_arch=reco_arch, det_bs=det_bs, reco_bs=reco_bs, load_in_8_bit=int8,
+      det_engine_cfg=engine(), reco_engine_cfg=engine(), clf_engine_cfg=engine(), **options
+  )
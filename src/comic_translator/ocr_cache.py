@@ -0,0 +1,60 @@
+# src/comic_translator/ocr_cache.py
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+class OCRCache:
+  """
+  On-disk cache of raw word-level OCR output.
+
+  Entries are keyed by the SHA-256 of the image bytes plus the OCR model
+  configuration, so the same page is never run through the predictor twice
+  with the same models. Only words (text, geometry, confidence) are stored;
+  grouping is always recomputed from them.
+  """
+  def __init__(self, root="data/cache/ocr"):
+      self.logger = logging.getLogger(__name__)
+      self.root = Path(root)
+      self.root.mkdir(parents=True, exist_ok=True)
+      self.hits = 0
+      self.misses = 0
+
+  def key(self, image_digest, config):
+      """Combine an image digest and a model configuration into a cache key"""
+      config_blob = json.dumps(config, sort_keys=True, default=str)
+      return hashlib.sha256(f"{image_digest}:{config_blob}".encode("utf-8")).hexdigest()
+
+  def _path(self, key):
+      return self.root / key[:2] / f"{key}.json"
+
+  def get(self, key):
+      """Return the cached words for `key`, or None"""
+      path = self._path(key)
+      try:
+          with open(path, "r", encoding="utf-8") as f:
+              words = json.load(f)["words"]
+      except FileNotFoundError:
+          self.misses += 1
+          return None
+      except (ValueError, KeyError) as e:
+          self.logger.warning(f"Ignoring corrupt OCR cache entry {path}: {str(e)}")
+          self.misses += 1
+          return None
+      self.hits += 1
+      return words
+
+  def put(self, key, words, config=None):
+      """Store the words for `key` atomically"""
+      path = self._path(key)
+      path.parent.mkdir(parents=True, exist_ok=True)
+      fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+      try:
+          with os.fdopen(fd, "w", encoding="utf-8") as f:
+              json.dump({"config": config, "words": words}, f, ensure_ascii=False)
+          os.replace(tmp_path, path)
+      except BaseException:
+          os.unlink(tmp_path)
+          raise
@@ -0,0 +1,105 @@
+# src/comic_translator/ocr_pool.py
+"""
+Multi-core OCR with a pool of worker processes.
+
+A single predictor runs one page at a time no matter how many cores the
+machine has. OCRPool starts `processes` workers that each load their own
+TextExtractor (and model) once, with torch pinned to `threads` intra-op
+threads so the workers together do not oversubscribe the cores. Pages are
+handed to the workers by path and each worker reads the image itself, so
+only the word records travel back to the parent.
+
+Workers are started with the "spawn" method: forking a process that has
+already started torch's thread pools can deadlock.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# The TextExtractor of the current worker process
+_extractor = None
+
+def default_threads(processes):
+  """Split the machine's cores evenly between `processes` workers"""
+  return max(1, (os.cpu_count() or 1) // processes)
+
+def _start_worker(options, threads):
+  """Load the OCR model of one worker process"""
+  global _extractor
+  # OpenMP and MKL read these when torch is first imported
+  for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+      os.environ[name] = str(threads)
+  from .text_extraction import TextExtractor
+  _extractor = TextExtractor(use_cache=False, intra_op_threads=threads, inter_op_threads=1, **options)
+
+def _read_words(image_path):
+  return _extractor.extract_words(image_path)
+
+class OCRPool:
+  """
+  Worker processes that each hold one OCR predictor.
+
+  `options` are the TextExtractor options every worker is built with; an
+  injected `predictor` must be picklable and is copied into each worker.
+  Workers start on first use and stay up until close().
+  """
+  def __init__(self, processes, threads=None, start_method="spawn", **options):
+      self.logger = logging.getLogger(__name__)
+      self.processes = max(1, int(processes))
+      self.threads = threads or default_threads(self.processes)
+      self.start_method = start_method
+      self.options = options
+      self._executor = None
+
+  def _pool(self):
+      if self._executor is None:
+          self._executor = ProcessPoolExecutor(
+              max_workers=self.processes,
+              mp_context=multiprocessing.get_context(self.start_method),
+              initializer=_start_worker,
+              initargs=(self.options, self.threads)
+          )
+          self.logger.info(f"Started {self.processes} OCR processes with {self.threads} threads each")
+      return self._executor
+
+  def start(self):
+      """Start every worker, wait until its model is loaded and return the worker pids"""
+      futures = [self._pool().submit(os.getpid) for _ in range(self.processes)]
+      return sorted({future.result() for future in futures})
+
+  def submit(self, image_path):
+      """Queue one page and return a future for its words"""
+      return self._pool().submit(_read_words, str(image_path))
+
+  def words(self, image_path):
+      """OCR one page in a worker process and return its words"""
+      return self.submit(image_path).result()
+
+  def map(self, image_paths):
+      """
+      OCR many pages across the workers.
+
+      Returns one entry per input path, in input order: the page's words, or
+      the exception raised while reading it.
+      """
+      futures = [self.submit(path) for path in image_paths]
+      results = []
+      for future in futures:
+          try:
+              results.append(future.result())
+          except Exception as e:
+              results.append(e)
+      return results
+
+  def close(self):
+      """Stop the worker processes"""
+      if self._executor is not None:
+          self._executor.shutdown(wait=True, cancel_futures=True)
+          self._executor = None
+
+  def __enter__(self):
+      return self
+
+  def __exit__(self, *exc):
+      self.close()
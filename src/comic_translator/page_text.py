@@ -0,0 +1,199 @@
+# src/comic_translator/page_text.py
+"""
+Columnar storage for the extracted and translated text of a page.
+
+Grouped page text is a list of groups, each holding its words. In the `.npz`
+format every column is one array: word and group boxes as float32, word
+confidences, group offsets into the word arrays, and all strings (texts,
+line ids, translations) as indices into a single UTF-8 string table. Files
+with any other suffix are read and written as JSON, so both formats can be
+used side by side:
+
+  python -m comic_translator.page_text data/extracted_text/page1_text.npz
+"""
+from collections.abc import Sequence
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+from .records import TextGroup, TranslatedGroup, Word, as_group, to_dicts
+from .utils import save_json, load_json
+
+# File suffix of each intermediate text format
+TEXT_FORMATS = {"json": ".json", "npz": ".npz"}
+
+def text_suffix(text_format):
+  if text_format not in TEXT_FORMATS:
+      raise ValueError(f"Unknown text format: {text_format}")
+  return TEXT_FORMATS[text_format]
+
+class StringTable:
+  """Deduplicated strings stored as one UTF-8 blob plus offsets"""
+  def __init__(self):
+      self.index = {}
+      self.strings = []
+
+  def add(self, text):
+      idx = self.index.get(text)
+      if idx is None:
+          idx = self.index[text] = len(self.strings)
+          self.strings.append(text)
+      return idx
+
+  def arrays(self):
+      encoded = [text.encode("utf-8") for text in self.strings]
+      offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+      offsets[1:] = np.cumsum([len(blob) for blob in encoded])
+      return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _row(row):
+  return tuple(float(v) for v in row)
+
+def to_columns(groups):
+  """Convert grouped page text (extracted or translated records or dicts) into arrays"""
+  groups = [as_group(group) for group in groups]
+  translated = bool(groups) and isinstance(groups[0], TranslatedGroup)
+  table = StringTable()
+
+  words = [word for group in groups for word in group.words]
+  word_box = np.array([w.box for w in words], dtype=np.float32).reshape(-1, 4)
+  original_box = np.array([w.original_box or w.box for w in words], dtype=np.float32).reshape(-1, 4)
+  columns = {
+      "kind": np.array("translated" if translated else "extracted"),
+      "word_text": np.array([table.add(w.text) for w in words], dtype=np.int32),
+      "word_line": np.array([table.add(w.line_idx) for w in words], dtype=np.int32),
+      "word_box": word_box,
+      "word_confidence": np.array([w.confidence for w in words], dtype=np.float32),
+      "group_offsets": np.cumsum([0] + [len(group.words) for group in groups], dtype=np.int64),
+      "group_text": np.array([table.add(group.original_text if translated else group.text) for group in groups],
+                             dtype=np.int32),
+      "group_box": np.array([group.box for group in groups], dtype=np.float32).reshape(-1, 4),
+  }
+  # Boxes are only stored twice when OCR post-processing moved them
+  if not np.array_equal(original_box, word_box):
+      columns["word_original_box"] = original_box
+  if translated:
+      columns["group_translation"] = np.array([table.add(group.translated_text) for group in groups],
+                                              dtype=np.int32)
+  else:
+      columns["group_line"] = np.array([table.add(group.line_idx) for group in groups], dtype=np.int32)
+  columns["strings"], columns["string_offsets"] = table.arrays()
+  return columns
+
+class PageText(Sequence):
+  """
+  Read-only view of a columnar page text file.
+
+  The arrays are read when the file is opened; TextGroup or TranslatedGroup
+  records are only built when a group is accessed.
+  """
+  def __init__(self, columns):
+      self.columns = columns
+      self.translated = str(columns["kind"]) == "translated"
+      self._offsets = columns["group_offsets"]
+      self._blob = columns["strings"].tobytes()
+      self._string_offsets = columns["string_offsets"]
+      self._strings = {}
+
+  @classmethod
+  def open(cls, path):
+      with np.load(path, allow_pickle=False) as npz:
+          return cls({name: npz[name] for name in npz.files})
+
+  def string(self, idx):
+      text = self._strings.get(idx)
+      if text is None:
+          start, end = self._string_offsets[idx], self._string_offsets[idx + 1]
+          text = self._strings[idx] = self._blob[start:end].decode("utf-8")
+      return text
+
+  def __len__(self):
+      return len(self._offsets) - 1
+
+  def words(self, index):
+      """The words of one group"""
+      columns = self.columns
+      original = columns.get("word_original_box", columns["word_box"])
+      return [
+          Word(
+              self.string(columns["word_text"][i]), _row(columns["word_box"][i]),
+              self.string(columns["word_line"][i]), float(columns["word_confidence"][i]),
+              _row(original[i])
+          )
+          for i in range(self._offsets[index], self._offsets[index + 1])
+      ]
+
+  def __getitem__(self, index):
+      if isinstance(index, slice):
+          return [self[i] for i in range(*index.indices(len(self)))]
+      if index < 0:
+          index += len(self)
+      if not 0 <= index < len(self):
+          raise IndexError("group index out of range")
+
+      columns = self.columns
+      text = self.string(columns["group_text"][index])
+      box = _row(columns["group_box"][index])
+      if self.translated:
+          return TranslatedGroup(text, self.string(columns["group_translation"][index]), box, self.words(index))
+      return TextGroup(text, self.words(index), box, self.string(columns["group_line"][index]))
+
+  def texts(self):
+      """Group texts only, without building the word records"""
+      return [self.string(idx) for idx in self.columns["group_text"]]
+
+  def to_list(self):
+      return [self[i] for i in range(len(self))]
+
+def save_page_text(groups, path):
+  """Save grouped page text in the format given by the file suffix"""
+  path = Path(path)
+  if path.suffix != ".npz":
+      save_json(to_dicts(groups), path)
+      return
+  fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+  try:
+      with os.fdopen(fd, "wb") as f:
+          np.savez(f, **to_columns(groups))
+      os.replace(tmp_path, path)
+  except BaseException:
+      os.unlink(tmp_path)
+      raise
+
+def load_page_text(path):
+  """Load grouped page text as records; `.npz` files are returned as a lazy PageText"""
+  if Path(path).suffix == ".npz":
+      return PageText.open(path)
+  return [as_group(group) for group in load_json(path)]
+
+def group_texts(groups):
+  """The text of every group of extracted page text"""
+  if isinstance(groups, PageText) and not groups.translated:
+      return groups.texts()
+  return [group.text for group in groups]
+
+def export_json(path, json_path=None):
+  """Write a page text file as JSON for debugging and return the JSON path"""
+  json_path = Path(json_path) if json_path else Path(path).with_suffix(".json")
+  save_json(to_dicts(load_page_text(path)), json_path)
+  return json_path
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(prog="comic-translator-page-text",
+                                   description="Export columnar page text files as JSON.")
+  parser.add_argument("paths", nargs="+", help=".npz files to export")
+  parser.add_argument("--stdout", action="store_true", help="print the JSON instead of writing files")
+  args = parser.parse_args(argv)
+  for path in args.paths:
+      if args.stdout:
+          groups = load_page_text(path)
+          print(json.dumps(to_dicts(groups), ensure_ascii=False, indent=2))
+      else:
+          print(export_json(path))
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
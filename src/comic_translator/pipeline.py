@@ -0,0 +1,139 @@
+# src/comic_translator/pipeline.py
+import logging
+import queue
+import threading
+
+_STOP = object()
+
+class PageJob:
+  """State of a single page as it moves through the pipeline"""
+  def __init__(self, url, page_name, target_lang="en"):
+      self.url = url
+      self.page_name = page_name
+      self.target_lang = target_lang
+      self.image_path = None
+      self.extracted_path = None
+      self.extracted_data = None
+      self.translated_path = None
+      self.translated_data = None
+      self.output_path = None
+      self.failed_stage = None
+      self.manifest = None
+      # PagePrefetcher already downloading this page, if any
+      self.prefetch = None
+
+  @property
+  def succeeded(self):
+      return self.failed_stage is None and self.output_path is not None
+
+class Stage:
+  """
+  A pipeline stage served by its own pool of worker threads.
+
+  `handler(job)` must return a truthy value on success. When `handler_factory`
+  is given it is called once per worker thread to build that worker's handler,
+  so stages can hold resources that are not thread-safe (browsers, images).
+  """
+  def __init__(self, name, handler=None, workers=1, handler_factory=None):
+      if handler is None and handler_factory is None:
+          raise ValueError(f"Stage {name} needs a handler or a handler_factory")
+      self.name = name
+      self.handler = handler
+      self.workers = max(1, int(workers))
+      self.handler_factory = handler_factory
+
+  def make_handler(self):
+      if self.handler_factory is not None:
+          return self.handler_factory()
+      return self.handler
+
+class StagedPipeline:
+  """
+  Run jobs through a sequence of stages connected by bounded queues.
+
+  Every stage works concurrently on different pages, so the total run time
+  approaches that of the slowest stage instead of the sum of all of them.
+  A job that fails in one stage skips the remaining ones. With a metrics
+  registry, the depth of every stage's input queue is tracked as a gauge.
+  """
+  def __init__(self, stages, queue_size=4, metrics=None):
+      self.logger = logging.getLogger(__name__)
+      self.stages = list(stages)
+      self.queue_size = queue_size
+      self.metrics = metrics
+
+  def _track_depth(self, stage, q):
+      if self.metrics is not None:
+          depth = q.qsize()
+          self.metrics.set_gauge("comic_queue_depth", depth, stage=stage.name)
+          self.metrics.max_gauge("comic_queue_depth_peak", depth, stage=stage.name)
+
+  def run(self, jobs):
+      """Process all jobs and return them in input order"""
+      jobs = list(jobs)
+      if not jobs or not self.stages:
+          return jobs
+
+      queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+      remaining = [stage.workers for stage in self.stages]
+      lock = threading.Lock()
+      threads = []
+
+      def worker(index):
+          stage = self.stages[index]
+          try:
+              handler = stage.make_handler()
+          except Exception as e:
+              self.logger.error(f"Failed to start {stage.name} worker: {str(e)}")
+              handler = None
+
+          while True:
+              job = queues[index].get()
+              if job is _STOP:
+                  break
+              self._track_depth(stage, queues[index])
+
+              if job.failed_stage is None:
+                  try:
+                      ok = handler is not None and handler(job)
+                  except Exception as e:
+                      self.logger.error(f"Stage {stage.name} failed for {job.page_name}: {str(e)}")
+                      ok = False
+                  if not ok:
+                      job.failed_stage = stage.name
+
+              # Failed jobs pass through the remaining stages untouched
+              if index + 1 < len(self.stages):
+                  queues[index + 1].put(job)
+                  self._track_depth(self.stages[index + 1], queues[index + 1])
+
+          # The last worker of a stage shuts down the next one
+          with lock:
+              remaining[index] -= 1
+              last = remaining[index] == 0
+          if last and index + 1 < len(self.stages):
+              for _ in range(self.stages[index + 1].workers):
+                  queues[index + 1].put(_STOP)
+
+      for index, stage in enumerate(self.stages):
+          for n in range(stage.workers):
+              thread = threading.Thread(
+                  target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True
+              )
+              thread.start()
+              threads.append(thread)
+
+      for job in jobs:
+          queues[0].put(job)
+          self._track_depth(self.stages[0], queues[0])
+      for _ in range(self.stages[0].workers):
+          queues[0].put(_STOP)
+
+      for thread in threads:
+          thread.join()
+      # Depths sampled while shutting down may still count stop markers
+      if self.metrics is not None:
+          for stage in self.stages:
+              self.metrics.set_gauge("comic_queue_depth", 0, stage=stage.name)
+
+      return jobs
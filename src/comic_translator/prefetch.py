@@ -0,0 +1,72 @@
+# src/comic_translator/prefetch.py
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+
+class PagePrefetcher:
+  """
+  Download the pages of a chapter ahead of the stage that needs them.
+
+  `pages` are (image URL, page name) pairs in reading order, and
+  `download(image_url, page_name)` returns the saved path or None. When page
+  N is requested, pages N+1..N+lookahead are already being downloaded in the
+  background, so once a chapter is underway a page is usually on disk before
+  OCR asks for it. The window keeps at most `lookahead` pages ahead of the
+  reader on disk and on the wire.
+  """
+  def __init__(self, download, pages, lookahead=4, workers=None):
+      self.logger = logging.getLogger(__name__)
+      self.download = download
+      self.pages = list(pages)
+      self.positions = {name: index for index, (_, name) in enumerate(self.pages)}
+      self.lookahead = max(0, int(lookahead))
+      self._executor = ThreadPoolExecutor(
+          max_workers=workers or max(1, self.lookahead), thread_name_prefix="comic-prefetch"
+      )
+      self._futures = {}
+      self._next = 0
+      self._lock = threading.Lock()
+
+      # Pages that were already downloaded when asked for, and pages that were not
+      self.ready = 0
+      self.waited = 0
+
+  def _schedule(self, end):
+      """Start downloading every page before position `end` not started yet"""
+      while self._next < min(end, len(self.pages)):
+          image_url, page_name = self.pages[self._next]
+          self._futures[self._next] = self._executor.submit(self.download, image_url, page_name)
+          self._next += 1
+
+  def start(self):
+      """Begin downloading the first pages before any is requested"""
+      with self._lock:
+          self._schedule(self.lookahead + 1)
+      return self
+
+  def get(self, page_name):
+      """Return the path of a page, waiting for its download if needed"""
+      position = self.positions[page_name]
+      with self._lock:
+          self._schedule(position + self.lookahead + 1)
+          future = self._futures.pop(position, None)
+      if future is None:
+          # Requested a second time: download it again on this thread
+          return self.download(*self.pages[position])
+
+      if future.done():
+          self.ready += 1
+      else:
+          self.waited += 1
+      return future.result()
+
+  def close(self):
+      """Cancel downloads nobody asked for and wait for the ones already running"""
+      self._executor.shutdown(wait=True, cancel_futures=True)
+      self.logger.info(f"Prefetched {self.ready}/{self.ready + self.waited} pages before they were needed")
+
+  def __enter__(self):
+      return self.start()
+
+  def __exit__(self, *exc):
+      self.close()
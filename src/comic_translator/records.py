@@ -0,0 +1,154 @@
+# src/comic_translator/records.py
+"""
+Typed records for the text of a page as it moves between stages.
+
+Words, text groups and translated groups are small slotted objects instead
+of nested dicts. Boxes are (x1, y1, x2, y2) tuples normalized to the page.
+Each record converts to and from the dict layout of the JSON files, and
+fields can still be read by their JSON key (`group["text"]`).
+"""
+
+def _box(bbox):
+  """Convert a [[x1, y1], [x2, y2]] bbox into an (x1, y1, x2, y2) tuple"""
+  (x1, y1), (x2, y2) = bbox
+  return (float(x1), float(y1), float(x2), float(y2))
+
+def _bbox(box):
+  x1, y1, x2, y2 = box
+  return [[x1, y1], [x2, y2]]
+
+class _Record:
+  __slots__ = ()
+  _keys = ()
+
+  def __getitem__(self, key):
+      if key not in self._keys:
+          raise KeyError(key)
+      return getattr(self, key)
+
+  def get(self, key, default=None):
+      return getattr(self, key) if key in self._keys else default
+
+  def __eq__(self, other):
+      return type(other) is type(self) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+  def __repr__(self):
+      fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+      return f"{type(self).__name__}({fields})"
+
+class Word(_Record):
+  """One OCR word; `original_box` is only set when it differs from `box`"""
+  __slots__ = ("text", "box", "line_idx", "confidence", "original_box")
+  _keys = ("text", "bbox", "line_idx", "original_bbox", "confidence")
+
+  def __init__(self, text, box, line_idx="0_0", confidence=1.0, original_box=None):
+      self.text = text
+      self.box = box
+      self.line_idx = line_idx
+      self.confidence = confidence
+      self.original_box = None if original_box == box else original_box
+
+  @property
+  def bbox(self):
+      return _bbox(self.box)
+
+  @property
+  def original_bbox(self):
+      return _bbox(self.original_box or self.box)
+
+  @classmethod
+  def from_dict(cls, data):
+      box = _box(data["bbox"])
+      original = data.get("original_bbox")
+      return cls(
+          data.get("text", ""), box, data.get("line_idx", "0_0"), float(data.get("confidence", 1.0)),
+          _box(original) if original is not None else None
+      )
+
+  def to_dict(self):
+      return {
+          "text": self.text,
+          "bbox": self.bbox,
+          "line_idx": self.line_idx,
+          "original_bbox": self.original_bbox,
+          "confidence": self.confidence
+      }
+
+class TextGroup(_Record):
+  """Words grouped into one speech bubble"""
+  __slots__ = ("text", "words", "box", "line_idx")
+  _keys = ("text", "words", "bbox", "line_idx")
+
+  def __init__(self, text, words, box, line_idx="0_0"):
+      self.text = text
+      self.words = words
+      self.box = box
+      self.line_idx = line_idx
+
+  @property
+  def bbox(self):
+      return _bbox(self.box)
+
+  @classmethod
+  def from_dict(cls, data):
+      return cls(
+          data.get("text", ""), [as_word(w) for w in data.get("words", ())],
+          _box(data["bbox"]), data.get("line_idx", "0_0")
+      )
+
+  def to_dict(self):
+      return {
+          "text": self.text,
+          "words": [word.to_dict() for word in self.words],
+          "bbox": self.bbox,
+          "line_idx": self.line_idx
+      }
+
+class TranslatedGroup(_Record):
+  """A text group with its translation; the words are shared with the source group"""
+  __slots__ = ("original_text", "translated_text", "box", "words")
+  _keys = ("original_text", "translated_text", "bbox", "original_words")
+
+  def __init__(self, original_text, translated_text, box, words):
+      self.original_text = original_text
+      self.translated_text = translated_text
+      self.box = box
+      self.words = words
+
+  @property
+  def bbox(self):
+      return _bbox(self.box)
+
+  @property
+  def original_words(self):
+      return self.words
+
+  @classmethod
+  def from_dict(cls, data):
+      return cls(
+          data.get("original_text", ""), data.get("translated_text", ""),
+          _box(data["bbox"]), [as_word(w) for w in data.get("original_words", ())]
+      )
+
+  def to_dict(self):
+      return {
+          "original_text": self.original_text,
+          "translated_text": self.translated_text,
+          "bbox": self.bbox,
+          "original_words": [word.to_dict() for word in self.words]
+      }
+
+def as_word(word):
+  return word if isinstance(word, Word) else Word.from_dict(word)
+
+def as_group(group):
+  """Return a TextGroup or TranslatedGroup for a record or a JSON dict"""
+  if isinstance(group, (TextGroup, TranslatedGroup)):
+      return group
+  if "translated_text" in group:
+      return TranslatedGroup.from_dict(group)
+  return TextGroup.from_dict(group)
+
+def to_dicts(records):
+  """Convert records to the JSON layout; dicts pass through unchanged"""
+  return [record.to_dict() if isinstance(record, _Record) else record for record in records]
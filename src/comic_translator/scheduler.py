@@ -0,0 +1,390 @@
+# src/comic_translator/scheduler.py
+"""
+Adaptive scheduling of outbound requests.
+
+Every remote host gets a HostLimiter that decides when the next request may
+start:
+
+  - an AIMD concurrency limit, between 1 and `max_concurrency`: it grows by
+    about one request per round trip while the host answers normally, and
+    is cut when the host throttles (429/503), fails (5xx, dropped
+    connections) or slows down well beyond its usual latency;
+  - a token bucket on the request rate, off until the host first throttles,
+    then set below the rate that was being throttled and raised slowly again;
+  - a pause honouring the host's Retry-After.
+
+Failed attempts are retried with jittered exponential backoff. Retries are
+only used for idempotent requests (GETs and translation lookups), and
+interrupted downloads are resumed with a Range request by the fetchers.
+"""
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+
+OK, THROTTLED, FAILED = "ok", "throttled", "failed"
+
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = {408, 500, 502, 504}
+
+def status_of(response):
+  """HTTP status of a requests or aiohttp response, or None for other results"""
+  status = getattr(response, "status_code", None)
+  if status is None:
+      status = getattr(response, "status", None)
+  return status if isinstance(status, int) else None
+
+def retry_after(response):
+  """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+  headers = getattr(response, "headers", None) or {}
+  value = headers.get("Retry-After")
+  if not value:
+      return None
+  try:
+      return max(0.0, float(value))
+  except ValueError:
+      pass
+  try:
+      return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+  except (TypeError, ValueError):
+      return None
+
+def outcome_of(status):
+  if status in THROTTLE_STATUSES:
+      return THROTTLED
+  if status in RETRY_STATUSES:
+      return FAILED
+  return OK
+
+# Transport errors of the HTTP clients; a client is only looked up once it is loaded
+TRANSPORT_ERRORS = {
+  "requests.exceptions": ("ConnectionError", "Timeout", "ChunkedEncodingError"),
+  "aiohttp": ("ClientConnectionError", "ClientPayloadError", "ServerTimeoutError"),
+}
+
+def is_transport_error(exc):
+  """True for dropped connections, timeouts and truncated bodies"""
+  if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+      return True
+  for module_name, names in TRANSPORT_ERRORS.items():
+      module = sys.modules.get(module_name)
+      if module is not None and isinstance(exc, tuple(getattr(module, name) for name in names)):
+          return True
+  return False
+
+def exception_outcome(exc):
+  """How a request that raised `exc` counts, or None if retrying cannot help"""
+  name = type(exc).__name__
+  # Errors of the translation client
+  if "TooManyRequests" in name:
+      return THROTTLED
+  if name == "RequestError" or is_transport_error(exc):
+      return FAILED
+  return None
+
+class HostLimiter:
+  """Concurrency limit, rate limit and counters of one remote host"""
+  def __init__(self, host, max_concurrency=4, max_rate=None, min_rate=0.5, rate_step=1.0,
+               latency_factor=3.0, latency_margin=0.1):
+      self.host = host
+      self.max_concurrency = max(1, int(max_concurrency))
+      self.limit = float(self.max_concurrency)
+      # Requests per second; None until the host throttles us
+      self.rate = None
+      self.max_rate = max_rate
+      self.min_rate = min_rate
+      self.rate_step = rate_step
+      self.tokens = 1.0
+      self.refilled = time.monotonic()
+      self.latency_factor = latency_factor
+      self.latency_margin = latency_margin
+      self.latency = None
+      self.base_latency = None
+      self.in_flight = 0
+      self.paused_until = 0.0
+      self.requests = 0
+      self.throttled = 0
+      self.errors = 0
+      self.retries = 0
+      self._last_decrease = 0.0
+      self._started = deque()
+      self._cond = threading.Condition()
+      # (loop, event) of coroutines waiting for a free slot, oldest first
+      self._async_waiters = deque()
+
+  def _wait_time(self, now):
+      """Seconds until a request may start, 0 to start now, or None to wait for a release"""
+      if now < self.paused_until:
+          return self.paused_until - now
+      if self.in_flight >= max(1, int(self.limit)):
+          return None
+      if self.rate:
+          burst = max(1.0, self.rate)
+          self.tokens = min(burst, self.tokens + (now - self.refilled) * self.rate)
+          self.refilled = now
+          if self.tokens < 1:
+              return (1 - self.tokens) / self.rate
+      return 0
+
+  def _admit(self, now):
+      self.in_flight += 1
+      self.requests += 1
+      if self.rate:
+          self.tokens -= 1
+      self._started.append(now)
+      while self._started and now - self._started[0] > 5.0:
+          self._started.popleft()
+
+  def acquire(self):
+      """Block until a request to the host may start"""
+      with self._cond:
+          while True:
+              now = time.monotonic()
+              wait = self._wait_time(now)
+              if wait == 0:
+                  self._admit(now)
+                  return
+              self._cond.wait(timeout=wait)
+
+  async def acquire_async(self):
+      """Wait on the event loop until a request to the host may start"""
+      loop = asyncio.get_running_loop()
+      while True:
+          event = asyncio.Event()
+          with self._cond:
+              now = time.monotonic()
+              wait = self._wait_time(now)
+              if wait == 0:
+                  self._admit(now)
+                  return
+              if wait is None:
+                  self._async_waiters.append((loop, event))
+          if wait is not None:
+              # Paused or out of tokens: nothing to wait for but the clock
+              await asyncio.sleep(wait)
+              continue
+          try:
+              await event.wait()
+          except asyncio.CancelledError:
+              with self._cond:
+                  try:
+                      self._async_waiters.remove((loop, event))
+                  except ValueError:
+                      # Already woken for a slot; hand the wakeup on
+                      self._wake_async()
+              raise
+
+  def _wake_async(self):
+      """Wake one waiting coroutine per free slot; called with the lock held"""
+      free = max(1, int(self.limit)) - self.in_flight
+      while free > 0 and self._async_waiters:
+          loop, event = self._async_waiters.popleft()
+          try:
+              loop.call_soon_threadsafe(event.set)
+          except RuntimeError:
+              # Its loop is closed
+              continue
+          free -= 1
+
+  def _observed_rate(self, now):
+      if not self._started:
+          return self.min_rate
+      return len(self._started) / max(now - self._started[0], 1.0)
+
+  def _decrease(self, now, factor, throttled):
+      # Responses to requests sent before the last cut carry no new signal
+      if now - self._last_decrease < max(self.latency or 0.0, 0.1):
+          return
+      self._last_decrease = now
+      self.limit = max(1.0, self.limit * factor)
+      if throttled:
+          observed = self._observed_rate(now)
+          rate = min(self.rate, observed) if self.rate else observed
+          self.rate = max(self.min_rate, rate * factor)
+          self.tokens, self.refilled = 0.0, now
+
+  def _increase(self):
+      self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+      if self.rate:
+          # About `rate_step` more requests per second for every second of success
+          self.rate += self.rate_step / self.rate
+          if self.max_rate:
+              self.rate = min(self.rate, self.max_rate)
+
+  def release(self, outcome, latency, wait=None):
+      """Return a slot and adapt the limits to how the request went"""
+      with self._cond:
+          now = time.monotonic()
+          self.in_flight -= 1
+          if outcome == OK:
+              self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+              # The baseline follows the fastest recent latency and only creeps up
+              self.base_latency = (
+                  self.latency if self.base_latency is None else min(self.latency, self.base_latency * 1.01)
+              )
+              if (self.latency > self.latency_factor * self.base_latency
+                      and self.latency - self.base_latency > self.latency_margin):
+                  self._decrease(now, 0.9, throttled=False)
+              else:
+                  self._increase()
+          elif outcome == THROTTLED:
+              self.throttled += 1
+              self._decrease(now, 0.5, throttled=True)
+          elif outcome == FAILED:
+              self.errors += 1
+              self._decrease(now, 0.5, throttled=False)
+          if wait:
+              self.paused_until = max(self.paused_until, now + wait)
+          self._cond.notify_all()
+          self._wake_async()
+
+  def count_retry(self):
+      with self._cond:
+          self.retries += 1
+
+  def state(self):
+      """Current limits and counters, for monitoring"""
+      with self._cond:
+          return {
+              "concurrency_limit": self.limit,
+              "max_concurrency": self.max_concurrency,
+              "in_flight": self.in_flight,
+              "rate_limit": self.rate,
+              "latency_s": self.latency,
+              "paused_s": max(0.0, self.paused_until - time.monotonic()),
+              "requests": self.requests,
+              "throttled": self.throttled,
+              "errors": self.errors,
+              "retries": self.retries,
+          }
+
+class Attempt:
+  """
+  One try of a request, holding one of its host's slots.
+
+  Used as a (async) context manager around the request. `report(response)`
+  records the answer and returns True when it should be retried. Errors
+  that a retry can fix are swallowed on exit unless this was the last try.
+  """
+  def __init__(self, limiter, last):
+      self.limiter = limiter
+      self.last = last
+      self.outcome = None
+      self.latency = None
+      self.wait = None
+      self.retry = False
+      self.started = None
+
+  def report(self, response):
+      self.latency = time.monotonic() - self.started
+      self.outcome = outcome_of(status_of(response))
+      self.wait = retry_after(response) if self.outcome != OK else None
+      self.retry = self.outcome != OK and not self.last
+      return self.retry
+
+  def _finish(self, exc):
+      if exc is not None:
+          outcome = exception_outcome(exc)
+          if outcome is not None:
+              self.outcome = outcome
+              self.retry = not self.last
+      latency = self.latency if self.latency is not None else time.monotonic() - self.started
+      self.limiter.release(self.outcome, latency, self.wait)
+      return exc is not None and self.retry
+
+  def __enter__(self):
+      self.limiter.acquire()
+      self.started = time.monotonic()
+      return self
+
+  def __exit__(self, exc_type, exc, tb):
+      return self._finish(exc)
+
+  async def __aenter__(self):
+      await self.limiter.acquire_async()
+      self.started = time.monotonic()
+      return self
+
+  async def __aexit__(self, exc_type, exc, tb):
+      return self._finish(exc)
+
+class RequestScheduler:
+  """
+  Shared admission control and retry policy for outbound requests.
+
+  Limits are kept per host, so one scheduler can serve every fetcher and
+  backend that talks to the same remotes. `max_concurrency` caps each host;
+  the adaptive limit never exceeds it.
+  """
+  def __init__(self, max_concurrency=4, max_retries=4, backoff_base=0.5, backoff_max=30.0, **limiter_options):
+      self.logger = logging.getLogger(__name__)
+      self.max_concurrency = max_concurrency
+      self.max_retries = max_retries
+      self.backoff_base = backoff_base
+      self.backoff_max = backoff_max
+      self.limiter_options = limiter_options
+      self._hosts = {}
+      self._lock = threading.Lock()
+
+  def host(self, url):
+      """The limiter of the host of `url` (or of a bare host name)"""
+      host = urlparse(url).netloc or url
+      with self._lock:
+          limiter = self._hosts.get(host)
+          if limiter is None:
+              limiter = self._hosts[host] = HostLimiter(host, self.max_concurrency, **self.limiter_options)
+          return limiter
+
+  def retry_delay(self, number, wait=None):
+      """Jittered exponential backoff before retry `number` (0-based), at least `wait`"""
+      ceiling = min(self.backoff_max, self.backoff_base * 2 ** number)
+      return max(wait or 0.0, ceiling / 2 + random.uniform(0, ceiling / 2))
+
+  def _attempts(self, url):
+      limiter = self.host(url)
+      for number in range(self.max_retries + 1):
+          yield number, limiter, Attempt(limiter, last=number == self.max_retries)
+
+  def attempts(self, url):
+      """Yield Attempts for `url` until one needs no retry, sleeping in between"""
+      for number, limiter, attempt in self._attempts(url):
+          yield attempt
+          if not attempt.retry:
+              return
+          delay = self.retry_delay(number, attempt.wait)
+          limiter.count_retry()
+          self.logger.info(f"Retrying {url} in {delay:.2f}s after a {attempt.outcome} attempt")
+          time.sleep(delay)
+
+  async def attempts_async(self, url):
+      """Async version of attempts"""
+      for number, limiter, attempt in self._attempts(url):
+          yield attempt
+          if not attempt.retry:
+              return
+          delay = self.retry_delay(number, attempt.wait)
+          limiter.count_retry()
+          self.logger.info(f"Retrying {url} in {delay:.2f}s after a {attempt.outcome} attempt")
+          await asyncio.sleep(delay)
+
+  def call(self, url, send):
+      """Run the idempotent request `send()` against the host of `url`, retrying as needed"""
+      result = None
+      for attempt in self.attempts(url):
+          with attempt:
+              result = send()
+              if attempt.report(result):
+                  continue
+              return result
+      return result
+
+  def state(self):
+      """Limits and counters of every host seen so far"""
+      with self._lock:
+          limiters = list(self._hosts.values())
+      return {limiter.host: limiter.state() for limiter in limiters}
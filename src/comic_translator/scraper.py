@@ -0,0 +1,174 @@
+# src/comic_translator/scraper.py
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) comic-translator"}
+
+class _ReaderPageParser(HTMLParser):
+  """Collect the comic image attributes and inline scripts of a reader page"""
+  def __init__(self):
+      super().__init__()
+      self.image_sources = []
+      self.scripts = []
+      self._in_script = False
+
+  def handle_starttag(self, tag, attrs):
+      attrs = dict(attrs)
+      if tag == "img" and "img-fluid" in (attrs.get("class") or "").split():
+          src = attrs.get("ng-src")
+          if src:
+              self.image_sources.append(src)
+      elif tag == "script":
+          self._in_script = True
+          self.scripts.append("")
+
+  def handle_endtag(self, tag):
+      if tag == "script":
+          self._in_script = False
+
+  def handle_data(self, data):
+      if self._in_script:
+          self.scripts[-1] += data
+
+def _script_value(script, name):
+  """Read a `vm.<name> = <json>;` assignment from an inline script"""
+  match = re.search(rf"vm\.{name}\s*=\s*(.+?);\s*$", script, re.MULTILINE)
+  if not match:
+      return None
+  try:
+      return json.loads(match.group(1))
+  except ValueError:
+      return None
+
+def chapter_image(chapter):
+  """Format an encoded chapter id ("100105") the way the reader names images ("0010.5")"""
+  number, decimal = chapter[1:-1], chapter[-1]
+  return number if decimal == "0" else f"{number}.{decimal}"
+
+def page_image(page):
+  """Format a page number the way the reader names images ("001")"""
+  return f"{int(page):03d}"
+
+def page_number(url, default=1):
+  match = re.search(r"-page-(\d+)", url)
+  return int(match.group(1)) if match else default
+
+def chapter_page_url(url, page):
+  """The reader URL of another page of the same chapter"""
+  if re.search(r"-page-\d+", url):
+      return re.sub(r"-page-\d+", f"-page-{page}", url, count=1)
+  # Chapter URLs without a page number open the first page
+  return re.sub(r"(\.html?)?$", lambda match: f"-page-{page}{match.group(1) or ''}", url, count=1)
+
+def chapter_name(url):
+  """Name a chapter after its reader URL ("Some-Comic-chapter-10.5")"""
+  stem = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+  stem = re.sub(r"\.html?$", "", stem)
+  return re.sub(r"-page-\d+$", "", stem)
+
+def _chapter_payload(scripts):
+  """Return the (CurPathName, IndexName, CurChapter) values embedded in a reader page, or None"""
+  for script in scripts:
+      path_name = _script_value(script, "CurPathName")
+      index_name = _script_value(script, "IndexName")
+      chapter = _script_value(script, "CurChapter")
+      if path_name and index_name and chapter:
+          return path_name, index_name, chapter
+  return None
+
+def _payload_image_url(payload, page_url, page):
+  path_name, index_name, chapter = payload
+  directory = chapter.get("Directory") or ""
+  directory = f"{directory}/" if directory else ""
+  scheme = urlparse(page_url).scheme or "https"
+  return (
+      f"{scheme}://{path_name}/manga/{index_name}/{directory}"
+      f"{chapter_image(chapter['Chapter'])}-{page_image(page)}.png"
+  )
+
+def image_url_from_payload(scripts, page_url):
+  """Rebuild the comic image URL from the reader's embedded chapter payload"""
+  payload = _chapter_payload(scripts)
+  if payload is None:
+      return None
+  return _payload_image_url(payload, page_url, page_number(page_url))
+
+def parse_image_url(html, page_url):
+  """
+  Find the comic image URL in a reader page without running its JavaScript.
+
+  A literal `img.img-fluid[ng-src]` is used when present. Templated sources
+  (`{{vm...}}`) are rebuilt from the chapter payload embedded in the page.
+  Returns None when neither is available.
+  """
+  parser = _ReaderPageParser()
+  parser.feed(html)
+
+  for src in parser.image_sources:
+      if "{{" not in src:
+          return urljoin(page_url, src)
+
+  return image_url_from_payload(parser.scripts, page_url)
+
+def fetch_image_url(url, session, timeout=10):
+  """Fetch a reader page over plain HTTP and return its comic image URL, or None"""
+  try:
+      response = session.get(url, headers=HEADERS, timeout=timeout)
+      if response.status_code != 200:
+          logger.debug(f"Reader page returned {response.status_code}: {url}")
+          return None
+      return parse_image_url(response.text, response.url or url)
+  except Exception as e:
+      logger.debug(f"Browserless lookup failed for {url}: {str(e)}")
+      return None
+
+async def fetch_image_url_async(url, fetcher):
+  """Async version of fetch_image_url using an AsyncHttpFetcher"""
+  try:
+      response, html = await fetcher.get_text(url)
+      if response.status != 200:
+          logger.debug(f"Reader page returned {response.status}: {url}")
+          return None
+      return parse_image_url(html, str(response.url) or url)
+  except Exception as e:
+      logger.debug(f"Browserless lookup failed for {url}: {str(e)}")
+      return None
+
+def parse_chapter_pages(html, page_url):
+  """
+  List every page of the chapter a reader page belongs to.
+
+  The embedded chapter payload carries the page count (`CurChapter.Page`),
+  so all image URLs are known from any single page of the chapter. Returns
+  a list of (reader page URL, image URL) pairs, or None without a payload.
+  """
+  parser = _ReaderPageParser()
+  parser.feed(html)
+  payload = _chapter_payload(parser.scripts)
+  if payload is None:
+      return None
+  try:
+      count = int(payload[2].get("Page"))
+  except (TypeError, ValueError):
+      return None
+  return [
+      (chapter_page_url(page_url, page), _payload_image_url(payload, page_url, page))
+      for page in range(1, count + 1)
+  ]
+
+def fetch_chapter_pages(url, session, timeout=10):
+  """Fetch one reader page over plain HTTP and list its chapter's pages, or return None"""
+  try:
+      response = session.get(url, headers=HEADERS, timeout=timeout)
+      if response.status_code != 200:
+          logger.debug(f"Reader page returned {response.status_code}: {url}")
+          return None
+      return parse_chapter_pages(response.text, response.url or url)
+  except Exception as e:
+      logger.debug(f"Chapter lookup failed for {url}: {str(e)}")
+      return None
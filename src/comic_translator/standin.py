@@ -0,0 +1,247 @@
+# src/comic_translator/standin.py
+"""A local HTTP stand-in for the comic reader site, used by tests and benchmarks"""
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate
+import hashlib
+import json
+import re
+import threading
+import time
+from .scraper import chapter_image, page_image
+
+READER_TEMPLATE = """<html>
+<head><title>{title}</title></head>
+<body>
+<div class="ImageGallery">
+{image}
+</div>
+{script}
+</body>
+</html>
+"""
+
+class StandinSite:
+  """
+  Serve reader pages and comic images from a background thread.
+
+  Reader pages come in three flavours, matching what the real site can look
+  like to a client: "static" pages carry a literal `img.img-fluid[ng-src]`,
+  "payload" pages carry an Angular template plus the embedded chapter data,
+  and "script" pages only show the image once JavaScript has run.
+
+  The site can also behave like a rate-limiting origin (see throttle) and
+  answers Range requests for partial downloads.
+  """
+  def __init__(self, host="127.0.0.1", port=0):
+      self.routes = {}
+      self.hits = Counter()
+      self.transfers = Counter()
+      self.active = 0
+      self.max_active = 0
+      self.throttled = 0
+      self.ranges = []
+      self.limits = {}
+      self._tokens = 0.0
+      self._refilled = time.monotonic()
+      self._lock = threading.Lock()
+      site = self
+
+      class Handler(BaseHTTPRequestHandler):
+          def do_GET(self):
+              site._serve(self, send_body=True)
+
+          def do_HEAD(self):
+              site._serve(self, send_body=False)
+
+          def log_message(self, format, *args):
+              pass
+
+      self.server = ThreadingHTTPServer((host, port), Handler)
+      self.server.daemon_threads = True
+      self.host, self.port = self.server.server_address[:2]
+      self._thread = None
+
+  def start(self):
+      self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+      self._thread.start()
+      return self
+
+  def stop(self):
+      self.server.shutdown()
+      self.server.server_close()
+
+  def __enter__(self):
+      return self.start()
+
+  def __exit__(self, *exc):
+      self.stop()
+
+  def url(self, path):
+      return f"http://{self.host}:{self.port}{path}"
+
+  def add(self, path, body, content_type="text/html; charset=utf-8", headers=None, delay=0, cut=None):
+      """
+      Serve `body` at `path`, optionally after `delay` seconds.
+
+      With `cut`, the first full response drops the connection after that
+      many bytes of the body, like a transfer interrupted by the network.
+      """
+      if isinstance(body, str):
+          body = body.encode("utf-8")
+      self.routes[path] = {
+          "body": body, "content_type": content_type, "headers": dict(headers or {}), "delay": delay,
+          "cut": cut
+      }
+      return self.url(path)
+
+  def throttle(self, max_active=None, rate=None, retry_after=None):
+      """
+      Answer 429 to requests beyond `max_active` at a time or `rate` per second.
+
+      Every 429 carries `retry_after` as its Retry-After header, if given.
+      """
+      with self._lock:
+          self.limits = {"max_active": max_active, "rate": rate, "retry_after": retry_after}
+          self._tokens = float(rate or 0)
+          self._refilled = time.monotonic()
+
+  def _over_limit(self):
+      """Whether the request just counted in `active` must be throttled"""
+      max_active, rate = self.limits.get("max_active"), self.limits.get("rate")
+      if max_active and self.active > max_active:
+          return True
+      if rate:
+          now = time.monotonic()
+          self._tokens = min(float(rate), self._tokens + (now - self._refilled) * rate)
+          self._refilled = now
+          if self._tokens < 1:
+              return True
+          self._tokens -= 1
+      return False
+
+  def add_reader_page(self, image, page=1, mode="static", index_name="Demo-Comic",
+                      chapter="100010", pages=None):
+      """Add a reader page showing `image` and return its URL"""
+      chapter_number = chapter_image(chapter)
+      page_path = f"/read-online/{index_name}-chapter-{chapter_number.lstrip('0') or '0'}-page-{page}.html"
+      image_path = f"/manga/{index_name}/{chapter_number}-{page_image(page)}.png"
+      self.add(image_path, image, "image/png", headers={
+          "ETag": f'"{hashlib.sha1(image).hexdigest()}"',
+          "Last-Modified": formatdate(0, usegmt=True)
+      })
+
+      script = ""
+      if mode == "static":
+          tag = f'<img class="img-fluid" ng-src="{image_path}" src="{image_path}">'
+      elif mode == "payload":
+          tag = (
+              '<img class="img-fluid" ng-src="https://{{vm.CurPathName}}/manga/{{vm.IndexName}}/'
+              '{{vm.ChapterImage(vm.CurChapter.Chapter)}}-{{vm.PageImage(Page)}}.png">'
+          )
+          current = {"Chapter": chapter, "Type": "Chapter", "Page": str(pages or page), "Directory": ""}
+          script = (
+              "<script>\n"
+              f"vm.IndexName = {json.dumps(index_name)};\n"
+              f"vm.CurPathName = {json.dumps(f'{self.host}:{self.port}')};\n"
+              f"vm.CurChapter = {json.dumps(current)};\n"
+              "</script>"
+          )
+      elif mode == "script":
+          tag = ""
+          script = f"<script>document.write('<img class=\"img-fluid\" ng-src=\"{image_path}\">');</script>"
+      else:
+          raise ValueError(f"Unknown reader page mode: {mode}")
+
+      html = READER_TEMPLATE.format(title=f"{index_name} page {page}", image=tag, script=script)
+      return self.add(page_path, html)
+
+  def _serve(self, handler, send_body):
+      path = handler.path.split("?", 1)[0]
+      with self._lock:
+          self.hits[path] += 1
+          self.active += 1
+          self.max_active = max(self.max_active, self.active)
+          throttled = self._over_limit()
+          if throttled:
+              self.throttled += 1
+      finished = []
+
+      def finish():
+          # Leave `active` before the last bytes go out: once a client has its
+          # whole answer it may send the next request, which must not overlap
+          if not finished:
+              finished.append(True)
+              with self._lock:
+                  self.active -= 1
+
+      try:
+          if throttled:
+              handler.send_response(429)
+              if self.limits.get("retry_after") is not None:
+                  handler.send_header("Retry-After", str(self.limits["retry_after"]))
+              handler.send_header("Content-Length", "0")
+              finish()
+              handler.end_headers()
+              return
+
+          route = self.routes.get(path)
+          if route is None:
+              finish()
+              handler.send_error(404)
+              return
+          if route["delay"]:
+              time.sleep(route["delay"])
+
+          # Answer conditional requests like a caching-aware origin
+          etag = route["headers"].get("ETag")
+          modified = route["headers"].get("Last-Modified")
+          if (etag and handler.headers.get("If-None-Match") == etag) or (
+              not handler.headers.get("If-None-Match") and modified
+              and handler.headers.get("If-Modified-Since") == modified
+          ):
+              handler.send_response(304)
+              finish()
+              handler.end_headers()
+              return
+
+          body, start = route["body"], self._range_start(handler, route)
+          if start is not None:
+              with self._lock:
+                  self.ranges.append((path, start))
+              handler.send_response(206)
+              handler.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+              body = body[start:]
+          else:
+              handler.send_response(200)
+          handler.send_header("Content-Type", route["content_type"])
+          handler.send_header("Content-Length", str(len(body)))
+          for name, value in route["headers"].items():
+              handler.send_header(name, value)
+          if not send_body:
+              finish()
+          handler.end_headers()
+          if send_body:
+              finish()
+              if start is None and route["cut"] is not None:
+                  # Drop the connection partway through the body, once
+                  cut, route["cut"] = route["cut"], None
+                  handler.wfile.write(body[:cut])
+                  handler.close_connection = True
+                  return
+              with self._lock:
+                  self.transfers[path] += 1
+              handler.wfile.write(body)
+      finally:
+          finish()
+
+  def _range_start(self, handler, route):
+      """First byte asked for by a `Range: bytes=N-` request, or None to send everything"""
+      match = re.fullmatch(r"bytes=(\d+)-", handler.headers.get("Range") or "")
+      if not match or int(match.group(1)) >= len(route["body"]):
+          return None
+      # If-Range only allows the partial answer for the version the client holds
+      if_range = handler.headers.get("If-Range")
+      if if_range and if_range not in (route["headers"].get("ETag"), route["headers"].get("Last-Modified")):
+          return None
+      return int(match.group(1))
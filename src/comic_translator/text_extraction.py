@@ -1,122 +1,385 @@
 # src/comic_translator/text_extraction.py
-from doctr.io import DocumentFile
-from doctr.models import ocr_predictor
 import numpy as np
+from itertools import islice
 from pathlib import Path
 import logging
-from .utils import save_json
+from PIL import Image
+from .cache import file_digest
+from .grouping import GroupingEngine
+from .ocr_backends import INFERENCE_BACKENDS, check_torch_int8, configure_threads, onnx_predictor, quantize_predictor
+from .ocr_cache import OCRCache
+from .ocr_pool import OCRPool
+from .page_text import save_page_text, text_suffix
+from .records import TextGroup, Word, as_word
+from .tiling import iter_tiles, merge_tiles, tile_spans, to_page
+
+def ocr_predictor(*args, **kwargs):
+  """Build a doctr OCR predictor; doctr and torch are only imported here"""
+  from doctr.models import ocr_predictor as build_predictor
+  return build_predictor(*args, **kwargs)
+
+def load_pages(image_path):
+  """Load an image as doctr pages"""
+  try:
+      from doctr.io import DocumentFile
+  except ImportError:
+      # onnxtr-only installs ship the same loader
+      from onnxtr.io import DocumentFile
+  return DocumentFile.from_images(image_path)
 
 class TextExtractor:
-  def __init__(self):
+  def __init__(self, det_bs=2, reco_bs=128, pages_per_batch=8, det_arch="fast_base",
+               reco_arch="crnn_vgg16_bn", use_cache=True, cache=None, merge_gap_x=1.0,
+               merge_gap_y=0.6, predictor=None, text_format="json", tile_height=None, tile_overlap=256,
+               inference="torch", intra_op_threads=None, inter_op_threads=None, processes=None,
+               **predictor_options):
       self.logger = logging.getLogger(__name__)
+      self.det_bs = det_bs
+      self.reco_bs = reco_bs
+      self.pages_per_batch = pages_per_batch
+
+      # Word gaps are measured in multiples of the word height
+      self.grouper = GroupingEngine(max_gap_x=merge_gap_x, max_gap_y=merge_gap_y)
+
+      # Everything that changes the OCR output is part of the cache key;
+      # batch sizes and thread counts only change speed and are left out
+      if inference not in INFERENCE_BACKENDS:
+          raise ValueError(f"Unknown OCR inference backend: {inference}")
+      if inference == "torch-int8":
+          check_torch_int8()
+      self.inference = inference
+      self.threads = (intra_op_threads, inter_op_threads)
+      self.model_config = {
+          "det_arch": det_arch,
+          "reco_arch": reco_arch,
+          "pretrained": True,
+          **predictor_options
+      }
+      if inference != "torch":
+          self.model_config["inference"] = inference
+
+      # Pages taller than `tile_height` pixels are read in overlapping tiles
+      self.tile_height = tile_height
+      self.tile_overlap = tile_overlap
+      if tile_height:
+          self.model_config["tiling"] = {"tile_height": tile_height, "overlap": tile_overlap}
+      self.cache = (cache or OCRCache()) if use_cache else None
       
+      # With `processes`, OCR runs in worker processes that each load the model
+      # with `intra_op_threads` threads; the cache and grouping stay here
+      self.pool = None
+      if processes:
+          self.pool = OCRPool(
+              processes, threads=intra_op_threads, det_bs=det_bs, reco_bs=reco_bs,
+              pages_per_batch=pages_per_batch, det_arch=det_arch, reco_arch=reco_arch,
+              tile_height=tile_height, tile_overlap=tile_overlap, inference=inference,
+              predictor=predictor, **predictor_options
+          )
+          self.predictor = None
+      elif predictor is not None:
+          # Injected predictors (tests, benchmarks) skip the model load
+          self.predictor = predictor
+      else:
+          self.predictor = self._load_predictor(det_arch, reco_arch, det_bs, reco_bs, predictor_options)
+
+      # "json" or the columnar "npz" format for the grouped text files
+      self.text_suffix = text_suffix(text_format)
+      self.output_dir = Path("data/extracted_text")
+      self.output_dir.mkdir(parents=True, exist_ok=True)
+
+  def _load_predictor(self, det_arch, reco_arch, det_bs, reco_bs, predictor_options):
+      intra_op, inter_op = self.threads
       try:
-          self.predictor = ocr_predictor(pretrained=True)
-          self.logger.info("OCR model loaded successfully.")
+          if self.inference.startswith("onnx"):
+              predictor = onnx_predictor(
+                  det_arch, reco_arch, det_bs=det_bs, reco_bs=reco_bs, intra_op=intra_op, inter_op=inter_op,
+                  int8=self.inference == "onnx-int8", **predictor_options
+              )
+          else:
+              configure_threads(intra_op, inter_op)
+              predictor = ocr_predictor(
+                  det_arch=det_arch, reco_arch=reco_arch, pretrained=True,
+                  det_bs=det_bs, reco_bs=reco_bs, **predictor_options
+              )
+              if self.inference == "torch-int8":
+                  predictor = quantize_predictor(predictor)
+          self.logger.info(f"OCR model loaded successfully ({self.inference}, {det_arch}/{reco_arch}).")
       except Exception as e:
           self.logger.error(f"Failed to load OCR model: {str(e)}")
           raise e
+      return predictor
+
+  @property
+  def concurrency(self):
+      """How many pages can be OCRed at the same time"""
+      return self.pool.processes if self.pool is not None else 1
+
+  def close(self):
+      """Stop the OCR worker processes, if any"""
+      if self.pool is not None:
+          self.pool.close()
+
+  def params(self):
+      """Settings that change the extracted text of a page"""
+      return {
+          "model": self.model_config,
+          "merge_gap_x": self.grouper.max_gap_x,
+          "merge_gap_y": self.grouper.max_gap_y
+      }
+
+  def output_path(self, image_path):
+      """Where the grouped text of a page is saved"""
+      return self.output_dir / f"{Path(image_path).stem}_text{self.text_suffix}"
+
+  def page_words(self, page):
+      """Collect the words of one OCR result page with their positions"""
+      word_data = []
+      for block_idx, block in enumerate(page.blocks):
+          for line_idx, line in enumerate(block.lines):
+              for word in line.words:
+                  (x1, y1), (x2, y2) = word.geometry
+                  box = (float(x1), float(y1), float(x2), float(y2))
+                  word_data.append(Word(word.value, box, f"{block_idx}_{line_idx}", float(word.confidence)))
+      return word_data
+
+  def _cache_key(self, image_path):
+      if self.cache is None:
+          return None
+      return self.cache.key(file_digest(image_path), self.model_config)
+
+  def _cached_words(self, key):
+      """Rebuild word data from the OCR cache, or return None"""
+      if key is None:
+          return None
+      words = self.cache.get(key)
+      if words is None:
+          return None
+      return [Word.from_dict(word) for word in words]
+
+  def _cache_words(self, key, word_data):
+      if key is None:
+          return
+      words = [
+          {"text": w.text, "bbox": w.bbox, "line_idx": w.line_idx, "confidence": w.confidence}
+          for w in word_data
+      ]
+      self.cache.put(key, words, self.model_config)
+
+  def _tile_spans(self, image_path):
+      """Return the tiles of a page too tall to OCR at once, or None"""
+      if not self.tile_height:
+          return None
+      with Image.open(image_path) as image:
+          height = image.height
+      if height <= self.tile_height:
+          return None
+      return tile_spans(height, self.tile_height, self.tile_overlap)
+
+  def tiled_words(self, image_path, spans):
+      """
+      OCR a tall page tile by tile and return its words in page coordinates.
+
+      At most `pages_per_batch` tiles are cropped and sent to the predictor
+      at a time, so memory use depends on the tile size, not the page height.
+      """
+      tile_words = []
+      with Image.open(image_path) as image:
+          height = image.height
+          tiles = iter_tiles(image, spans)
+          for start in range(0, len(spans), self.pages_per_batch):
+              result = self.predictor(list(islice(tiles, self.pages_per_batch)))
+              for index, page in enumerate(result.pages, start):
+                  tile_words.append(to_page(self.page_words(page), spans[index], height, index))
+
+      word_data = merge_tiles(tile_words, spans, height)
+      self.logger.debug(f"Read {len(word_data)} words from {len(spans)} tiles of {image_path}")
+      return word_data
+
+  def extract_words(self, image_path):
+      """Run OCR on a page, or load its words from the OCR cache"""
+      key = self._cache_key(image_path)
+      word_data = self._cached_words(key)
+      if word_data is not None:
+          self.logger.debug(f"OCR cache hit for {image_path}")
+          return word_data
+
+      if self.pool is not None:
+          word_data = self.pool.words(image_path)
+          self._cache_words(key, word_data)
+          return word_data
+
+      spans = self._tile_spans(image_path)
+      if spans is not None:
+          word_data = self.tiled_words(image_path, spans)
+          self._cache_words(key, word_data)
+          return word_data
+
+      # Load image
+      doc = load_pages(image_path)
       
-      self.output_dir = Path("data/extracted_text")
-      self.output_dir.mkdir(parents=True, exist_ok=True)
+      # Perform OCR
+      result = self.predictor(doc)
+      
+      # Extract words with their positions
+      word_data = []
+      for page in result.pages:
+          word_data.extend(self.page_words(page))
 
-  def should_merge_words(self, word1, word2, threshold_y=0.1, threshold_x=0.1):
+      self._cache_words(key, word_data)
+      return word_data
+
+  def group_words(self, word_data, page_size=None):
       """
-      Determine if two words should be merged based on their proximity
+      Group words into speech bubbles while preserving individual word data.
+
+      `page_size` is the (width, height) of the page in pixels. Word boxes
+      are normalized to the page, so grouping in pixels keeps gaps comparable
+      on tall or wide pages.
       """
-      bbox1 = word1["bbox"]
-      bbox2 = word2["bbox"]
+      if not word_data:
+          return []
+
+      word_data = [as_word(w) for w in word_data]
+      width, height = page_size or (1, 1)
+      boxes = np.array([w.box for w in word_data], dtype=np.float64)
+
+      grouped_data = []
+      for idx in self.grouper.group(boxes * [width, height, width, height]):
+          words = [word_data[i] for i in idx]
+          x1, y1 = boxes[idx, :2].min(axis=0)
+          x2, y2 = boxes[idx, 2:].max(axis=0)
+          grouped_data.append(TextGroup(
+              " ".join(w.text for w in words), words,
+              (float(x1), float(y1), float(x2), float(y2)), words[0].line_idx
+          ))
+      return grouped_data
+
+  def _finish_page(self, image_path, word_data, save=True):
+      """Group the words of a page, optionally save them, and return the groups"""
+      if not word_data:
+          self.logger.warning(f"No text detected in {image_path}")
+          return []
+
+      with Image.open(image_path) as image:
+          page_size = image.size
+      grouped_data = self.group_words(word_data, page_size)
+
+      # Save results
+      if save:
+          save_page_text(grouped_data, self.output_path(image_path))
       
-      # Calculate vertical and horizontal distances between words
-      vertical_diff = abs(bbox1[0][1] - bbox2[0][1])  # Compare y-coordinates
-      horizontal_diff = abs(bbox2[0][0] - bbox1[1][0])  # Compare x-coordinates
+      # Debug logging
+      self.logger.debug(f"Extracted {len(grouped_data)} text groups")
+      for group in grouped_data:
+          self.logger.debug(f"Group text: {group.text}")
+          self.logger.debug(f"Word count: {len(group.words)}")
       
-      # Words should be on roughly the same line and close horizontally
-      return vertical_diff < threshold_y or horizontal_diff < threshold_x
+      return grouped_data
 
-  def merge_bboxes(self, bbox1, bbox2):
+  def extract_text(self, image_path, save=True):
       """
-      Merge two bounding boxes into one that encompasses both
+      Extract text from comic page as a list of TextGroup records.
+
+      With `save=False` nothing is written to the output directory and the
+      groups are only returned, for callers that pass them on in memory.
       """
-      x1 = min(bbox1[0][0], bbox2[0][0])
-      y1 = min(bbox1[0][1], bbox2[0][1])
-      x2 = max(bbox1[1][0], bbox2[1][0])
-      y2 = max(bbox1[1][1], bbox2[1][1])
-      return [[x1, y1], [x2, y2]]
-
-  def extract_text(self, image_path):
-      """Extract text from comic page"""
       try:
-          # Load image
-          doc = DocumentFile.from_images(image_path)
-          
-          # Perform OCR
-          result = self.predictor(doc)
-          
-          # Extract words with their positions
-          word_data = []
-          for page in result.pages:
-              for block_idx, block in enumerate(page.blocks):
-                  for line_idx, line in enumerate(block.lines):
-                      for word in line.words:
-                          word_data.append({
-                              "text": word.value,
-                              "bbox": word.geometry,
-                              "line_idx": f"{block_idx}_{line_idx}",
-                              "original_bbox": word.geometry  # Keep original bbox
-                          })
-          
-          # Group words into sentences while preserving individual word data
-          grouped_data = []
-          
-          if not word_data:
-              self.logger.warning(f"No text detected in {image_path}")
-              return []
-
-          # Sort words by vertical position then horizontal
-          sorted_words = sorted(word_data, key=lambda w: (w["bbox"][0][1], w["bbox"][0][0]))
-          
-          current_group = {
-              "text": sorted_words[0]["text"],
-              "words": [sorted_words[0]],
-              "bbox": sorted_words[0]["bbox"],
-              "line_idx": sorted_words[0]["line_idx"]
-          }
-          
-          for word in sorted_words[1:]:
-              # Check if we should merge with current group
-              if self.should_merge_words(current_group, word):
-                  # Add to current group
-                  current_group["text"] += " " + word["text"]
-                  current_group["words"].append(word)
-                  current_group["bbox"] = self.merge_bboxes(current_group["bbox"], word["bbox"])
-              else:
-                  # Start new group
-                  grouped_data.append(current_group)
-                  current_group = {
-                      "text": word["text"],
-                      "words": [word],
-                      "bbox": word["bbox"],
-                      "line_idx": word["line_idx"]
-                  }
-          
-          # Add the last group
-          grouped_data.append(current_group)
-          
-          # Save results
-          output_path = self.output_dir / f"{Path(image_path).stem}_text.json"
-          save_json(grouped_data, output_path)
-          
-          # Debug logging
-          self.logger.debug(f"Extracted {len(grouped_data)} text groups")
-          for group in grouped_data:
-              self.logger.debug(f"Group text: {group['text']}")
-              self.logger.debug(f"Word count: {len(group['words'])}")
-          
-          return grouped_data
+          word_data = self.extract_words(image_path)
+          return self._finish_page(image_path, word_data, save)
           
       except Exception as e:
           self.logger.error(f"Error extracting text: {str(e)}")
           import traceback
           self.logger.error(traceback.format_exc())
-          return None
\ No newline at end of file
+          return None
+
+  def extract_text_batch(self, image_paths, pages_per_batch=None):
+      """
+      Extract text from many comic pages with batched OCR inference.
+
+      Pages are fed to the predictor `pages_per_batch` at a time so the
+      detection and recognition models see real batches (sized by `det_bs`
+      and `reco_bs`). Returns one entry per input path, in order, holding the
+      same grouped data extract_text returns, or None if that page failed.
+      """
+      image_paths = list(image_paths)
+      if self.pool is not None:
+          return self._extract_text_pooled(image_paths)
+      pages_per_batch = pages_per_batch or self.pages_per_batch
+      results = [None] * len(image_paths)
+
+      for start in range(0, len(image_paths), pages_per_batch):
+          chunk = list(range(start, min(start + pages_per_batch, len(image_paths))))
+
+          # Load every uncached page of the chunk, skipping unreadable ones
+          loaded, pages, keys = [], [], {}
+          for idx in chunk:
+              try:
+                  keys[idx] = self._cache_key(image_paths[idx])
+                  word_data = self._cached_words(keys[idx])
+                  if word_data is not None:
+                      results[idx] = self._finish_page(image_paths[idx], word_data)
+                      continue
+                  # Tall strips are batched tile by tile instead
+                  spans = self._tile_spans(image_paths[idx])
+                  if spans is not None:
+                      word_data = self.tiled_words(image_paths[idx], spans)
+                      self._cache_words(keys[idx], word_data)
+                      results[idx] = self._finish_page(image_paths[idx], word_data)
+                      continue
+                  pages.extend(load_pages(image_paths[idx]))
+                  loaded.append(idx)
+              except Exception as e:
+                  self.logger.error(f"Error loading {image_paths[idx]}: {str(e)}")
+
+          if not pages:
+              continue
+
+          try:
+              result = self.predictor(pages)
+          except Exception as e:
+              self.logger.error(f"Error extracting text from batch: {str(e)}")
+              continue
+
+          for idx, page in zip(loaded, result.pages):
+              try:
+                  word_data = self.page_words(page)
+                  self._cache_words(keys[idx], word_data)
+                  results[idx] = self._finish_page(image_paths[idx], word_data)
+              except Exception as e:
+                  self.logger.error(f"Error grouping text for {image_paths[idx]}: {str(e)}")
+
+      self.logger.info(
+          f"Extracted text from {sum(r is not None for r in results)}/{len(image_paths)} pages"
+      )
+      return results
+
+  def _extract_text_pooled(self, image_paths):
+      """extract_text_batch with the uncached pages spread over the worker processes"""
+      results = [None] * len(image_paths)
+      keys, todo = {}, []
+      for idx, image_path in enumerate(image_paths):
+          try:
+              keys[idx] = self._cache_key(image_path)
+              word_data = self._cached_words(keys[idx])
+              if word_data is None:
+                  todo.append(idx)
+              else:
+                  results[idx] = self._finish_page(image_path, word_data)
+          except Exception as e:
+              self.logger.error(f"Error loading {image_path}: {str(e)}")
+
+      for idx, word_data in zip(todo, self.pool.map([image_paths[idx] for idx in todo])):
+          if isinstance(word_data, Exception):
+              self.logger.error(f"Error extracting text from {image_paths[idx]}: {str(word_data)}")
+              continue
+          try:
+              self._cache_words(keys[idx], word_data)
+              results[idx] = self._finish_page(image_paths[idx], word_data)
+          except Exception as e:
+              self.logger.error(f"Error grouping text for {image_paths[idx]}: {str(e)}")
+
+      self.logger.info(
+          f"Extracted text from {sum(r is not None for r in results)}/{len(image_paths)} pages"
+      )
+      return results
@@ -0,0 +1,87 @@
+# src/comic_translator/tiling.py
+"""
+Tiled OCR for tall webtoon strips.
+
+A strip is cut into full-width tiles of at most `tile_height` pixels that
+overlap by `overlap` pixels, so the detector sees text at its real size and
+its input never grows with the strip. Word boxes found in a tile are mapped
+back to page coordinates. Every word is kept from the tile that owns its
+vertical center (each overlap is split at its middle), and words detected
+twice across a seam are dropped by box overlap.
+"""
+import numpy as np
+from .records import Word
+
+def tile_spans(height, tile_height, overlap):
+  """Return the (top, bottom) pixel rows of the tiles covering a page"""
+  if tile_height <= overlap:
+      raise ValueError("tile_height must be larger than the overlap")
+  if height <= tile_height:
+      return [(0, height)]
+  step = tile_height - overlap
+  tops = list(range(0, height - tile_height, step)) + [height - tile_height]
+  return [(top, top + tile_height) for top in tops]
+
+def iter_tiles(image, spans):
+  """Yield every tile of a PIL image as an RGB uint8 array"""
+  for top, bottom in spans:
+      yield np.asarray(image.crop((0, top, image.width, bottom)).convert("RGB"))
+
+def to_page(words, span, page_height, tile_index):
+  """Map words with tile-relative boxes to page-relative boxes"""
+  top, bottom = span
+  scale = (bottom - top) / page_height
+  offset = top / page_height
+  return [
+      Word(
+          word.text,
+          (word.box[0], offset + word.box[1] * scale, word.box[2], offset + word.box[3] * scale),
+          f"{tile_index}_{word.line_idx}", word.confidence
+      )
+      for word in words
+  ]
+
+def _iou(a, b):
+  """Pairwise intersection over union of two (N, 4) and (M, 4) box arrays"""
+  x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+  y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+  x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+  y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+  inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+  area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+  area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+  return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-12)
+
+def merge_tiles(tile_words, spans, page_height, iou_threshold=0.3):
+  """
+  Merge the page-relative words of every tile into one list for the page.
+
+  `tile_words` holds one word list per span. Returns the words ordered by
+  tile, with the duplicates of the overlap zones removed.
+  """
+  # Each overlap is split at its middle; a tile owns the words centered in its share
+  seams = [(spans[i][1] + spans[i + 1][0]) / 2 / page_height for i in range(len(spans) - 1)]
+  limits = [0.0] + seams + [float("inf")]
+
+  kept = []
+  for index, words in enumerate(tile_words):
+      low, high = limits[index], limits[index + 1]
+      kept.append([w for w in words if low <= (w.box[1] + w.box[3]) / 2 < high])
+
+  # A word whose center moved across a seam between detections is found twice
+  for index, seam in enumerate(seams):
+      band = (spans[index][1] - spans[index + 1][0]) / page_height
+      above = [w for w in kept[index] if abs((w.box[1] + w.box[3]) / 2 - seam) < band]
+      below = [w for w in kept[index + 1] if abs((w.box[1] + w.box[3]) / 2 - seam) < band]
+      if not above or not below:
+          continue
+      overlap = _iou(np.array([w.box for w in above]), np.array([w.box for w in below]))
+      dropped = set()
+      for i, j in zip(*np.nonzero(overlap > iou_threshold)):
+          loser = below[j] if above[i].confidence >= below[j].confidence else above[i]
+          dropped.add(id(loser))
+      if dropped:
+          kept[index] = [w for w in kept[index] if id(w) not in dropped]
+          kept[index + 1] = [w for w in kept[index + 1] if id(w) not in dropped]
+
+  return [word for words in kept for word in words]
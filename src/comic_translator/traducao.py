@@ -1,108 +1,105 @@
 import os
 import json
-import requests
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import cv2
+import atexit
+import functools
+from PIL import Image, ImageDraw, ImageFilter
 import numpy as np
-from deep_translator import GoogleTranslator
-import textwrap
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from sklearn.cluster import DBSCAN
-
+from comic_translator.drivers import DriverPool
+from comic_translator.fetch import HttpFetcher
+from comic_translator.grouping import cluster_points
+from comic_translator.inpainting import inpaint_regions
+from comic_translator.layout import TextLayout, draw_fitted
+from comic_translator.metrics import timed
+from comic_translator.scraper import fetch_image_url
+from comic_translator.translator import Translator
+
+_fetcher = HttpFetcher()
+_driver_pool = None
+
+@functools.lru_cache(maxsize=None)
+def _chromedriver_path():
+  # Resolve the driver binary once instead of on every page
+  from webdriver_manager.chrome import ChromeDriverManager
+  return ChromeDriverManager().install()
+
+def _start_driver():
+  from selenium import webdriver
+  from selenium.webdriver.chrome.service import Service
+  service = Service(_chromedriver_path())
+  options = webdriver.ChromeOptions()
+  options.add_argument('--headless')  # Run in headless mode
+  return webdriver.Chrome(service=service, options=options)
+
+def get_driver_pool():
+  global _driver_pool
+  if _driver_pool is None:
+      _driver_pool = DriverPool(size=1, factory=_start_driver)
+      atexit.register(_driver_pool.close)
+  return _driver_pool
+
+@timed("download")
 def download_image(url, download_folder):
   try:
-      # Set up Selenium WebDriver
-      service = Service(ChromeDriverManager().install())
-      options = webdriver.ChromeOptions()
-      options.add_argument('--headless')  # Run in headless mode
-      driver = webdriver.Chrome(service=service, options=options)
-      driver.get(url)
-
-      # Wait for the image to load
-      wait = WebDriverWait(driver, 10)
-      image_element = wait.until(EC.presence_of_element_located(
-          (By.CSS_SELECTOR, 'img.img-fluid[ng-src]')))
-      image_url = image_element.get_attribute('ng-src')
-
-      # Download the image
-      image_response = requests.get(image_url)
-      image_response.raise_for_status()
-
-      # Save the image
-      if not os.path.exists(download_folder):
-          os.makedirs(download_folder)
-      image_path = os.path.join(download_folder, 'comic_page.png')
-      with open(image_path, 'wb') as f:
-          f.write(image_response.content)
+      # Try plain HTTP first, and only render the page in a warm browser if that fails
+      image_url = fetch_image_url(url, _fetcher)
+      if not image_url:
+          from selenium.webdriver.common.by import By
+          from selenium.webdriver.support.ui import WebDriverWait
+          from selenium.webdriver.support import expected_conditions as EC
+
+          with get_driver_pool().lease() as driver:
+              driver.get(url)
+
+              # Wait for the image to load
+              wait = WebDriverWait(driver, 10)
+              image_element = wait.until(EC.presence_of_element_located(
+                  (By.CSS_SELECTOR, 'img.img-fluid[ng-src]')))
+              image_url = image_element.get_attribute('ng-src')
+
+      # Stream the image to disk
+      image_path = _fetcher.fetch_to_file(image_url, os.path.join(download_folder, 'comic_page.png'))
       print("Image downloaded successfully")
 
-      driver.quit()
       return image_path
   except Exception as e:
       print(f"Error downloading the image: {e}")
-      if 'driver' in locals():
-          driver.quit()
       return None
 
+@functools.lru_cache(maxsize=None)
+def _text_extractor():
+  # One OCR model for every page, built with the configurable CPU backends of TextExtractor
+  from comic_translator.text_extraction import TextExtractor
+  return TextExtractor()
+
+@timed("extract")
 def extract_text(image_path, text_output_folder):
   try:
-      # Import required libraries
-      import os
-      import json
-      import numpy as np
-      from PIL import Image
-      import tensorflow as tf
-      from doctr.io import DocumentFile
-      from doctr.models import ocr_predictor
-      from sklearn.cluster import DBSCAN
-
       # Load the image
       image = Image.open(image_path)
-      
-      # Initialize docTR model with better detection for manga/comics
-      predictor = ocr_predictor(
-          det_arch='db_resnet50', 
-          reco_arch='crnn_vgg16_bn',
-          pretrained=True,
-          assume_straight_pages=True
-      )
-      
-      # Load and prepare image for docTR
-      doc = DocumentFile.from_images(image_path)
-      result = predictor(doc)
-      
+
       # Extract words with their bounding boxes
       words = []
-      for page in result.pages:
-          for block in page.blocks:
-              for line in block.lines:
-                  for word in line.words:
-                      # Get coordinates
-                      coords = word.geometry
-                      # Convert relative coordinates to absolute pixels
-                      left = int(coords[0][0] * image.width)
-                      top = int(coords[0][1] * image.height)
-                      right = int(coords[1][0] * image.width)
-                      bottom = int(coords[1][1] * image.height)
-                      
-                      if word.value.strip():  # Only add non-empty text
-                          words.append({
-                              'text': word.value,
-                              'left': left,
-                              'top': top,
-                              'right': right,
-                              'bottom': bottom,
-                              'width': right - left,
-                              'height': bottom - top,
-                              'center_x': (left + right) / 2,
-                              'center_y': (top + bottom) / 2,
-                              'confidence': float(word.confidence)
-                          })
+      for word in _text_extractor().extract_words(image_path):
+          # Convert relative coordinates to absolute pixels
+          x1, y1, x2, y2 = word.box
+          left = int(x1 * image.width)
+          top = int(y1 * image.height)
+          right = int(x2 * image.width)
+          bottom = int(y2 * image.height)
+
+          if word.text.strip():  # Only add non-empty text
+              words.append({
+                  'text': word.text,
+                  'left': left,
+                  'top': top,
+                  'right': right,
+                  'bottom': bottom,
+                  'width': right - left,
+                  'height': bottom - top,
+                  'center_x': (left + right) / 2,
+                  'center_y': (top + bottom) / 2,
+                  'confidence': float(word.confidence)
+              })
 
       # Prepare data for clustering
       if not words:
@@ -110,9 +107,8 @@ def extract_text(image_path, text_output_folder):
 
       positions = np.array([[word['center_x'], word['center_y']] for word in words])
       
-      # Use DBSCAN clustering to group nearby text
-      clustering = DBSCAN(eps=80, min_samples=1).fit(positions)
-      labels = clustering.labels_
+      # Group text whose centers are within 80px of each other
+      labels = cluster_points(positions, eps=80)
 
       # Group words into text blocks
       grouped_blocks = {}
@@ -164,6 +160,7 @@ def extract_text(image_path, text_output_folder):
       print(f"Error extracting text from the image: {e}")
       return None, None
 
+@timed("translate")
 def translate_text(text_input_folder, translated_output_folder, target_language='pt'):
   try:
       # Load original text from JSON
@@ -171,10 +168,11 @@ def translate_text(text_input_folder, translated_output_folder, target_language=
       with open(text_input_path, 'r', encoding='utf-8') as f:
           text_blocks = json.load(f)
 
-      # Translate text
-      translator = GoogleTranslator(source='auto', target=target_language)
-      for block in text_blocks:
-          block['translated_text'] = translator.translate(block['text'])
+      # Translate text, reusing the translation memory for repeated strings
+      translations = Translator(source_lang='auto').translate_texts(
+          [block['text'] for block in text_blocks], target_language)
+      for block, translation in zip(text_blocks, translations):
+          block['translated_text'] = translation
       print("Text translated successfully")
 
       # Save translated text to JSON
@@ -191,6 +189,7 @@ def translate_text(text_input_folder, translated_output_folder, target_language=
       print(f"Error translating text: {e}")
       return None
 
+@timed("render")
 def create_translated_image(image_path, text_input_folder, output_folder):
   try:
       # Load image
@@ -201,49 +200,20 @@ def create_translated_image(image_path, text_input_folder, output_folder):
       with open(translated_input_path, 'r', encoding='utf-8') as f:
           text_blocks = json.load(f)
 
-      # Prepare image for editing
-      open_cv_image = np.array(image)
-      open_cv_image = open_cv_image[:, :, ::-1].copy()
-      mask = np.zeros(open_cv_image.shape[:2], dtype=np.uint8)
-      for block in text_blocks:
-          x, y, w, h = int(block['left']), int(block['top']), int(block['width']), int(block['height'])
-          cv2.rectangle(mask, (x, y), (x + w, y + h), 255, -1)
-      inpainted_image = cv2.inpaint(
-          open_cv_image, mask, 3, cv2.INPAINT_TELEA)
-      result_image = Image.fromarray(
-          cv2.cvtColor(inpainted_image, cv2.COLOR_BGR2RGB))
+      # Inpaint padded regions around the text instead of the whole page
+      boxes = [(int(block['left']), int(block['top']), int(block['width']), int(block['height']))
+               for block in text_blocks]
+      result_image = inpaint_regions(image, boxes, radius=3, workers=os.cpu_count() or 1)
       draw = ImageDraw.Draw(result_image)
 
-      # Load font (update font path as necessary)
-      font_path = "arial.ttf"
+      # Fit every block with a shared, cached text layout (update font path as necessary)
+      layout = TextLayout(font_path="arial.ttf", min_size=10, max_size=40)
       for block in text_blocks:
           x, y, w, h = int(block['left']), int(block['top']), int(block['width']), int(block['height'])
           translated_text = block['translated_text']
           if translated_text.strip() != '':
-              # Start with a large font size and decrease until it fits
-              font_size = 40
-              while font_size > 10:
-                  font = ImageFont.truetype(font_path, font_size)
-                  # Calculate text size
-                  lines = textwrap.wrap(translated_text, width=1000)
-                  line_height = font.getbbox('Hg')[3] - font.getbbox('Hg')[1]
-                  total_height = line_height * len(lines)
-                  max_line_width = max([font.getbbox(line)[2] - font.getbbox(line)[0] for line in lines])
-                  # Check if text fits within the bounding box
-                  if total_height <= h and max_line_width <= w:
-                      break
-                  font_size -= 2
-              else:
-                  font = ImageFont.truetype(font_path, font_size)
-
               # Draw text centered in the bounding box
-              y_text = y + (h - total_height) / 2
-              for line in lines:
-                  line_width = font.getbbox(line)[2] - font.getbbox(line)[0]
-                  x_text = x + (w - line_width) / 2
-                  draw.text((x_text, y_text), line,
-                            font=font, fill=(0, 0, 0))
-                  y_text += line_height
+              draw_fitted(draw, layout.fit(translated_text, w, h), (x, y, w, h), fill=(0, 0, 0))
 
       # Save the final image
       if not os.path.exists(output_folder):
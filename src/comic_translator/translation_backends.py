@@ -0,0 +1,194 @@
+# src/comic_translator/translation_backends.py
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import re
+import threading
+import time
+from .scheduler import RequestScheduler
+
+SENTENCE_END = re.compile(r"[.!?\u2026]+\s+")
+WHITESPACE = re.compile(r"\s+")
+
+def split_text(text, max_chars):
+  """Split a text longer than max_chars at sentence ends, else at spaces, else anywhere"""
+  pieces = []
+  while len(text) > max_chars:
+      # A boundary right after max_chars still leaves a piece that fits
+      window = text[:max_chars + 1]
+      cut = max((m.end() for m in SENTENCE_END.finditer(window)), default=0)
+      if not cut:
+          cut = max((m.end() for m in WHITESPACE.finditer(window) if m.start() > 0), default=0)
+      pieces.append(text[:cut or max_chars].rstrip())
+      text = text[cut or max_chars:].lstrip()
+  if text or not pieces:
+      pieces.append(text)
+  return pieces
+
+def split_long_texts(texts, max_chars):
+  """Return the pieces to send for `texts` and how many pieces each text became"""
+  split = [split_text(text, max_chars) for text in texts]
+  return [piece for pieces in split for piece in pieces], [len(pieces) for pieces in split]
+
+def join_pieces(translations, counts):
+  """Join translated pieces back into one translation per original text"""
+  translations, joined = iter(translations), []
+  for count in counts:
+      joined.append(" ".join(next(translations) for _ in range(count)))
+  return joined
+
+def pack_batches(texts, max_chars, max_size, separator_len=1):
+  """Split texts into consecutive batches that respect the request limits"""
+  batches, current, size = [], [], 0
+  for text in texts:
+      cost = len(text) + (separator_len if current else 0)
+      if current and (size + cost > max_chars or len(current) >= max_size):
+          batches.append(current)
+          current, size, cost = [], 0, len(text)
+      current.append(text)
+      size += cost
+  if current:
+      batches.append(current)
+  return batches
+
+class TranslationBackend:
+  """
+  Interface for translation services.
+
+  Subclasses implement `translate_batch`, which sends one request for a list
+  of texts. `translate_many` packs any number of texts into batches that fit
+  the service limits and runs them with bounded concurrency. Texts too long
+  for one request are sent in pieces and joined again.
+  `translate_many_async` does the same from an event loop; backends without
+  a native async client run `translate_batch` in a worker thread.
+  Remote backends send every request through `request`, so the scheduler
+  paces and retries them per host.
+  """
+  name = "base"
+  host = None
+  max_batch_chars = 4500
+  max_batch_size = 50
+
+  def __init__(self, max_concurrency=4, scheduler=None):
+      self.logger = logging.getLogger(__name__)
+      self.max_concurrency = max_concurrency
+      self.scheduler = scheduler or RequestScheduler(max_concurrency=max_concurrency)
+      self.requests = 0
+      self._lock = threading.Lock()
+
+  def _count_request(self):
+      with self._lock:
+          self.requests += 1
+
+  def request(self, send):
+      """Run `send()` against the backend's host, paced and retried by the scheduler"""
+      return self.scheduler.call(self.host, send)
+
+  def translate_batch(self, texts, target, source="auto"):
+      """Translate a list of texts with a single request"""
+      raise NotImplementedError
+
+  def translate_many(self, texts, target, source="auto"):
+      """Translate texts in packed batches, returning them in input order"""
+      texts = list(texts)
+      if not texts:
+          return []
+      pieces, counts = split_long_texts(texts, self.max_batch_chars)
+      batches = pack_batches(pieces, self.max_batch_chars, self.max_batch_size)
+      if len(batches) == 1 or self.max_concurrency <= 1:
+          results = [self.translate_batch(batch, target, source) for batch in batches]
+      else:
+          with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+              results = list(executor.map(lambda batch: self.translate_batch(batch, target, source), batches))
+      return join_pieces((translation for batch in results for translation in batch), counts)
+
+  async def translate_batch_async(self, texts, target, source="auto"):
+      """Async version of translate_batch"""
+      return await asyncio.to_thread(self.translate_batch, texts, target, source)
+
+  async def translate_many_async(self, texts, target, source="auto"):
+      """Async version of translate_many"""
+      texts = list(texts)
+      if not texts:
+          return []
+      limit = asyncio.Semaphore(max(1, self.max_concurrency))
+
+      async def run(batch):
+          async with limit:
+              return await self.translate_batch_async(batch, target, source)
+
+      pieces, counts = split_long_texts(texts, self.max_batch_chars)
+      batches = pack_batches(pieces, self.max_batch_chars, self.max_batch_size)
+      results = await asyncio.gather(*(run(batch) for batch in batches))
+      return join_pieces((translation for batch in results for translation in batch), counts)
+
+class GoogleBackend(TranslationBackend):
+  """
+  Google Translate through deep_translator.
+
+  Several texts are packed into one request by joining them with newlines,
+  which the service preserves. If the answer does not split back into the
+  same number of lines the batch is retried one text at a time.
+  """
+  name = "google"
+  host = "translate.google.com"
+  separator = "\n"
+
+  def _translator(self, target, source):
+      from deep_translator import GoogleTranslator
+      return GoogleTranslator(source=source, target=target)
+
+  def translate_batch(self, texts, target, source="auto"):
+      translator = self._translator(target, source)
+      if len(texts) == 1 or any(self.separator in text for text in texts):
+          return [self._translate_one(translator, text) for text in texts]
+
+      self._count_request()
+      packed = self.request(lambda: translator.translate(self.separator.join(texts))) or ""
+      parts = [part.strip() for part in packed.split(self.separator)]
+      if len(parts) == len(texts):
+          return parts
+
+      self.logger.warning(f"Packed translation returned {len(parts)} parts for {len(texts)} texts, retrying one by one")
+      return [self._translate_one(translator, text) for text in texts]
+
+  def _translate_one(self, translator, text):
+      self._count_request()
+      return self.request(lambda: translator.translate(text)) or ""
+
+class LocalBackend(TranslationBackend):
+  """
+  Offline stand-in backend for tests and benchmarks.
+
+  Translations are deterministic (`[<target>] <text>`) and every request can
+  be given an artificial round-trip latency.
+  """
+  name = "local"
+
+  def __init__(self, max_concurrency=4, latency=0.0, scheduler=None):
+      super().__init__(max_concurrency=max_concurrency, scheduler=scheduler)
+      self.latency = latency
+
+  def translate_batch(self, texts, target, source="auto"):
+      self._count_request()
+      if self.latency:
+          time.sleep(self.latency)
+      return [f"[{target}] {text}" for text in texts]
+
+  async def translate_batch_async(self, texts, target, source="auto"):
+      self._count_request()
+      if self.latency:
+          await asyncio.sleep(self.latency)
+      return [f"[{target}] {text}" for text in texts]
+
+BACKENDS = {
+  GoogleBackend.name: GoogleBackend,
+  LocalBackend.name: LocalBackend,
+}
+
+def get_backend(name, **kwargs):
+  """Create a translation backend by name"""
+  try:
+      return BACKENDS[name](**kwargs)
+  except KeyError:
+      raise ValueError(f"Unknown translation backend: {name}") from None
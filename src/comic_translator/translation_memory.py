@@ -0,0 +1,77 @@
+# src/comic_translator/translation_memory.py
+from pathlib import Path
+import logging
+import sqlite3
+import threading
+import unicodedata
+
+def normalize_text(text):
+  """Normalize source text so trivially different strings share a memory entry"""
+  return " ".join(unicodedata.normalize("NFC", text).split())
+
+class TranslationMemory:
+  """
+  Persistent translation memory stored in a local SQLite file.
+
+  Entries are keyed by (normalized source text, source language, target
+  language, backend). The database runs in WAL mode so several workers or
+  processes can read and write it at the same time.
+  """
+  def __init__(self, path="data/cache/translation_memory.sqlite3"):
+      self.logger = logging.getLogger(__name__)
+      self.path = Path(path)
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      self.hits = 0
+      self.misses = 0
+
+      self._lock = threading.Lock()
+      self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+      self._db.execute("PRAGMA journal_mode=WAL")
+      self._db.execute("PRAGMA synchronous=NORMAL")
+      self._db.execute(
+          "CREATE TABLE IF NOT EXISTS memory ("
+          " source TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL,"
+          " backend TEXT NOT NULL, translation TEXT NOT NULL,"
+          " PRIMARY KEY (source, source_lang, target_lang, backend))"
+      )
+      self._db.commit()
+
+  def get_many(self, texts, source_lang, target_lang, backend):
+      """Return a dict with the remembered translation of every known text"""
+      texts = list(dict.fromkeys(texts))
+      found = {}
+      with self._lock:
+          # Stay well below SQLite's bound parameter limit
+          for start in range(0, len(texts), 500):
+              chunk = texts[start:start + 500]
+              placeholders = ",".join("?" * len(chunk))
+              rows = self._db.execute(
+                  f"SELECT source, translation FROM memory WHERE source_lang = ? AND target_lang = ?"
+                  f" AND backend = ? AND source IN ({placeholders})",
+                  (source_lang, target_lang, backend, *chunk)
+              ).fetchall()
+              found.update(rows)
+          self.hits += len(found)
+          self.misses += len(texts) - len(found)
+      return found
+
+  def put_many(self, translations, source_lang, target_lang, backend):
+      """Remember a dict of source text -> translation"""
+      if not translations:
+          return
+      with self._lock:
+          self._db.executemany(
+              "INSERT OR REPLACE INTO memory VALUES (?, ?, ?, ?, ?)",
+              [(source, source_lang, target_lang, backend, translation)
+               for source, translation in translations.items()]
+          )
+          self._db.commit()
+
+  def stats(self):
+      with self._lock:
+          entries = self._db.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+      return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+  def close(self):
+      with self._lock:
+          self._db.close()
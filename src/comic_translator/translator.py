@@ -0,0 +1,214 @@
+# src/comic_translator/translator.py
+from concurrent.futures import Future
+from pathlib import Path
+import asyncio
+import logging
+import threading
+from .translation_backends import get_backend
+from .translation_memory import TranslationMemory, normalize_text
+from .page_text import group_texts, load_page_text, save_page_text, text_suffix
+from .records import TranslatedGroup
+
+class Translator:
+  def __init__(self, source_lang="auto", use_memory=True, memory=None, backend="google",
+               max_concurrency=4, text_format="json"):
+      self.logger = logging.getLogger(__name__)
+      self.source_lang = source_lang
+      if isinstance(backend, str):
+          backend = get_backend(backend, max_concurrency=max_concurrency)
+      self.backend = backend
+      self.text_suffix = text_suffix(text_format)
+      self.output_dir = Path("data/translated_text")
+      self.output_dir.mkdir(parents=True, exist_ok=True)
+
+      self.memory = (memory or TranslationMemory()) if use_memory else None
+      self.deduplicated = 0
+
+      # Texts currently being translated by some worker, so concurrent pages
+      # wait for the same result instead of asking the backend twice
+      self._inflight = {}
+      self._lock = threading.Lock()
+
+  @property
+  def backend_name(self):
+      return self.backend.name
+
+  def params(self, target_lang):
+      """Settings that change the translation of a page"""
+      return {"source_lang": self.source_lang, "target_lang": target_lang, "backend": self.backend_name}
+
+  def output_path(self, extracted_text_path, target_lang=None):
+      """Where the translation of an extracted text file is saved, per language if one is given"""
+      lang = f"_{target_lang}" if target_lang else ""
+      return self.output_dir / f"{Path(extracted_text_path).stem}_translated{lang}{self.text_suffix}"
+
+  def translate(self, text, target_lang="en"):
+      """Translate a single piece of text"""
+      if not text.strip():
+          return text
+      return self.backend.translate_many([text], target_lang, self.source_lang)[0]
+
+  def _claim(self, texts, target_lang):
+      """Split texts into those this caller translates and those already in flight"""
+      owned, waiting = [], {}
+      with self._lock:
+          for text in texts:
+              key = (text, target_lang)
+              if key in self._inflight:
+                  waiting[text] = self._inflight[key]
+                  self.deduplicated += 1
+              else:
+                  self._inflight[key] = Future()
+                  owned.append(text)
+      return owned, waiting
+
+  def _settle(self, owned, target_lang, results=None, error=None):
+      """Hand the results (or the error) of owned texts to everyone waiting on them"""
+      with self._lock:
+          for text in owned:
+              future = self._inflight.pop((text, target_lang))
+              if error is not None:
+                  future.set_exception(error)
+              else:
+                  future.set_result(results[text])
+
+  def _remember(self, translations, target_lang):
+      if self.memory is not None:
+          self.memory.put_many(translations, self.source_lang, target_lang, self.backend_name)
+
+  def _translate_missing(self, texts, target_lang):
+      """Translate texts that are not in memory, sharing work with other workers"""
+      owned, waiting = self._claim(texts, target_lang)
+
+      results = {}
+      try:
+          if owned:
+              translations = self.backend.translate_many(owned, target_lang, self.source_lang)
+              results.update(zip(owned, (translation or "" for translation in translations)))
+          self._remember(results, target_lang)
+      except Exception as e:
+          self._settle(owned, target_lang, error=e)
+          raise
+      self._settle(owned, target_lang, results)
+
+      for text, future in waiting.items():
+          results[text] = future.result()
+      return results
+
+  async def _translate_missing_async(self, texts, target_lang):
+      """Async version of _translate_missing; in-flight texts are shared with threads too"""
+      owned, waiting = self._claim(texts, target_lang)
+
+      results = {}
+      try:
+          if owned:
+              translations = await self.backend.translate_many_async(owned, target_lang, self.source_lang)
+              results.update(zip(owned, (translation or "" for translation in translations)))
+          await asyncio.to_thread(self._remember, results, target_lang)
+      except BaseException as e:
+          self._settle(owned, target_lang, error=e)
+          raise
+      self._settle(owned, target_lang, results)
+
+      for text, future in waiting.items():
+          results[text] = await asyncio.wrap_future(future)
+      return results
+
+  def _prepare(self, texts, target_lang):
+      """Normalize texts and look them up in memory"""
+      normalized = [normalize_text(text) for text in texts]
+      unique = [text for text in dict.fromkeys(normalized) if text]
+      with self._lock:
+          self.deduplicated += sum(1 for text in normalized if text) - len(unique)
+
+      known = {}
+      if self.memory is not None and unique:
+          known = self.memory.get_many(unique, self.source_lang, target_lang, self.backend_name)
+      missing = [text for text in unique if text not in known]
+      return normalized, known, missing
+
+  def translate_texts(self, texts, target_lang="en"):
+      """
+      Translate many texts, returning translations in input order.
+
+      Identical texts are translated once, remembered translations are
+      reused, and only the rest reach the translation backend.
+      """
+      texts = list(texts)
+      normalized, known, missing = self._prepare(texts, target_lang)
+      if missing:
+          known.update(self._translate_missing(missing, target_lang))
+
+      return [known[norm] if norm else text for text, norm in zip(texts, normalized)]
+
+  async def translate_texts_async(self, texts, target_lang="en"):
+      """Async version of translate_texts; memory lookups run in a worker thread"""
+      texts = list(texts)
+      normalized, known, missing = await asyncio.to_thread(self._prepare, texts, target_lang)
+      if missing:
+          known.update(await self._translate_missing_async(missing, target_lang))
+
+      return [known[norm] if norm else text for text, norm in zip(texts, normalized)]
+
+  def stats(self):
+      """Return translation counters for monitoring"""
+      stats = {"backend_calls": self.backend.requests, "deduplicated": self.deduplicated}
+      if self.memory is not None:
+          stats.update({f"memory_{name}": value for name, value in self.memory.stats().items()})
+      return stats
+
+  def _translated_groups(self, grouped_data, translations, target_lang, output_path):
+      translated_data = [
+          TranslatedGroup(group.text, translation, group.box, group.words)
+          for group, translation in zip(grouped_data, translations)
+      ]
+
+      # Save results
+      if output_path is not None:
+          save_page_text(translated_data, output_path)
+
+      self.logger.info(f"Translated {len(translated_data)} text groups to {target_lang}")
+      return translated_data
+
+  def translate_groups(self, grouped_data, target_lang="en", output_path=None):
+      """
+      Translate TextGroup records in memory and return TranslatedGroup records.
+
+      The words are shared with the input groups, not copied. The result is
+      also saved when an `output_path` is given.
+      """
+      try:
+          translations = self.translate_texts(group_texts(grouped_data), target_lang)
+          return self._translated_groups(grouped_data, translations, target_lang, output_path)
+
+      except Exception as e:
+          self.logger.error(f"Error translating text: {str(e)}")
+          return None
+
+  async def translate_groups_async(self, grouped_data, target_lang="en", output_path=None):
+      """Async version of translate_groups"""
+      try:
+          translations = await self.translate_texts_async(group_texts(grouped_data), target_lang)
+          return self._translated_groups(grouped_data, translations, target_lang, output_path)
+
+      except Exception as e:
+          self.logger.error(f"Error translating text: {str(e)}")
+          return None
+
+  def translate_text(self, extracted_text_path, target_lang="en"):
+      """Translate the grouped text file extracted from a comic page"""
+      try:
+          grouped_data = load_page_text(extracted_text_path)
+      except Exception as e:
+          self.logger.error(f"Error loading extracted text: {str(e)}")
+          return None
+      return self.translate_groups(grouped_data, target_lang, self.output_path(extracted_text_path))
+
+  async def translate_text_async(self, extracted_text_path, target_lang="en"):
+      """Async version of translate_text"""
+      try:
+          grouped_data = load_page_text(extracted_text_path)
+      except Exception as e:
+          self.logger.error(f"Error loading extracted text: {str(e)}")
+          return None
+      return await self.translate_groups_async(grouped_data, target_lang, self.output_path(extracted_text_path))
@@ -0,0 +1,216 @@
+# src/comic_translator/worker.py
+"""A resident worker that keeps the OCR model and browsers warm between jobs"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from .pipeline import PageJob
+
+DEFAULT_PORT = 8765
+
+class PageNamesInUse(Exception):
+  """A job names a page that another job is still processing"""
+
+def check_page_names(names):
+  """Reject page names that would write outside the data directories"""
+  for name in names:
+      if not isinstance(name, str) or not name or "/" in name or "\\" in name or ".." in name:
+          raise ValueError(f"invalid page name: {name!r}")
+
+class WorkerServer:
+  """
+  Serve page jobs over a local HTTP endpoint from one warm ComicTranslator.
+
+  The predictor is loaded (and browsers optionally started) once, when the
+  worker starts. Jobs from all clients run on a single event loop through
+  the translator's async API, so they share the OCR executor, the HTTP
+  sessions and the translation memory.
+
+  Page names become file names, so two jobs may not process the same name
+  at once (409). Jobs without names get names unique to the job.
+
+  Endpoints:
+    POST /jobs   {"urls": [...], "names": [...], "lang": "en"}
+    GET  /health
+    GET  /metrics  (Prometheus text format)
+  """
+  def __init__(self, translator=None, host="127.0.0.1", port=DEFAULT_PORT, max_in_flight=64,
+               warm_browsers=0, **translator_options):
+      self.logger = logging.getLogger(__name__)
+      if translator is None:
+          from .main import ComicTranslator
+          translator = ComicTranslator(**translator_options)
+      self.translator = translator
+      if warm_browsers:
+          self.translator.downloader.pool.warm(warm_browsers)
+      self.max_in_flight = max_in_flight
+      self.started = time.time()
+      self.jobs_completed = 0
+      self.pages_completed = 0
+      self._lock = threading.Lock()
+      self._names_in_flight = set()
+
+      self.loop = asyncio.new_event_loop()
+      self._loop_thread = None
+      worker = self
+
+      class Handler(BaseHTTPRequestHandler):
+          def do_GET(self):
+              path = self.path.split("?", 1)[0]
+              if path == "/health":
+                  worker._reply(self, 200, worker.health())
+              elif path == "/metrics":
+                  body = worker.translator.metrics.to_prometheus().encode("utf-8")
+                  self.send_response(200)
+                  self.send_header("Content-Type", "text/plain; version=0.0.4")
+                  self.send_header("Content-Length", str(len(body)))
+                  self.end_headers()
+                  self.wfile.write(body)
+              else:
+                  worker._reply(self, 404, {"error": "not found"})
+
+          def do_POST(self):
+              if self.path.split("?", 1)[0] != "/jobs":
+                  worker._reply(self, 404, {"error": "not found"})
+                  return
+              try:
+                  length = int(self.headers.get("Content-Length") or 0)
+                  request = json.loads(self.rfile.read(length) or b"{}")
+                  result = worker.run(request.get("urls") or [], request.get("names"), request.get("lang", "en"))
+              except PageNamesInUse as e:
+                  worker._reply(self, 409, {"error": str(e)})
+                  return
+              except (ValueError, TypeError) as e:
+                  worker._reply(self, 400, {"error": str(e)})
+                  return
+              except Exception as e:
+                  worker.logger.error(f"Job failed: {str(e)}")
+                  worker._reply(self, 500, {"error": str(e)})
+                  return
+              worker._reply(self, 200, result)
+
+          def log_message(self, format, *args):
+              worker.logger.debug(format % args)
+
+      self.server = ThreadingHTTPServer((host, port), Handler)
+      self.server.daemon_threads = True
+      self.host, self.port = self.server.server_address[:2]
+      self._thread = None
+
+  def url(self, path=""):
+      return f"http://{self.host}:{self.port}{path}"
+
+  def _reply(self, handler, status, payload):
+      body = json.dumps(payload).encode("utf-8")
+      handler.send_response(status)
+      handler.send_header("Content-Type", "application/json")
+      handler.send_header("Content-Length", str(len(body)))
+      handler.end_headers()
+      handler.wfile.write(body)
+
+  def health(self):
+      with self._lock:
+          return {
+              "status": "ok",
+              "uptime": time.time() - self.started,
+              "jobs_completed": self.jobs_completed,
+              "pages_completed": self.pages_completed,
+              "remotes": self.translator.request_state()
+          }
+
+  def run(self, urls, names=None, target_lang="en"):
+      """
+      Process pages on the worker's event loop and wait for the result.
+
+      Returns {"pages": {name: {"ok", "output", "failed_stage"}}} with the
+      pages in input order.
+      """
+      if isinstance(urls, str) or not all(isinstance(url, str) for url in urls):
+          raise ValueError("urls must be a list of strings")
+      if names is None:
+          job_id = uuid.uuid4().hex[:8]
+          names = [f"job-{job_id}-page{i}" for i in range(1, len(urls) + 1)]
+      urls, names = self.translator._page_names(urls, names)
+      check_page_names(names)
+      if len(set(names)) != len(names):
+          raise ValueError("page names must be unique within a job")
+
+      with self._lock:
+          busy = self._names_in_flight.intersection(names)
+          if busy:
+              raise PageNamesInUse(f"pages already being processed: {', '.join(sorted(busy))}")
+          self._names_in_flight.update(names)
+      try:
+          jobs = [PageJob(url, name, target_lang) for url, name in zip(urls, names)]
+          future = asyncio.run_coroutine_threadsafe(
+              self.translator.process_jobs(jobs, self.max_in_flight), self.loop
+          )
+          jobs = future.result()
+      finally:
+          with self._lock:
+              self._names_in_flight.difference_update(names)
+
+      pages = {
+          job.page_name: {"ok": job.succeeded, "output": job.output_path, "failed_stage": job.failed_stage}
+          for job in jobs
+      }
+      with self._lock:
+          self.jobs_completed += 1
+          self.pages_completed += sum(job.succeeded for job in jobs)
+      self.logger.info(f"Finished job with {sum(job.succeeded for job in jobs)}/{len(jobs)} pages")
+      return {"pages": pages}
+
+  def start(self):
+      """Start the event loop and the HTTP server in background threads"""
+      self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+      self._loop_thread.start()
+      self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+      self._thread.start()
+      self.logger.info(f"Worker listening on {self.url()}")
+      return self
+
+  def serve_forever(self):
+      """Serve until interrupted, for running the worker in the foreground"""
+      self.start()
+      try:
+          while self._thread.is_alive():
+              self._thread.join(timeout=1)
+      except KeyboardInterrupt:
+          pass
+      finally:
+          self.stop()
+
+  def stop(self):
+      self.server.shutdown()
+      self.server.server_close()
+      if self._loop_thread is not None:
+          asyncio.run_coroutine_threadsafe(self.translator.aclose(), self.loop).result(timeout=10)
+          self.loop.call_soon_threadsafe(self.loop.stop)
+          self._loop_thread.join(timeout=10)
+      self.loop.close()
+
+  def __enter__(self):
+      return self.start()
+
+  def __exit__(self, *exc):
+      self.stop()
+
+def submit_job(server_url, urls, names=None, target_lang="en", timeout=None):
+  """Send a job to a running worker and return its per-page results"""
+  import requests
+
+  response = requests.post(
+      server_url.rstrip("/") + "/jobs",
+      json={"urls": list(urls), "names": names, "lang": target_lang},
+      timeout=timeout
+  )
+  if response.status_code != 200:
+      try:
+          message = response.json().get("error")
+      except ValueError:
+          message = response.text
+      raise RuntimeError(f"Worker rejected the job ({response.status_code}): {message}")
+  return response.json()["pages"]
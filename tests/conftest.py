@@ -0,0 +1,7 @@
+import pytest
+from comic_translator.standin import StandinSite
+
+@pytest.fixture
+def site():
+  with StandinSite() as site:
+      yield site
@@ -0,0 +1,157 @@
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from PIL import Image
+from comic_translator.downloader import ComicDownloader
+from comic_translator.drivers import DriverPool
+from comic_translator.main import ComicTranslator
+from comic_translator.page_text import save_page_text
+from comic_translator.records import TextGroup
+from comic_translator.translation_backends import LocalBackend, TranslationBackend
+from comic_translator.translation_memory import TranslationMemory
+from comic_translator.translator import Translator
+
+IMAGE = b"\x89PNG\r\n\x1a\nfake image bytes"
+
+def fake_page(*words):
+  """Build a doctr-like result page holding one line per word."""
+  lines = [
+      SimpleNamespace(words=[SimpleNamespace(value=text, geometry=geometry, confidence=0.9)])
+      for text, geometry in words
+  ]
+  return SimpleNamespace(blocks=[SimpleNamespace(lines=lines)])
+
+class FakePredictor:
+  def __init__(self, **kwargs):
+      self.kwargs = kwargs
+      self.calls = []
+
+  def __call__(self, pages):
+      self.calls.append(len(pages))
+      # Encode the page width in the detected word so results can be matched to inputs
+      return SimpleNamespace(pages=[
+          fake_page((f"w{page.shape[1]}", ((0.1, 0.1), (0.3, 0.2)))) for page in pages
+      ])
+
+class RecordingBackend(TranslationBackend):
+  """Backend that upper-cases text and records every text it is sent."""
+  name = "recording"
+
+  def __init__(self, delay=0):
+      super().__init__()
+      self.calls = []
+      self.delay = delay
+
+  def translate_batch(self, texts, target, source="auto"):
+      with self._lock:
+          self.calls.extend(texts)
+      time.sleep(self.delay)
+      return [f"{target}:{text.upper()}" for text in texts]
+
+def make_translator(memory, delay=0):
+  translator = Translator(memory=memory, backend=RecordingBackend(delay))
+  translator.calls = translator.backend.calls
+  return translator
+
+class CountingDownloader:
+  def __init__(self, calls):
+      self.calls = calls
+
+  def download_comic_page(self, url, page_name):
+      self.calls["download"] += 1
+      path = Path("data/downloads") / f"{page_name}.jpg"
+      path.parent.mkdir(parents=True, exist_ok=True)
+      Image.new("RGB", (40, 60), "white").save(path)
+      return str(path)
+
+class CountingExtractor:
+  concurrency = 1
+
+  def close(self):
+      pass
+
+  def __init__(self, calls):
+      self.calls = calls
+
+  def params(self):
+      return {"model": "fake"}
+
+  def output_path(self, image_path):
+      return Path("data/extracted_text") / f"{Path(image_path).stem}_text.json"
+
+  def extract_text(self, image_path, save=True):
+      self.calls["extract"] += 1
+      data = [TextGroup("Hello", [], (0.1, 0.1, 0.9, 0.3))]
+      if save:
+          self.output_path(image_path).parent.mkdir(parents=True, exist_ok=True)
+          save_page_text(data, self.output_path(image_path))
+      return data
+
+class CountingGenerator:
+  def __init__(self, calls, fail=False):
+      self.calls = calls
+      self.fail = fail
+
+  def params(self):
+      return {"erase_mode": "box"}
+
+  def render(self, image_path, translated_data):
+      self.calls["render"] += 1
+      if self.fail:
+          return None
+      output_path = Path("data/output") / f"{Path(image_path).stem}_translated.jpg"
+      output_path.parent.mkdir(parents=True, exist_ok=True)
+      output_path.write_text(" ".join(group.translated_text for group in translated_data))
+      return str(output_path)
+
+def make_comic_translator(tmp_path, calls, fail_render=False, **options):
+  """A ComicTranslator whose stages only count their calls; `options` go to its constructor"""
+  return ComicTranslator(
+      manifest_dir=tmp_path / "data/manifests",
+      downloader=CountingDownloader(calls), extractor=CountingExtractor(calls),
+      translator=Translator(memory=TranslationMemory(tmp_path / "tm.sqlite3"), backend=LocalBackend()),
+      generator=CountingGenerator(calls, fail=fail_render), **options
+  )
+
+class FakeExtractor:
+  """Writes one text group per page and records the thread it ran on."""
+  concurrency = 1
+
+  def close(self):
+      pass
+
+  def __init__(self):
+      self.threads = set()
+
+  def extract_text(self, image_path, save=True):
+      self.threads.add(threading.current_thread().name)
+      name = image_path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+      data = [TextGroup(f"hello from {name}", [], (0.0, 0.0, 1.0, 1.0))]
+      if save:
+          save_page_text(data, self.output_path(image_path))
+      return data
+
+  def output_path(self, image_path):
+      return f"data/extracted_text/{image_path.rsplit('/', 1)[-1].rsplit('.', 1)[0]}_text.json"
+
+class StubGenerator:
+  """Pretends every page was rendered to out.jpg."""
+  def params(self):
+      return {}
+
+  def render(self, image_path, translated_data):
+      return "out.jpg"
+
+def make_site_translator(tmp_path):
+  """A ComicTranslator that downloads from a stand-in site and fakes OCR and rendering"""
+  downloader = ComicDownloader(
+      pool=DriverPool(size=1, factory=lambda: None), per_host_limit=32,
+      cache=None, use_cache=False
+  )
+  return ComicTranslator(
+      ocr_workers=1, render_workers=2, manifest_dir=None,
+      downloader=downloader, extractor=FakeExtractor(),
+      translator=Translator(memory=TranslationMemory(tmp_path / "tm.sqlite3"), backend=LocalBackend(latency=0.05)),
+      generator=StubGenerator()
+  )
@@ -0,0 +1,48 @@
+import asyncio
+import time
+from comic_translator.translation_memory import TranslationMemory
+from helpers import IMAGE, make_site_translator, make_translator
+
+def test_process_many_keeps_pages_in_flight(site, tmp_path, monkeypatch):
+  """Downloads overlap on one event loop while OCR stays on its executor."""
+  monkeypatch.chdir(tmp_path)
+  (tmp_path / "data/extracted_text").mkdir(parents=True)
+  urls = []
+  for n in range(1, 17):
+      url = site.add_reader_page(IMAGE, page=n, mode="payload")
+      site.routes[url[len(site.url("")):]]["delay"] = 0.2
+      urls.append(url)
+  urls.append(site.url("/missing-page-1.html"))
+  translator = make_site_translator(tmp_path)
+
+  async def run():
+      try:
+          return await translator.process_many(urls, target_lang="pt")
+      finally:
+          await translator.aclose()
+
+  start = time.perf_counter()
+  results = asyncio.run(run())
+  elapsed = time.perf_counter() - start
+
+  assert results == {**{f"page{n}": True for n in range(1, 17)}, "page17": False}
+  # Sequential downloads alone would take 16 * 0.2 = 3.2s
+  assert elapsed < 2.0
+  assert site.max_active > 4
+  assert {name.split("_")[0] for name in translator.extractor.threads} == {"comic-ocr"}
+  assert (tmp_path / "data/translated_text/page3_text_translated.json").exists()
+
+def test_concurrent_async_translations_share_requests(tmp_path, monkeypatch):
+  """Coroutines asking for the same text wait for one backend request."""
+  monkeypatch.chdir(tmp_path)
+  translator = make_translator(memory=TranslationMemory(tmp_path / "tm.sqlite3"), delay=0.1)
+
+  async def run():
+      return await asyncio.gather(*(
+          translator.translate_texts_async(["Hey!", "Kaito", "Hey!"], "pt") for _ in range(5)
+      ))
+
+  results = asyncio.run(run())
+
+  assert results == [["pt:HEY!", "pt:KAITO", "pt:HEY!"]] * 5
+  assert sorted(translator.calls) == ["Hey!", "Kaito"]
@@ -0,0 +1,40 @@
+from PIL import Image
+from comic_translator import text_extraction
+from comic_translator.text_extraction import TextExtractor
+from helpers import FakePredictor
+
+def make_extractor(monkeypatch, tmp_path, **kwargs):
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", FakePredictor)
+  return TextExtractor(**kwargs)
+
+def test_batch_matches_single_page_output(monkeypatch, tmp_path):
+  """Each page of a batch gets the same grouped data extract_text produces."""
+  extractor = make_extractor(monkeypatch, tmp_path, det_bs=4, reco_bs=256, pages_per_batch=3)
+  assert extractor.predictor.kwargs["det_bs"] == 4
+  assert extractor.predictor.kwargs["reco_bs"] == 256
+
+  paths = []
+  for width in (40, 50, 60, 70, 80):
+      path = tmp_path / f"page{width}.png"
+      Image.new("RGB", (width, 30), "white").save(path)
+      paths.append(str(path))
+
+  results = extractor.extract_text_batch(paths)
+
+  assert extractor.predictor.calls == [3, 2]
+  assert [r[0]["text"] for r in results] == ["w40", "w50", "w60", "w70", "w80"]
+  assert results[0] == extractor.extract_text(paths[0])
+  assert (tmp_path / "data/extracted_text/page80_text.json").exists()
+
+def test_batch_skips_unreadable_pages(monkeypatch, tmp_path):
+  """A page that cannot be loaded gets None without failing the batch."""
+  extractor = make_extractor(monkeypatch, tmp_path)
+  good = tmp_path / "good.png"
+  Image.new("RGB", (40, 30), "white").save(good)
+
+  results = extractor.extract_text_batch([str(tmp_path / "missing.png"), str(good)])
+
+  assert results[0] is None
+  assert results[1][0]["text"] == "w40"
+  assert extractor.predictor.calls == [1]
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import subprocess
+import sys
+from comic_translator.benchmark import PAGE_SIZES, STAGES, StageTimer, main, synthetic_page
+
+def test_synthetic_strip_has_known_words():
+  """Generated pages carry ground truth for every word drawn on them."""
+  width, height, bubbles = PAGE_SIZES["strip"]
+
+  image, words = synthetic_page(width, height, bubbles, seed=3)
+
+  assert image.size == (width, height)
+  assert len({word["line_idx"].split("_")[0] for word in words}) == bubbles
+  assert all(0 <= x <= 1 and 0 <= y <= 1 for word in words for x, y in word["bbox"])
+  # Bubbles are spread over the whole strip
+  assert max(word["bbox"][1][1] for word in words) > 0.9
+
+def test_stage_timer_counts_pages_timed_from_many_threads():
+  """Durations and failures of pages timed concurrently are all counted."""
+  with StageTimer("ocr") as timer, ThreadPoolExecutor(max_workers=8) as executor:
+      list(executor.map(lambda n: timer.time(lambda: n % 2), range(2000)))
+
+  assert len(timer.durations) == 2000
+  assert timer.failures == 1000
+
+def test_benchmark_reports_every_stage(tmp_path, monkeypatch):
+  """A small offline run writes latency and throughput for each stage, and peak memory once."""
+  monkeypatch.chdir(tmp_path)
+
+  assert main(["--pages", "2", "--strips", "1", "--small", "0", "--output", "bench.json"]) == 0
+
+  results = json.loads((tmp_path / "bench.json").read_text())
+  assert set(results["stages"]) == set(STAGES)
+  assert results["corpus"]["pages"] == 3
+  assert results["stages"]["ocr"]["skipped"] is True
+  for stage in ("download", "grouping", "translation", "rendering"):
+      report = results["stages"][stage]
+      assert report["pages"] == 3 and report["failures"] == 0
+      assert report["throughput_pages_s"] > 0
+      latency = report["latency_ms"]
+      assert latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+  assert results["process_peak_rss_mb"] > 0
+  assert len(list((tmp_path / "data/benchmark/output").iterdir())) == 3
+
+def test_benchmark_imports_without_the_resource_module():
+  """The benchmark runs on Windows, where peak memory is reported as None."""
+  statement = (
+      "import sys; sys.modules['resource'] = None; "
+      "from comic_translator.benchmark import peak_rss_mb; print(peak_rss_mb())"
+  )
+  result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True)
+
+  assert result.returncode == 0, result.stderr
+  assert result.stdout.strip() == "None"
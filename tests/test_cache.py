@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from comic_translator.cache import DownloadCache
+from comic_translator.downloader import ComicDownloader
+from comic_translator.fetch import HttpFetcher
+
+def blobs(cache):
+  return [p for p in cache.objects_dir.rglob("*") if p.is_file()]
+
+def test_rerun_makes_no_image_transfers(site, tmp_path, monkeypatch):
+  """A second run over the same chapter only revalidates the images."""
+  monkeypatch.chdir(tmp_path)
+  urls = [site.add_reader_page(f"image {n}".encode(), page=n) for n in range(1, 4)]
+  names = [f"page{n}" for n in range(1, 4)]
+
+  first = ComicDownloader(browserless=True).download_comic_pages(urls, names)
+  downloader = ComicDownloader(browserless=True)
+  second = downloader.download_comic_pages(urls, names)
+
+  assert first == second
+  assert [Path(p).read_bytes() for p in second] == [f"image {n}".encode() for n in range(1, 4)]
+  image_transfers = {path: n for path, n in site.transfers.items() if path.startswith("/manga/")}
+  assert list(image_transfers.values()) == [1, 1, 1]
+  assert downloader.cache.hits == 3
+  assert downloader.cache.misses == 0
+
+def test_identical_images_are_stored_once(site, tmp_path):
+  """Two URLs serving the same bytes share a single blob."""
+  cache = DownloadCache(root=tmp_path / "cache")
+  fetcher = HttpFetcher()
+  a = site.add("/a.png", b"same bytes", "image/png")
+  b = site.add("/b.png", b"same bytes", "image/png")
+
+  cache.fetch(fetcher, a, tmp_path / "a.png")
+  cache.fetch(fetcher, b, tmp_path / "b.png")
+
+  assert len(blobs(cache)) == 1
+  assert (tmp_path / "b.png").read_bytes() == b"same bytes"
+
+def test_changed_image_is_downloaded_again(site, tmp_path):
+  """A new ETag on the origin replaces the cached copy."""
+  cache = DownloadCache(root=tmp_path / "cache")
+  fetcher = HttpFetcher()
+  url = site.add("/page.png", b"v1", "image/png", headers={"ETag": '"v1"'})
+  cache.fetch(fetcher, url, tmp_path / "page.png")
+
+  site.add("/page.png", b"v2", "image/png", headers={"ETag": '"v2"'})
+  cache.fetch(fetcher, url, tmp_path / "page.png")
+
+  assert (tmp_path / "page.png").read_bytes() == b"v2"
+  assert cache.misses == 2
+  assert cache.lookup(url)["etag"] == '"v2"'
+
+def test_lru_eviction_bounds_cache_size(site, tmp_path):
+  """The least recently used images are evicted once over max_bytes."""
+  cache = DownloadCache(root=tmp_path / "cache", max_bytes=250)
+  fetcher = HttpFetcher()
+  urls = [site.add(f"/{n}.png", bytes([n]) * 100, "image/png") for n in range(3)]
+
+  cache.fetch(fetcher, urls[0], tmp_path / "0.png")
+  cache.fetch(fetcher, urls[1], tmp_path / "1.png")
+  cache.fetch(fetcher, urls[0], tmp_path / "0.png")  # 0 is now more recent than 1
+  cache.fetch(fetcher, urls[2], tmp_path / "2.png")
+
+  assert cache.total_bytes() <= 250
+  assert cache.lookup(urls[1]) is None
+  assert cache.lookup(urls[0]) is not None
+  assert len(blobs(cache)) == 2
+
+def test_concurrent_stores_and_evictions_keep_entries_and_blobs_together(tmp_path):
+  """No entry is left pointing at a blob that a concurrent eviction removed."""
+  cache = DownloadCache(root=tmp_path / "cache", max_bytes=250)
+
+  def store(n):
+      incoming = tmp_path / f"incoming-{n}"
+      incoming.write_bytes(bytes([n % 3]) * 100)
+      cache.store(f"https://example.com/{n}.png", incoming)
+
+  with ThreadPoolExecutor(max_workers=8) as executor:
+      list(executor.map(store, range(200)))
+
+  digests = [row[0] for row in cache._db.execute("SELECT digest FROM entries")]
+  assert digests and all(cache.blob_path(digest).exists() for digest in digests)
+  assert cache.total_bytes() <= 250
+  cache.close()
@@ -0,0 +1,78 @@
+import threading
+import time
+from pathlib import Path
+from comic_translator.downloader import ComicDownloader
+from comic_translator.drivers import DriverPool
+from comic_translator.prefetch import PagePrefetcher
+from helpers import IMAGE, make_site_translator
+
+def add_chapter(site, pages):
+  return [site.add_reader_page(IMAGE + bytes([n]), page=n, mode="payload", pages=pages) for n in range(1, pages + 1)]
+
+def test_one_reader_page_lists_the_whole_chapter(site, tmp_path, monkeypatch):
+  """Every page image is known after fetching a single reader page."""
+  monkeypatch.chdir(tmp_path)
+  urls = add_chapter(site, 5)
+  downloader = ComicDownloader(pool=DriverPool(size=1, factory=lambda: None), use_cache=False)
+
+  pages = downloader.find_chapter_pages(urls[2])
+
+  assert [page_url for page_url, _ in pages] == urls
+  assert [image_url for _, image_url in pages] == [site.url(f"/manga/Demo-Comic/0001-{n:03d}.png") for n in range(1, 6)]
+  assert sum(site.hits[url[len(site.url("")):]] for url in urls) == 1
+
+def test_prefetcher_keeps_downloads_ahead_of_the_reader():
+  """Only the first page is waited for; the window never runs far ahead."""
+  started = []
+  lock = threading.Lock()
+
+  def download(image_url, page_name):
+      with lock:
+          started.append(page_name)
+      time.sleep(0.05)
+      return f"{page_name}.jpg"
+
+  pages = [(f"img{n}", f"p{n}") for n in range(8)]
+  with PagePrefetcher(download, pages, lookahead=2) as prefetcher:
+      paths = []
+      for _, name in pages:
+          paths.append(prefetcher.get(name))
+          with lock:
+              assert len(started) <= len(paths) + 2
+          # OCR of the page takes longer than downloading the next one
+          time.sleep(0.1)
+
+  assert paths == [f"p{n}.jpg" for n in range(8)]
+  assert prefetcher.waited == 1 and prefetcher.ready == 7
+
+def test_process_chapter_url_runs_every_discovered_page(site, tmp_path, monkeypatch):
+  """A chapter URL is enough to translate all of its pages."""
+  monkeypatch.chdir(tmp_path)
+  (tmp_path / "data/extracted_text").mkdir(parents=True)
+  urls = add_chapter(site, 4)
+  translator = make_site_translator(tmp_path)
+
+  results = translator.process_chapter_url(urls[0], lookahead=2)
+
+  assert results == {f"Demo-Comic-chapter-1-page-{n}": True for n in range(1, 5)}
+  assert Path("data/downloads/Demo-Comic-chapter-1-page-3.jpg").read_bytes() == IMAGE + bytes([3])
+  # Pages after the first are never fetched as reader pages
+  assert all(site.hits[url[len(site.url("")):]] == 0 for url in urls[1:])
+  assert translator.process_chapter_url(site.url("/read-online/missing-chapter-1.html")) == {}
+
+def test_closing_the_prefetcher_waits_for_running_downloads():
+  """No download is still writing once the prefetcher is closed; queued ones never start."""
+  finished = []
+
+  def download(image_url, page_name):
+      time.sleep(0.1)
+      finished.append(page_name)
+      return page_name
+
+  pages = [(f"img{n}", f"p{n}") for n in range(6)]
+  with PagePrefetcher(download, pages, lookahead=4, workers=2):
+      time.sleep(0.02)
+  done = list(finished)
+  time.sleep(0.3)
+
+  assert done == finished and sorted(done) == ["p0", "p1"]
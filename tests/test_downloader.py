@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+from comic_translator.downloader import ComicDownloader
+from comic_translator.drivers import DriverPool
+from comic_translator.scraper import parse_image_url
+
+IMAGE = b"\x89PNG\r\n\x1a\nfake image bytes"
+
+class FakeElement:
+  def __init__(self, src):
+      self.src = src
+
+  def get_attribute(self, name):
+      return self.src
+
+class FakeDriver:
+  """Stands in for Chrome: 'renders' pages by looking up the image the site would inject."""
+  def __init__(self, site):
+      self.site = site
+      self.current_url = None
+      self.quit_called = False
+
+  def get(self, url):
+      self.current_url = url
+
+  def find_element(self, by, value):
+      page = self.current_url.rsplit("-page-", 1)[1].split(".")[0]
+      return FakeElement(self.site.url(f"/manga/Demo-Comic/0001-{int(page):03d}.png"))
+
+  def quit(self):
+      self.quit_called = True
+
+@pytest.fixture
+def pool(site):
+  pool = DriverPool(size=2, factory=lambda: FakeDriver(site))
+  yield pool
+  pool.close()
+
+@pytest.mark.parametrize("mode", ["static", "payload"])
+def test_browserless_download(site, pool, tmp_path, monkeypatch, mode):
+  """Static and payload pages are resolved over plain HTTP without a browser."""
+  monkeypatch.chdir(tmp_path)
+  url = site.add_reader_page(IMAGE, page=3, mode=mode)
+
+  path = ComicDownloader(pool=pool).download_comic_page(url, "page3")
+
+  assert Path(path).read_bytes() == IMAGE
+  assert pool.created == 0
+
+def test_falls_back_to_browser(site, pool, tmp_path, monkeypatch):
+  """Pages that need JavaScript are rendered by a pooled driver."""
+  monkeypatch.chdir(tmp_path)
+  url = site.add_reader_page(IMAGE, page=2, mode="script")
+
+  path = ComicDownloader(pool=pool).download_comic_page(url, "page2")
+
+  assert Path(path).read_bytes() == IMAGE
+  assert pool.created == 1
+
+def test_pool_reuses_warm_sessions(site, pool, tmp_path, monkeypatch):
+  """Concurrent downloads never start more browsers than the pool size."""
+  monkeypatch.chdir(tmp_path)
+  downloader = ComicDownloader(pool=pool, browserless=False)
+  urls = [site.add_reader_page(IMAGE, page=n, mode="script") for n in range(1, 9)]
+
+  with ThreadPoolExecutor(max_workers=4) as executor:
+      paths = list(executor.map(downloader.download_comic_page, urls, [f"p{n}" for n in range(8)]))
+
+  assert all(paths)
+  assert pool.created <= 2
+
+def test_parse_image_url_from_payload():
+  """The templated image source is rebuilt from the embedded chapter data."""
+  html = """
+  <img class="img-fluid" ng-src="https://{{vm.CurPathName}}/manga/{{vm.IndexName}}/x.png">
+  <script>
+  vm.IndexName = "Some-Comic";
+  vm.CurPathName = "img.example.com";
+  vm.CurChapter = {"Chapter":"100105","Type":"Chapter","Page":"40","Directory":"S2"};
+  </script>
+  """
+  url = parse_image_url(html, "https://reader.example.com/read-online/Some-Comic-chapter-10.5-page-7.html")
+
+  assert url == "https://img.example.com/manga/Some-Comic/S2/0010.5-007.png"
@@ -0,0 +1,88 @@
+import asyncio
+from pathlib import Path
+import tracemalloc
+import pytest
+from comic_translator.fetch import AsyncHttpFetcher, HttpFetcher
+
+def test_streams_large_image_with_flat_memory(site, tmp_path):
+  """A large strip is written in chunks, not held in memory."""
+  body = bytes(range(256)) * (16 * 1024 * 4)  # 16 MiB
+  url = site.add("/strip.png", body, "image/png")
+  fetcher = HttpFetcher(chunk_size=64 * 1024)
+
+  tracemalloc.start()
+  path = fetcher.fetch_to_file(url, tmp_path / "strip.png")
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  assert Path(path).read_bytes() == body
+  assert peak < 4 * 1024 * 1024
+  assert list(tmp_path.glob("*.part")) == []
+
+def test_failed_download_leaves_no_file(site, tmp_path):
+  """HTTP errors raise and never leave a partial or empty image behind."""
+  fetcher = HttpFetcher()
+
+  with pytest.raises(Exception):
+      fetcher.fetch_to_file(site.url("/missing.png"), tmp_path / "missing.png")
+
+  assert list(tmp_path.iterdir()) == []
+
+def test_fetch_many_is_concurrent_and_bounded_per_host(site, tmp_path):
+  """Images download in parallel without exceeding the per-host limit."""
+  items = [
+      (site.add(f"/img{n}.png", f"image {n}".encode(), "image/png", delay=0.1), tmp_path / f"{n}.png")
+      for n in range(12)
+  ]
+  items.append((site.url("/missing.png"), tmp_path / "missing.png"))
+  fetcher = HttpFetcher(per_host_limit=3)
+
+  paths = fetcher.fetch_many(items, workers=8)
+
+  assert paths[-1] is None
+  assert [Path(p).read_bytes() for p in paths[:-1]] == [f"image {n}".encode() for n in range(12)]
+  assert site.max_active == 3
+  assert len(fetcher._sessions) == 1
+
+def test_async_session_of_a_finished_loop_is_closed(site, tmp_path):
+  """Using the async fetcher from a new event loop closes the session of the old one."""
+  url = site.add("/a.png", b"image", "image/png")
+  fetcher = AsyncHttpFetcher()
+
+  async def fetch(name):
+      await fetcher.fetch_to_file(url, tmp_path / name)
+      return await fetcher.session()
+
+  first = asyncio.run(fetch("a.png"))
+  second = asyncio.run(fetch("b.png"))
+  asyncio.run(fetcher.close())
+
+  assert first is not second and first.closed and second.closed
+  assert (tmp_path / "b.png").read_bytes() == b"image"
+
+def test_async_body_is_written_in_blocks(site, tmp_path, monkeypatch):
+  """The async fetcher writes a body in a few large blocks, not one thread hop per chunk."""
+  body = bytes(range(256)) * (4 * 1024 * 3)  # 3 MiB
+  url = site.add("/strip.png", body, "image/png")
+  fetcher = AsyncHttpFetcher(chunk_size=64 * 1024, write_size=1024 * 1024)
+  writes = []
+  to_thread = asyncio.to_thread
+
+  async def counting_to_thread(fn, *args):
+      if getattr(fn, "__name__", "") == "write":
+          writes.append(len(args[0]))
+      return await to_thread(fn, *args)
+
+  monkeypatch.setattr(asyncio, "to_thread", counting_to_thread)
+
+  async def fetch():
+      try:
+          return await fetcher.fetch_to_file(url, tmp_path / "strip.png")
+      finally:
+          await fetcher.close()
+
+  path = asyncio.run(fetch())
+
+  assert Path(path).read_bytes() == body
+  assert sum(writes) == len(body)
+  assert 3 <= len(writes) <= 4
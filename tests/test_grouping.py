@@ -0,0 +1,70 @@
+import time
+import numpy as np
+from comic_translator.grouping import GroupingEngine, cluster_points, connected_components
+
+def bubble(x, y, lines, word_w=40, word_h=20, gap=8, leading=6):
+  """Boxes for a bubble of `lines` rows of words, each row a list of word counts."""
+  boxes = []
+  for row, count in enumerate(lines):
+      top = y + row * (word_h + leading)
+      for n in range(count):
+          left = x + n * (word_w + gap)
+          boxes.append([left, top, left + word_w, top + word_h])
+  return boxes
+
+def brute_force_labels(points, eps):
+  n = len(points)
+  dist = np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1))
+  pairs = np.argwhere(np.triu(dist <= eps, 1))
+  return connected_components(n, pairs)
+
+def same_partition(a, b):
+  return len(set(zip(a, b))) == len(set(a)) == len(set(b))
+
+def test_bubbles_are_grouped_in_reading_order():
+  """Multi-line bubbles become one group each with words line by line."""
+  left = bubble(50, 100, [3, 2, 3])
+  right = bubble(400, 100, [2, 2])  # Same rows as the left bubble, far to the right
+  below = bubble(60, 600, [1])
+  boxes = np.array(right + below + left, dtype=float)
+
+  groups = GroupingEngine().group(boxes)
+
+  assert [len(g) for g in groups] == [8, 4, 1]
+  first = boxes[groups[0]]
+  assert np.all(np.diff(first[:3, 0]) > 0)
+  assert np.all(first[:3, 1] == 100) and np.all(first[3:5, 1] == 126)
+
+def test_thresholds_are_configurable():
+  """Tighter gaps split lines apart; zero gaps keep every word separate."""
+  boxes = np.array(bubble(0, 0, [2, 2]), dtype=float)
+
+  assert len(GroupingEngine().group(boxes)) == 1
+  assert len(GroupingEngine(max_gap_y=0.1).group(boxes)) == 2
+  assert len(GroupingEngine(max_gap_x=0.0, max_gap_y=0.0).group(boxes)) == 4
+
+def test_cluster_points_matches_brute_force():
+  """Grid clustering agrees with the all-pairs definition (DBSCAN, min_samples=1)."""
+  rng = np.random.default_rng(0)
+  points = rng.uniform(0, 1000, size=(400, 2))
+
+  labels = cluster_points(points, eps=40)
+
+  assert same_partition(labels, brute_force_labels(points, 40))
+
+def test_dense_strip_groups_quickly():
+  """Thousands of words on a long strip group in well under a second."""
+  boxes = []
+  for n in range(500):
+      boxes += bubble(50 + (n % 3) * 250, n * 160, [3, 3, 2])
+  boxes = np.array(boxes, dtype=float)
+  engine = GroupingEngine()
+
+  start = time.perf_counter()
+  groups = engine.group(boxes)
+  elapsed = time.perf_counter() - start
+
+  assert len(boxes) == 4000
+  assert len(groups) == 500
+  assert elapsed < 1.0
+  assert engine.last_duration <= elapsed
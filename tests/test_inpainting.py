@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+from comic_translator.image_generator import ImageGenerator
+from comic_translator.inpainting import inpaint_regions, inpaint_rois
+from comic_translator.utils import save_json
+
+def textured_page(width=400, height=3000):
+  """A gradient page with dark 'text' bars drawn on it."""
+  ramp = np.linspace(80, 220, height, dtype=np.uint8)[:, None]
+  pixels = np.dstack([np.repeat(ramp, width, axis=1)] * 3)
+  image = Image.fromarray(pixels)
+  boxes = [(40, 100, 120, 20), (40, 126, 90, 20), (250, 1500, 100, 24), (30, 2900, 60, 18)]
+  draw = ImageDraw.Draw(image)
+  for x, y, w, h in boxes:
+      draw.rectangle([x, y, x + w, y + h], fill=(0, 0, 0))
+  return image, boxes
+
+def test_rois_merge_neighbours_and_never_overlap():
+  """Nearby boxes share a region; distant ones get their own."""
+  _, boxes = textured_page()
+
+  rois = inpaint_rois(boxes, 400, 3000, margin=8)
+
+  assert sorted(sorted(members) for _, members in rois) == [[0, 1], [2], [3]]
+  for n, (a, _) in enumerate(rois):
+      for b, _ in rois[n + 1:]:
+          assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+  assert all(0 <= x0 < x1 <= 400 and 0 <= y0 < y1 <= 3000 for (x0, y0, x1, y1), _ in rois)
+
+def test_roi_inpainting_matches_full_page():
+  """Inpainting only the regions gives the full-page result and leaves the rest untouched."""
+  image, boxes = textured_page()
+  original = np.array(image)
+  mask = np.zeros(original.shape[:2], dtype=np.uint8)
+  for x, y, w, h in boxes:
+      cv2.rectangle(mask, (x, y), (x + w, y + h), 255, -1)
+  expected = cv2.inpaint(original, mask, 3, cv2.INPAINT_TELEA)
+
+  result = np.array(inpaint_regions(image, boxes, margin=8, radius=3, workers=3))
+
+  inside = mask > 0
+  assert np.abs(result[inside].astype(int) - expected[inside].astype(int)).mean() < 3
+  assert result[inside].min() > 40  # the black bars are gone
+  assert np.array_equal(result[~inside], original[~inside])
+
+def test_boxes_off_the_page_are_skipped():
+  """A box clipped to nothing at the page edge does not stop the others from being inpainted."""
+  image, boxes = textured_page(height=600)
+  boxes = [(40, 100, 120, 20), (420, 100, 30, 20), (100, -50, 40, 10)]
+
+  result = np.array(inpaint_regions(image, boxes, margin=8))
+
+  assert result[105:115, 45:155].min() > 40
+
+def test_image_generator_inpaint_mode(tmp_path, monkeypatch):
+  """ImageGenerator can erase text by inpainting instead of white boxes."""
+  monkeypatch.chdir(tmp_path)
+  image, boxes = textured_page(400, 600)
+  image.save(tmp_path / "page1.png")
+  x, y, w, h = boxes[0]
+  bbox = [[x / 400, y / 600], [(x + w) / 400, (y + h) / 600]]
+  save_json([{"translated_text": "", "bbox": bbox, "original_words": [{"bbox": bbox}]}],
+            tmp_path / "page1_text_translated.json")
+
+  output = ImageGenerator(erase_mode="inpaint").generate_translated_image(
+      str(tmp_path / "page1.png"), tmp_path / "page1_text_translated.json")
+
+  erased = np.array(Image.open(output))[y + 2:y + h - 2, x + 2:x + w - 2]
+  assert erased.min() > 40
+  assert erased.max() < 250  # background was reconstructed, not painted white
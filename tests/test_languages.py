@@ -0,0 +1,64 @@
+import time
+from collections import Counter
+import numpy as np
+from PIL import Image
+from comic_translator.image_generator import ImageGenerator
+from comic_translator.records import TextGroup, TranslatedGroup, Word
+from comic_translator.translation_backends import LocalBackend
+from helpers import make_comic_translator
+
+class TimedBackend(LocalBackend):
+  """Records when each language's request started and finished."""
+  def __init__(self, latency):
+      super().__init__(latency=latency)
+      self.spans = {}
+
+  def translate_batch(self, texts, target, source="auto"):
+      start = time.perf_counter()
+      result = super().translate_batch(texts, target, source)
+      self.spans[target] = (start, time.perf_counter())
+      return result
+
+def test_languages_share_one_download_ocr_and_background(tmp_path, monkeypatch):
+  """Each extra language only costs a translation and a text overlay."""
+  monkeypatch.chdir(tmp_path)
+  calls = Counter()
+  erased = []
+  erase_text = ImageGenerator.erase_text
+  monkeypatch.setattr(ImageGenerator, "erase_text", lambda self, *a: erased.append(1) or erase_text(self, *a))
+  translator = make_comic_translator(tmp_path, calls)
+  backend = translator.translator.backend = TimedBackend(latency=0.2)
+  translator.generator = ImageGenerator()
+
+  results = translator.process_comic_page_languages("url", "page1", ["pt", "es", "fr", "pt"])
+
+  assert results == {"pt": True, "es": True, "fr": True}
+  assert calls == {"download": 1, "extract": 1}
+  assert len(erased) == 1
+  # Translations into the three languages overlap instead of queueing
+  assert sorted(backend.spans) == ["es", "fr", "pt"]
+  assert max(start for start, _ in backend.spans.values()) < min(end for _, end in backend.spans.values())
+  output = tmp_path / "data/output"
+  assert sorted(p.name for p in output.iterdir()) == [
+      "page1_clean.png", "page1_translated_es.jpg", "page1_translated_fr.jpg", "page1_translated_pt.jpg"
+  ]
+  assert (tmp_path / "data/translated_text/page1_text_translated_es.json").exists()
+
+def test_overlays_differ_but_background_is_shared(tmp_path, monkeypatch):
+  """Every language is drawn onto the same cleaned background."""
+  monkeypatch.chdir(tmp_path)
+  Image.new("RGB", (200, 100), (200, 200, 200)).save(tmp_path / "page.png")
+  word = Word("Hi", (0.1, 0.1, 0.9, 0.9))
+  group = TextGroup("Hi", [word], word.box)
+  translations = {
+      lang: [TranslatedGroup(group.text, text, group.box, group.words)]
+      for lang, text in (("en", "Hello"), ("pt", "Olá, tudo bem?"))
+  }
+
+  outputs = ImageGenerator().render_languages(tmp_path / "page.png", translations)
+
+  clean = np.array(Image.open(tmp_path / "data/output/page_clean.png"))
+  assert clean[50, 100].tolist() == [255, 255, 255]
+  en, pt = (np.array(Image.open(outputs[lang])) for lang in ("en", "pt"))
+  assert not np.array_equal(en, pt)
+  assert outputs["pt"].endswith("page_translated_pt.jpg")
@@ -0,0 +1,50 @@
+from PIL import Image
+from comic_translator.image_generator import ImageGenerator
+from comic_translator.layout import TextLayout, load_font, text_width
+from comic_translator.utils import save_json
+
+def test_fit_wraps_text_inside_the_box():
+  """Long text is wrapped over several lines that all fit the box."""
+  layout = TextLayout(min_size=8, max_size=40)
+  text = "I never thought the gacha would give me something like this"
+
+  fitted = layout.fit(text, 160, 120)
+
+  assert len(fitted.lines) > 1
+  assert " ".join(fitted.lines) == text
+  assert fitted.width <= 160
+  assert fitted.height <= 120
+  assert not layout.fits(text, fitted.size + 1, 160, 120) or fitted.size == 40
+
+def test_fit_finds_the_largest_size():
+  """Binary search lands on the same size a linear scan would pick."""
+  layout = TextLayout(min_size=6, max_size=60)
+  linear = max(size for size in range(6, 61) if layout.fits("Hey!", size, 90, 40))
+
+  assert layout.fit("Hey!", 90, 40).size == linear
+
+def test_page_render_uses_few_font_loads(tmp_path, monkeypatch):
+  """Rendering a text-heavy page loads each font size at most once."""
+  monkeypatch.chdir(tmp_path)
+  load_font.cache_clear()
+  text_width.cache_clear()
+
+  image_path = tmp_path / "page1.jpg"
+  Image.new("RGB", (800, 1200), "white").save(image_path)
+  entries = []
+  for n in range(60):
+      top = 0.01 + (n % 30) * 0.032
+      left = 0.05 if n < 30 else 0.55
+      box = [[left, top], [left + 0.35, top + 0.025]]
+      entries.append({
+          "original_text": f"line {n}",
+          "translated_text": f"translated line number {n}",
+          "bbox": box,
+          "original_words": [{"bbox": box}]
+      })
+  save_json(entries, tmp_path / "page1_text_translated.json")
+
+  output = ImageGenerator().generate_translated_image(str(image_path), tmp_path / "page1_text_translated.json")
+
+  assert output is not None
+  assert load_font.cache_info().misses <= 8
@@ -0,0 +1,65 @@
+from collections import Counter
+from pathlib import Path
+from comic_translator.manifest import PageManifest
+from helpers import make_comic_translator
+
+def test_rerun_skips_unchanged_stages(tmp_path, monkeypatch):
+  """A second run with the same inputs does no work at all."""
+  monkeypatch.chdir(tmp_path)
+  calls = Counter()
+
+  assert make_comic_translator(tmp_path, calls).process_comic_page("url", "page1", "pt")
+  assert make_comic_translator(tmp_path, calls).process_comic_page("url", "page1", "pt")
+
+  assert calls == {"download": 1, "extract": 1, "render": 1}
+  assert (tmp_path / "data/manifests/page1.json").exists()
+
+def test_new_language_reruns_only_translation_and_rendering(tmp_path, monkeypatch):
+  """Switching the target language keeps the download and OCR results."""
+  monkeypatch.chdir(tmp_path)
+  calls = Counter()
+  make_comic_translator(tmp_path, calls).process_comic_page("url", "page1", "pt")
+
+  translator = make_comic_translator(tmp_path, calls)
+  assert translator.process_comic_page("url", "page1", "es")
+
+  assert calls == {"download": 1, "extract": 1, "render": 2}
+  assert translator.translator.backend.requests == 1
+  assert "[es] Hello" in (tmp_path / "data/output/page1_translated.jpg").read_text()
+
+def test_interrupted_chapter_resumes_at_failed_stage(tmp_path, monkeypatch):
+  """Pages resume from the first stage that did not complete."""
+  monkeypatch.chdir(tmp_path)
+  calls = Counter()
+  # Chapter render workers share the generator passed to the translator
+  failed = make_comic_translator(tmp_path, calls, fail_render=True)
+  assert failed.process_chapter(["a", "b"], ["page1", "page2"], "pt") == {"page1": False, "page2": False}
+
+  resumed = make_comic_translator(tmp_path, calls)
+  assert resumed.process_chapter(["a", "b"], ["page1", "page2"], "pt") == {"page1": True, "page2": True}
+
+  assert calls == {"download": 2, "extract": 2, "render": 4}
+  assert resumed.translator.backend.requests == 0
+
+def test_changed_output_or_force_reruns_stage(tmp_path, monkeypatch):
+  """Edited outputs are not trusted, and resume=False runs everything again."""
+  monkeypatch.chdir(tmp_path)
+  calls = Counter()
+  make_comic_translator(tmp_path, calls).process_comic_page("url", "page1", "pt")
+
+  Path("data/output/page1_translated.jpg").write_bytes(b"edited")
+  make_comic_translator(tmp_path, calls).process_comic_page("url", "page1", "pt")
+  assert calls == {"download": 1, "extract": 1, "render": 2}
+
+  make_comic_translator(tmp_path, calls, resume=False).process_comic_page("url", "page1", "pt")
+  assert calls == {"download": 2, "extract": 2, "render": 3}
+
+def test_manifest_survives_corruption(tmp_path):
+  """A damaged manifest is ignored instead of failing the page."""
+  path = tmp_path / "page1.json"
+  path.write_text("{not json")
+
+  manifest = PageManifest(path)
+
+  assert manifest.stages == {}
+  assert manifest.current_output("download", {"url": "u"}, {}) is None
@@ -0,0 +1,112 @@
+import json
+import pstats
+import subprocess
+import sys
+from collections import Counter
+from comic_translator import traducao
+from comic_translator.metrics import MetricsRegistry, get_default_registry, timed
+from comic_translator.pipeline import PageJob, Stage, StagedPipeline
+from helpers import make_comic_translator
+
+def test_prometheus_export_has_histograms_and_labels():
+  """Durations land in cumulative buckets next to labelled counters and gauges."""
+  metrics = MetricsRegistry()
+  metrics.observe("comic_stage_duration_seconds", 0.02, stage="ocr")
+  metrics.observe("comic_stage_duration_seconds", 3.0, stage="ocr")
+  metrics.inc("comic_stage_total", stage="ocr", status="ok")
+  metrics.add_gauge("comic_pages_in_flight", 2)
+  metrics.add_collector(lambda: {"comic_translation_backend_calls_total": 7})
+
+  text = metrics.to_prometheus()
+
+  assert "# TYPE comic_stage_duration_seconds histogram" in text
+  assert 'comic_stage_duration_seconds_bucket{stage="ocr",le="0.025"} 1' in text
+  assert 'comic_stage_duration_seconds_bucket{stage="ocr",le="5.0"} 2' in text
+  assert 'comic_stage_duration_seconds_bucket{stage="ocr",le="+Inf"} 2' in text
+  assert 'comic_stage_duration_seconds_count{stage="ocr"} 2' in text
+  assert 'comic_stage_total{stage="ocr",status="ok"} 1' in text
+  assert "comic_pages_in_flight 2" in text
+  assert "comic_translation_backend_calls_total 7" in text
+
+def test_page_stages_are_traced_with_status(tmp_path, monkeypatch):
+  """Every stage writes a trace line, and resumed stages count as skipped."""
+  monkeypatch.chdir(tmp_path)
+  trace = tmp_path / "trace.jsonl"
+  calls = Counter()
+
+  first = make_comic_translator(tmp_path, calls, metrics=MetricsRegistry(trace_path=trace))
+  assert first.process_comic_page("url", "page1", "pt")
+  first.metrics.close()
+  second = make_comic_translator(tmp_path, calls)
+  assert second.process_comic_page("url", "page1", "pt")
+
+  events = [json.loads(line) for line in trace.read_text().splitlines()]
+  assert [event["stage"] for event in events] == ["download", "extract", "translate", "render"]
+  assert all(event["page"] == "page1" and event["status"] == "ok" for event in events)
+  assert events[0]["bytes"] > 0
+  assert events[1]["groups"] == 1
+  assert all(event["wall_s"] >= 0 and event["peak_rss_bytes"] > 0 for event in events)
+  assert second.metrics.value("comic_stage_total", stage="render", status="skipped") == 1
+
+def test_failed_stage_is_counted(tmp_path, monkeypatch):
+  """A stage returning nothing is recorded as failed, not as ok."""
+  monkeypatch.chdir(tmp_path)
+  translator = make_comic_translator(tmp_path, Counter(), fail_render=True)
+
+  assert not translator.process_comic_page("url", "page1", "pt")
+  assert translator.metrics.value("comic_stage_total", stage="render", status="failed") == 1
+  assert translator.metrics.value("comic_stage_total", stage="render", status="ok") == 0
+  assert "comic_translation_backend_calls_total 1" in translator.metrics.to_prometheus()
+
+def test_pipeline_reports_queue_depth():
+  """Queue depth gauges show where pages pile up between stages."""
+  metrics = MetricsRegistry()
+  pipeline = StagedPipeline(
+      [Stage("download", lambda job: True),
+       Stage("render", lambda job: setattr(job, "output_path", "out.jpg") or True)],
+      queue_size=2, metrics=metrics
+  )
+
+  jobs = pipeline.run(PageJob("url", f"page{i}") for i in range(5))
+
+  assert all(job.succeeded for job in jobs)
+  assert metrics.value("comic_queue_depth", stage="download") == 0
+  assert 1 <= metrics.value("comic_queue_depth_peak", stage="render") <= 2
+
+def test_timed_decorator_and_page_profiles(tmp_path, monkeypatch):
+  """Module functions can be timed, and pages can be profiled one file each."""
+  metrics = MetricsRegistry()
+
+  @timed("ocr", registry=metrics)
+  def extract(ok):
+      return [] if ok else None
+
+  extract(True)
+  extract(False)
+  assert metrics.value("comic_stage_total", stage="ocr", status="ok") == 1
+  assert metrics.value("comic_stage_total", stage="ocr", status="failed") == 1
+
+  monkeypatch.chdir(tmp_path)
+  # The script's extract_text reports failure as (None, None)
+  failures = get_default_registry().value("comic_stage_total", stage="extract", status="failed")
+  assert traducao.extract_text(str(tmp_path / "missing.png"), str(tmp_path / "text")) == (None, None)
+  assert get_default_registry().value("comic_stage_total", stage="extract", status="failed") == failures + 1
+
+  translator = make_comic_translator(tmp_path, Counter(), profile_dir=tmp_path / "profiles")
+  assert translator.process_comic_page("url", "page1", "pt")
+  stats = pstats.Stats(str(tmp_path / "profiles/page1.prof"))
+  assert any(name == "render" for _, _, name in stats.stats)
+
+def test_imports_and_spans_work_without_the_resource_module():
+  """On Windows there is no resource module; peak memory is just left out."""
+  statement = (
+      "import sys; sys.modules['resource'] = None; "
+      "import comic_translator.main, comic_translator.cli; "
+      "from comic_translator.metrics import MetricsRegistry; "
+      "metrics = MetricsRegistry(); span = metrics.span('ocr'); span.__enter__(); span.__exit__(None, None, None); "
+      "print(metrics.snapshot())"
+  )
+  result = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True)
+
+  assert result.returncode == 0, result.stderr
+  assert "comic_stage_total" in result.stdout and "comic_peak_rss_bytes" not in result.stdout
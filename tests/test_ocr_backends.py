@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+import pytest
+import torch
+from PIL import Image
+from torch import nn
+from comic_translator import text_extraction, traducao
+from comic_translator.benchmark import compare_ocr, synthetic_page, word_accuracy
+from comic_translator.ocr_backends import TORCH_INT8_MAX_VERSION
+from comic_translator.text_extraction import TextExtractor
+from helpers import FakePredictor
+
+class TinyPredictor(FakePredictor):
+  """A predictor shaped like doctr's, with real (tiny) torch models."""
+  def __init__(self, **kwargs):
+      super().__init__(**kwargs)
+      self.det_predictor = SimpleNamespace(model=nn.Sequential(nn.Conv2d(3, 4, 3), nn.Linear(4, 4)))
+      self.reco_predictor = SimpleNamespace(model=nn.Sequential(nn.LSTM(8, 8), nn.Linear(8, 4)))
+
+TORCH_INT8 = torch.__version__ < TORCH_INT8_MAX_VERSION
+
+@pytest.mark.skipif(not TORCH_INT8, reason="torch.ao.quantization is deprecated on this torch")
+def test_int8_inference_quantizes_linear_and_lstm_layers(monkeypatch, tmp_path):
+  """torch-int8 swaps the recognition layers for dynamic int8 versions."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", TinyPredictor)
+
+  plain = TextExtractor(det_arch="db_mobilenet_v3_large", reco_arch="crnn_mobilenet_v3_small")
+  quantized = TextExtractor(inference="torch-int8", det_arch="db_mobilenet_v3_large",
+                            reco_arch="crnn_mobilenet_v3_small")
+
+  lstm, linear = quantized.predictor.reco_predictor.model
+  assert type(lstm).__module__.startswith("torch.ao.nn.quantized.dynamic")
+  assert type(linear).__module__.startswith("torch.ao.nn.quantized.dynamic")
+  assert isinstance(quantized.predictor.det_predictor.model[0], nn.Conv2d)
+  assert quantized.predictor.kwargs["reco_arch"] == "crnn_mobilenet_v3_small"
+  # Quantized output may differ, so it is cached separately
+  assert "inference" not in plain.model_config
+  assert plain._cache_key(__file__) != quantized._cache_key(__file__)
+
+@pytest.mark.skipif(TORCH_INT8, reason="torch-int8 is supported on this torch")
+def test_int8_on_current_torch_points_to_onnx(monkeypatch, tmp_path):
+  """torch-int8 is refused up front on a torch that is dropping its quantization API."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", TinyPredictor)
+
+  with pytest.raises(RuntimeError, match="onnx-int8"):
+      TextExtractor(inference="torch-int8")
+
+def test_thread_counts_are_applied(monkeypatch, tmp_path):
+  """Intra-op threads are set before the model is built."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", FakePredictor)
+  threads = torch.get_num_threads()
+  try:
+      TextExtractor(intra_op_threads=3)
+      assert torch.get_num_threads() == 3
+  finally:
+      torch.set_num_threads(threads)
+
+def test_onnx_backend_needs_onnxtr(monkeypatch, tmp_path):
+  """Without onnxtr installed the onnx backend fails with an install hint."""
+  monkeypatch.chdir(tmp_path)
+  try:
+      import onnxtr  # noqa: F401
+      pytest.skip("onnxtr is installed")
+  except ImportError:
+      pass
+  with pytest.raises(ImportError, match="onnxtr"):
+      TextExtractor(inference="onnx")
+  with pytest.raises(ValueError):
+      TextExtractor(inference="tensorrt")
+
+def test_word_accuracy_needs_text_and_position():
+  """A word counts when it is read correctly where it is drawn."""
+  _, words = synthetic_page(600, 900, 3, seed=1)
+  moved = [dict(w, bbox=[[x, y + 0.5] for x, y in w["bbox"]]) for w in words]
+  misread = [dict(w, text="?" * len(w["text"])) if n == 0 else w for n, w in enumerate(words)]
+
+  assert word_accuracy(words, words) == 1.0
+  assert word_accuracy(moved, words) == 0.0
+  assert word_accuracy(misread, words) == pytest.approx(1 - 1 / len(words))
+  assert word_accuracy([], words) == 0.0
+
+def test_compare_ocr_reports_each_configuration(monkeypatch, tmp_path):
+  """Every configuration gets throughput and accuracy, or the reason it could not run."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", TinyPredictor)
+
+  results = compare_ocr(["torch", "torch:fast", "onnx-int8"], pages=1, small=1, workdir=tmp_path)["ocr"]
+
+  assert results["torch"]["speedup"] == 1.0
+  assert results["torch:fast"]["det_arch"] == "db_mobilenet_v3_large"
+  assert results["torch:fast"]["pages"] == 2
+  assert 0.0 <= results["torch:fast"]["word_accuracy"] <= 1.0
+  assert "throughput_pages_s" in results["torch"]
+  if "error" in results["onnx-int8"]:
+      assert "onnxtr" in results["onnx-int8"]["error"]
+
+def test_script_extraction_reuses_one_text_extractor(monkeypatch, tmp_path):
+  """The script's extract_text reads pages through a single, configurable TextExtractor."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", FakePredictor)
+  traducao._text_extractor.cache_clear()
+  Image.new("RGB", (200, 100), "white").save(tmp_path / "page.png")
+  try:
+      blocks, _ = traducao.extract_text(str(tmp_path / "page.png"), str(tmp_path / "text"))
+      traducao.extract_text(str(tmp_path / "page.png"), str(tmp_path / "text"))
+      extractor = traducao._text_extractor()
+  finally:
+      traducao._text_extractor.cache_clear()
+
+  assert [(block["text"], block["left"], block["width"]) for block in blocks] == [("w200", 20, 40)]
+  assert extractor.model_config["det_arch"] == "fast_base"
+  # The second page came from the OCR cache of the same extractor
+  assert extractor.predictor.calls == [1] and extractor.cache.hits == 1
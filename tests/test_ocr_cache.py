@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+from PIL import Image
+from comic_translator import text_extraction
+from comic_translator.text_extraction import TextExtractor
+from helpers import FakePredictor, fake_page
+
+def make_page(tmp_path, name="page1.png", width=40):
+  path = tmp_path / name
+  Image.new("RGB", (width, 30), "white").save(path)
+  return str(path)
+
+def test_same_image_is_not_ocred_twice(monkeypatch, tmp_path):
+  """A new extractor with the same models reuses the cached words."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", FakePredictor)
+  page = make_page(tmp_path)
+
+  first = TextExtractor()
+  fresh = first.extract_text(page)
+  second = TextExtractor()
+  cached = second.extract_text(page)
+
+  assert cached == fresh
+  assert first.predictor.calls == [1]
+  assert second.predictor.calls == []
+  assert second.cache.hits == 1
+
+def test_cache_is_keyed_by_bytes_and_models(monkeypatch, tmp_path):
+  """Identical bytes under a new name hit; a different model misses."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", FakePredictor)
+  TextExtractor().extract_text(make_page(tmp_path, "a.png"))
+
+  renamed = TextExtractor()
+  renamed.extract_text_batch([make_page(tmp_path, "b.png")])
+  other_model = TextExtractor(reco_arch="parseq")
+  other_model.extract_text(make_page(tmp_path, "a.png"))
+
+  assert renamed.predictor.calls == []
+  assert other_model.predictor.calls == [1]
+
+class PhrasePredictor(FakePredictor):
+  """Reads two words a short gap apart on the same line."""
+  def __call__(self, pages):
+      self.calls.append(len(pages))
+      return SimpleNamespace(pages=[
+          fake_page(("Hey", ((0.1, 0.1), (0.3, 0.2))), ("you!", ((0.35, 0.1), (0.5, 0.2)))) for _ in pages
+      ])
+
+def test_grouping_reruns_from_cached_words(monkeypatch, tmp_path):
+  """New merge thresholds change the groups without running OCR again."""
+  monkeypatch.chdir(tmp_path)
+  monkeypatch.setattr(text_extraction, "ocr_predictor", PhrasePredictor)
+  page = make_page(tmp_path)
+  first = TextExtractor().extract_text(page)
+
+  extractor = TextExtractor(merge_gap_x=0.0, merge_gap_y=0.0)
+  groups = extractor.extract_text(page)
+
+  assert extractor.predictor.calls == []
+  assert [group["text"] for group in first] == ["Hey you!"]
+  assert sorted(group["text"] for group in groups) == ["Hey", "you!"]
+  assert groups[0]["words"][0]["confidence"] == 0.9
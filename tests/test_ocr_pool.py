@@ -0,0 +1,57 @@
+import os
+from types import SimpleNamespace
+from PIL import Image
+from comic_translator.text_extraction import TextExtractor
+from helpers import fake_page
+
+class ProcessPredictor:
+  """Reads each page as one word naming its width, the worker pid and its torch threads."""
+  def __call__(self, pages):
+      import torch
+      return SimpleNamespace(pages=[
+          fake_page((f"{page.shape[1]}:{os.getpid()}:{torch.get_num_threads()}", ((0.1, 0.1), (0.9, 0.2))))
+          for page in pages
+      ])
+
+def save_pages(tmp_path, widths):
+  paths = []
+  for width in widths:
+      path = tmp_path / f"w{width}.png"
+      Image.new("RGB", (width, 80), "white").save(path)
+      paths.append(path)
+  return paths
+
+def test_pages_are_read_in_worker_processes_and_returned_in_order(tmp_path, monkeypatch):
+  """Every worker loads its own model with pinned threads; results keep the input order."""
+  monkeypatch.chdir(tmp_path)
+  paths = save_pages(tmp_path, [100 + n for n in range(6)])
+  extractor = TextExtractor(predictor=ProcessPredictor(), processes=2, intra_op_threads=1)
+  try:
+      assert extractor.concurrency == 2
+      results = extractor.extract_text_batch(paths)
+      again = extractor.extract_text(paths[0], save=False)
+  finally:
+      extractor.close()
+
+  read = [group.text.split(":") for groups in results for group in groups]
+  assert [int(width) for width, _, _ in read] == [100 + n for n in range(6)]
+  assert all(int(pid) != os.getpid() for _, pid, _ in read)
+  assert {threads for _, _, threads in read} == {"1"}
+  # Pages already read come from the parent's OCR cache
+  assert again[0].text == results[0][0].text
+  assert extractor.cache.hits == 1
+
+def test_a_failing_page_does_not_stop_the_others(tmp_path, monkeypatch):
+  """A page a worker cannot read comes back as None in its slot."""
+  monkeypatch.chdir(tmp_path)
+  paths = save_pages(tmp_path, [120, 130])
+  broken = tmp_path / "broken.png"
+  broken.write_bytes(b"not an image")
+  extractor = TextExtractor(use_cache=False, predictor=ProcessPredictor(), processes=2)
+  try:
+      results = extractor.extract_text_batch([paths[0], broken, paths[1]])
+  finally:
+      extractor.close()
+
+  assert results[1] is None
+  assert [groups[0].text.split(":")[0] for groups in (results[0], results[2])] == ["120", "130"]
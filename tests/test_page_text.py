@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from comic_translator.benchmark import PAGE_SIZES, synthetic_page
+from comic_translator.image_generator import ImageGenerator
+from comic_translator.page_text import PageText, export_json, load_page_text, main, save_page_text
+from comic_translator.records import to_dicts
+from comic_translator.text_extraction import TextExtractor
+from comic_translator.translation_backends import LocalBackend
+from comic_translator.translator import Translator
+from comic_translator.utils import load_json, save_json
+
+def strip_groups():
+  image, words = synthetic_page(*PAGE_SIZES["strip"], seed=5)
+  extractor = TextExtractor(use_cache=False, predictor=lambda pages: None)
+  return image, extractor.group_words(words, image.size)
+
+def assert_same_groups(loaded, groups, words_key="words"):
+  loaded, groups = to_dicts(loaded), to_dicts(groups)
+  assert len(loaded) == len(groups)
+  for got, expected in zip(loaded, groups):
+      assert set(got) == set(expected)
+      assert np.allclose(got["bbox"], expected["bbox"], atol=1e-6)
+      assert [w["text"] for w in got[words_key]] == [w["text"] for w in expected[words_key]]
+      assert [w["line_idx"] for w in got[words_key]] == [w["line_idx"] for w in expected[words_key]]
+      assert np.allclose([w["bbox"] for w in got[words_key]], [w["bbox"] for w in expected[words_key]], atol=1e-6)
+
+def test_npz_round_trip_is_smaller_than_json(tmp_path, monkeypatch):
+  """Columnar files load back to the same groups at a fraction of the JSON size."""
+  monkeypatch.chdir(tmp_path)
+  _, groups = strip_groups()
+
+  save_page_text(groups, tmp_path / "page_text.npz")
+  save_json(to_dicts(groups), tmp_path / "page_text.json")
+  loaded = load_page_text(tmp_path / "page_text.npz")
+
+  assert isinstance(loaded, PageText)
+  assert loaded.texts() == [group.text for group in groups]
+  assert_same_groups(loaded, groups)
+  assert loaded[-1].text == groups[-1].text
+  assert (tmp_path / "page_text.npz").stat().st_size < (tmp_path / "page_text.json").stat().st_size / 2
+  assert len(load_page_text(tmp_path / "page_text.json")) == len(groups)
+
+def test_empty_page_and_moved_boxes(tmp_path):
+  """Pages without text load as empty, and original boxes survive when they differ."""
+  save_page_text([], tmp_path / "empty.npz")
+  assert len(load_page_text(tmp_path / "empty.npz")) == 0
+
+  word = {"text": "Hé", "bbox": [[0.1, 0.2], [0.3, 0.4]], "line_idx": "0_0",
+          "original_bbox": [[0.0, 0.0], [0.5, 0.5]], "confidence": 0.5}
+  save_page_text([{"text": "Hé", "words": [word], "bbox": word["bbox"], "line_idx": "0_0"}], tmp_path / "one.npz")
+
+  loaded = load_page_text(tmp_path / "one.npz")[0].words[0]
+  assert loaded.text == "Hé"
+  assert loaded.original_bbox == [[0.0, 0.0], [0.5, 0.5]]
+  with pytest.raises(IndexError):
+      load_page_text(tmp_path / "one.npz")[1]
+
+def test_npz_pipeline_translates_and_renders(tmp_path, monkeypatch):
+  """The translator and renderer read npz files, and the JSON export matches them."""
+  monkeypatch.chdir(tmp_path)
+  image, groups = strip_groups()
+  image.save(tmp_path / "strip.png")
+  extractor = TextExtractor(use_cache=False, predictor=lambda pages: None, text_format="npz")
+  extracted_path = extractor.output_path(tmp_path / "strip.png")
+  save_page_text(groups, extracted_path)
+
+  translator = Translator(use_memory=False, backend=LocalBackend(), text_format="npz")
+  translated = translator.translate_text(extracted_path, "pt")
+  translated_path = translator.output_path(extracted_path)
+
+  assert translated_path.name == "strip_text_translated.npz"
+  assert [entry.translated_text for entry in load_page_text(translated_path)] == \
+         [entry.translated_text for entry in translated]
+  assert ImageGenerator().generate_translated_image(tmp_path / "strip.png", translated_path)
+
+  assert main([str(translated_path)]) == 0
+  exported = load_json(export_json(translated_path))
+  assert_same_groups(exported, translated, words_key="original_words")
@@ -0,0 +1,102 @@
+import threading
+import time
+from comic_translator.main import ComicTranslator
+from comic_translator.pipeline import PageJob, Stage, StagedPipeline
+from comic_translator.records import TextGroup
+
+def test_pipeline_preserves_order_and_reports_failures():
+  """Jobs come back in input order and a failing stage is recorded."""
+  seen = []
+
+  def fail_odd(job):
+      return int(job.page_name[4:]) % 2 == 0
+
+  def finish(job):
+      seen.append(job.page_name)
+      job.output_path = f"{job.page_name}.jpg"
+      return job.output_path
+
+  pipeline = StagedPipeline([
+      Stage("check", fail_odd, workers=3),
+      Stage("finish", finish, workers=2),
+  ], queue_size=1)
+  jobs = pipeline.run(PageJob("url", f"page{i}") for i in range(10))
+
+  assert [job.page_name for job in jobs] == [f"page{i}" for i in range(10)]
+  assert [job.succeeded for job in jobs] == [i % 2 == 0 for i in range(10)]
+  assert all(job.failed_stage == "check" for job in jobs[1::2])
+  assert sorted(seen) == sorted(f"page{i}" for i in range(0, 10, 2))
+
+def test_pipeline_overlaps_stages():
+  """Total time tracks the slowest stage, not the sum of all stages."""
+  def slow(job):
+      time.sleep(0.05)
+      job.output_path = "done"
+      return True
+
+  pipeline = StagedPipeline([Stage(name, slow) for name in ("a", "b", "c", "d")])
+  start = time.perf_counter()
+  jobs = pipeline.run(PageJob("url", f"page{i}") for i in range(8))
+  elapsed = time.perf_counter() - start
+
+  assert all(job.succeeded for job in jobs)
+  # Sequential execution would take 8 * 4 * 0.05 = 1.6s
+  assert elapsed < 1.0
+
+def test_handler_factory_runs_once_per_worker():
+  """Each worker thread gets its own handler instance."""
+  owners = set()
+
+  def factory():
+      owner = threading.get_ident()
+      owners.add(owner)
+      def handler(job):
+          job.output_path = owner
+          return True
+      return handler
+
+  jobs = StagedPipeline([Stage("render", workers=3, handler_factory=factory)]).run(
+      PageJob("url", f"page{i}") for i in range(6)
+  )
+  assert len(owners) == 3
+  assert {job.output_path for job in jobs} <= owners
+
+def test_process_chapter_reports_per_page_results(tmp_path, monkeypatch):
+  """process_chapter returns the same boolean per page as process_comic_page."""
+  monkeypatch.chdir(tmp_path)
+
+  class FakeDownloader:
+      def download_comic_page(self, url, page_name):
+          return None if url == "bad" else f"{page_name}.jpg"
+
+  class FakeExtractor:
+      concurrency = 1
+
+      def close(self):
+          pass
+
+      def extract_text(self, image_path, save=True):
+          return [TextGroup("hi", [], (0.0, 0.0, 1.0, 1.0))]
+
+      def output_path(self, image_path):
+          return f"{image_path}.json"
+
+  class FakeTranslator:
+      def translate_groups(self, groups, target_lang, output_path=None):
+          return [{"translated_text": target_lang}]
+
+      def output_path(self, path):
+          return f"{path}.translated"
+
+  class FakeGenerator:
+      def render(self, image_path, translated_data):
+          return "out.jpg"
+
+  translator = ComicTranslator(
+      manifest_dir=None, downloader=FakeDownloader(), extractor=FakeExtractor(), translator=FakeTranslator(),
+      generator=FakeGenerator()
+  )
+
+  results = translator.process_chapter(["ok", "bad", "ok"], ["p1", "p2", "p3"], target_lang="pt")
+
+  assert results == {"p1": True, "p2": False, "p3": True}
@@ -0,0 +1,53 @@
+import tracemalloc
+from collections import Counter
+from comic_translator.benchmark import PAGE_SIZES, synthetic_page
+from comic_translator.page_text import load_page_text, save_page_text
+from comic_translator.records import TextGroup, TranslatedGroup, Word, as_group
+from helpers import make_comic_translator
+
+def test_records_round_trip_through_json(tmp_path):
+  """Records convert to the JSON layout and back, and keep key access."""
+  _, words = synthetic_page(*PAGE_SIZES["small"], seed=2)
+  word = Word.from_dict(words[0])
+  group = TextGroup(word.text, [word], word.box, word.line_idx)
+  translated = TranslatedGroup(group.text, "olá", group.box, group.words)
+
+  assert word.to_dict() == words[0]
+  assert word.original_box is None
+  assert as_group(group.to_dict()) == group
+  assert as_group(translated.to_dict()) == translated
+  assert translated["original_words"][0]["bbox"] == words[0]["bbox"]
+
+  save_page_text([translated], tmp_path / "page.json")
+  assert load_page_text(tmp_path / "page.json") == [translated]
+
+def test_words_use_less_memory_than_dicts():
+  """A slotted word costs well under half the memory of its dict form."""
+  _, words = synthetic_page(*PAGE_SIZES["strip"], seed=4)
+  words = words * 20
+
+  def allocated(build):
+      tracemalloc.start()
+      kept = build()
+      size = tracemalloc.get_traced_memory()[0]
+      tracemalloc.stop()
+      assert len(kept) == len(words)
+      return size
+
+  as_dicts = allocated(lambda: [Word.from_dict(w).to_dict() for w in words])
+  as_records = allocated(lambda: [Word.from_dict(w) for w in words])
+  assert as_records < as_dicts / 2
+
+def test_pages_run_without_text_files(tmp_path, monkeypatch):
+  """Text stays in memory from OCR to rendering when text files are turned off."""
+  monkeypatch.chdir(tmp_path)
+  calls = Counter()
+  translator = make_comic_translator(tmp_path, calls, save_text=False)
+
+  assert translator.process_comic_page("url", "page1", "pt")
+
+  assert list(tmp_path.glob("data/*_text/*")) == []
+  assert (tmp_path / "data/output/page1_translated.jpg").read_text() == "[pt] Hello"
+  # Only the download has a file to resume from
+  assert make_comic_translator(tmp_path, calls).process_comic_page("url", "page1", "pt")
+  assert calls == {"download": 1, "extract": 2, "render": 2}
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from pathlib import Path
+import pytest
+from comic_translator.fetch import AsyncHttpFetcher, HttpFetcher
+from comic_translator.scheduler import FAILED, OK, THROTTLED, HostLimiter, RequestScheduler
+from comic_translator.translation_backends import GoogleBackend
+
+def add_images(site, count, delay=0.0):
+  return [site.add(f"/img/{n}.png", f"image {n}".encode(), "image/png", delay=delay) for n in range(count)]
+
+def test_concurrency_backs_off_to_what_the_host_tolerates(site, tmp_path):
+  """A host that rejects parallel requests still gets every page, and the limit drops to match."""
+  site.throttle(max_active=3)
+  urls = add_images(site, 30, delay=0.05)
+  fetcher = HttpFetcher(per_host_limit=12, scheduler=RequestScheduler(max_concurrency=12, backoff_base=0.05))
+
+  paths = fetcher.fetch_many([(url, tmp_path / f"{n}.png") for n, url in enumerate(urls)], workers=12)
+
+  assert [Path(p).read_bytes() for p in paths] == [f"image {n}".encode() for n in range(30)]
+  state = fetcher.scheduler.state()[f"{site.host}:{site.port}"]
+  assert site.throttled > 0 and state["throttled"] == site.throttled
+  assert state["retries"] >= site.throttled - state["errors"]
+  assert state["concurrency_limit"] < 12
+  assert state["in_flight"] == 0
+
+def test_rate_limit_and_retry_after_are_honoured(site, tmp_path):
+  """After a 429 the host is paused for Retry-After and requests are paced by a token bucket."""
+  site.throttle(rate=4, retry_after=1)
+  urls = add_images(site, 8)
+  fetcher = HttpFetcher(scheduler=RequestScheduler(backoff_base=0.05))
+
+  start = time.perf_counter()
+  statuses = [fetcher.get(url).status_code for url in urls]
+  elapsed = time.perf_counter() - start
+
+  assert statuses == [200] * 8
+  assert elapsed >= 1.0
+  state = fetcher.scheduler.state()[f"{site.host}:{site.port}"]
+  assert state["throttled"] >= 1 and state["rate_limit"] is not None
+
+def test_interrupted_download_resumes_with_a_range_request(site, tmp_path):
+  """Only the missing tail is fetched again after the connection drops."""
+  body = bytes(range(256)) * 2048
+  url = site.add("/big.png", body, "image/png", headers={"ETag": '"v1"'}, cut=200_000)
+  fetcher = HttpFetcher(scheduler=RequestScheduler(backoff_base=0.01))
+
+  path = fetcher.fetch_to_file(url, tmp_path / "big.png")
+
+  assert Path(path).read_bytes() == body
+  assert len(site.ranges) == 1 and 0 < site.ranges[0][1] <= 200_000
+  assert list(tmp_path.glob(".*.part")) == []
+  assert fetcher.scheduler.state()[f"{site.host}:{site.port}"]["errors"] == 1
+
+def test_async_fetches_share_the_adaptive_limits(site, tmp_path):
+  """The aiohttp fetcher is throttled and retried by the same scheduler."""
+  site.throttle(max_active=2)
+  urls = add_images(site, 12, delay=0.05)
+  scheduler = RequestScheduler(max_concurrency=8, backoff_base=0.05)
+  fetcher = AsyncHttpFetcher(per_host_limit=8, scheduler=scheduler)
+
+  async def run():
+      try:
+          return await asyncio.gather(*(
+              fetcher.fetch_to_file(url, tmp_path / f"{n}.png") for n, url in enumerate(urls)
+          ))
+      finally:
+          await fetcher.close()
+
+  paths = asyncio.run(run())
+
+  assert [Path(p).read_bytes() for p in paths] == [f"image {n}".encode() for n in range(12)]
+  assert scheduler.state()[f"{site.host}:{site.port}"]["concurrency_limit"] < 8
+
+def test_aimd_limits():
+  """Successes add about one slot per round trip; a burst of throttling halves the limit once."""
+  limiter = HostLimiter("example.com", max_concurrency=16)
+  limiter.limit = 4.0
+  for _ in range(4):
+      limiter.acquire()
+      limiter.release(OK, 0.01)
+  assert 4.9 < limiter.limit < 5.0
+
+  # Three requests in flight are all rejected at about the same time
+  for _ in range(3):
+      limiter.acquire()
+  for _ in range(3):
+      limiter.release(THROTTLED, 0.01, wait=0.2)
+  assert 2.4 < limiter.limit < 2.6
+  assert limiter.rate is not None and limiter.state()["paused_s"] > 0.1
+
+  limiter.acquire()
+  limiter.release(FAILED, 0.01)
+  assert limiter.errors == 1 and limiter.throttled == 3
+
+def test_translation_requests_are_retried_when_throttled(monkeypatch):
+  """A rate-limited translation call is retried instead of failing the page."""
+  class TooManyRequests(Exception):
+      pass
+
+  class FlakyTranslator:
+      calls = 0
+
+      def translate(self, text):
+          FlakyTranslator.calls += 1
+          if FlakyTranslator.calls == 1:
+              raise TooManyRequests("slow down")
+          return f"pt:{text}"
+
+  backend = GoogleBackend(scheduler=RequestScheduler(backoff_base=0.01, min_rate=20))
+  monkeypatch.setattr(backend, "_translator", lambda target, source: FlakyTranslator())
+
+  assert backend.translate_many(["Hey!"], "pt") == ["pt:Hey!"]
+  state = backend.scheduler.state()["translate.google.com"]
+  assert state["throttled"] == 1 and state["retries"] == 1
+
+def test_waiting_coroutines_sleep_until_a_slot_is_released():
+  """Coroutines queued behind a full host are woken by releases instead of polling."""
+  limiter = HostLimiter("example.com", max_concurrency=2)
+  limiter.acquire()
+  limiter.acquire()
+  checks = 0
+  wait_time = limiter._wait_time
+
+  def counted(now):
+      nonlocal checks
+      checks += 1
+      return wait_time(now)
+
+  limiter._wait_time = counted
+
+  async def request(n):
+      await limiter.acquire_async()
+      await asyncio.sleep(0.05)
+      limiter.release(OK, 0.05)
+      return n
+
+  async def run():
+      tasks = [asyncio.ensure_future(request(n)) for n in range(40)]
+      await asyncio.sleep(0.3)
+      idle_checks = checks
+      # Slots are freed from another thread, as a sync fetcher would
+      await asyncio.to_thread(limiter.release, OK, 0.05)
+      await asyncio.to_thread(limiter.release, OK, 0.05)
+      return idle_checks, await asyncio.gather(*tasks)
+
+  idle_checks, done = asyncio.run(run())
+
+  assert idle_checks == 40
+  assert done == list(range(40))
+  assert limiter.in_flight == 0
+
+def test_request_errors_are_not_retried_or_held_against_the_host():
+  """A malformed URL fails at once and leaves the host's limits alone."""
+  import requests
+
+  scheduler = RequestScheduler(backoff_base=0.5)
+
+  with pytest.raises(requests.exceptions.MissingSchema):
+      scheduler.call("bad-url", lambda: requests.get("bad-url"))
+
+  state = scheduler.state()["bad-url"]
+  assert state["retries"] == 0 and state["errors"] == 0
+  assert state["concurrency_limit"] == scheduler.max_concurrency and state["in_flight"] == 0
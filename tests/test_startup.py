@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = {"selenium", "webdriver_manager", "doctr", "torch", "torchvision", "cv2",
+                 "tensorflow", "sklearn", "deep_translator", "aiohttp"}
+
+# Cumulative import time allowed for the CLI entry points, in seconds
+STARTUP_BUDGET = 0.75
+
+def import_times(statement):
+  """Run `statement` under -X importtime and return {module: cumulative seconds}"""
+  result = subprocess.run(
+      [sys.executable, "-X", "importtime", "-c", statement],
+      capture_output=True, text=True, check=True
+  )
+  times = {}
+  for line in result.stderr.splitlines():
+      if not line.startswith("import time:") or "|" not in line:
+          continue
+      _, cumulative, name = line.split("|")
+      if cumulative.strip().isdigit():
+          times[name.strip()] = int(cumulative) / 1e6
+  return times
+
+def loaded_modules(statement):
+  """Run `statement` in a fresh interpreter and return the modules it loaded"""
+  result = subprocess.run(
+      [sys.executable, "-c", f"{statement}; import sys; print(' '.join(sys.modules))"],
+      capture_output=True, text=True, check=True
+  )
+  return set(result.stdout.split())
+
+def test_cli_startup_skips_heavy_backends():
+  """Importing the package, CLI and orchestrator loads no OCR, browser or OpenCV code."""
+  statement = "import comic_translator, comic_translator.cli, comic_translator.main"
+  times = import_times(statement)
+
+  loaded = {name.split(".")[0] for name in loaded_modules(statement)}
+  assert loaded.isdisjoint(HEAVY_MODULES), loaded & HEAVY_MODULES
+  assert times["comic_translator.main"] < STARTUP_BUDGET
+
+def test_public_classes_load_on_first_access():
+  """Package attributes still resolve, importing their module only when used."""
+  modules = loaded_modules("import comic_translator; comic_translator.Translator")
+
+  assert "comic_translator.translator" in modules
+  assert "comic_translator.downloader" not in modules
+  assert "comic_translator.text_extraction" not in modules
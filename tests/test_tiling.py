@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from comic_translator.benchmark import PAGE_SIZES, synthetic_page
+from comic_translator.records import Word
+from comic_translator.text_extraction import TextExtractor
+from comic_translator.tiling import merge_tiles, tile_spans
+from helpers import fake_page
+
+class StripPredictor:
+  """Reads the known words of a strip that fall inside each tile it is given."""
+  def __init__(self, words, spans, height):
+      self.words = words
+      self.spans = iter(spans)
+      self.height = height
+      self.batches = []
+      self.tile_heights = []
+
+  def __call__(self, tiles):
+      self.batches.append(len(tiles))
+      pages = []
+      for tile in tiles:
+          self.tile_heights.append(tile.shape[0])
+          top, bottom = next(self.spans)
+          found = []
+          for word in self.words:
+              (x1, y1), (x2, y2) = word["bbox"]
+              y1, y2 = y1 * self.height, y2 * self.height
+              visible = min(y2, bottom) - max(y1, top)
+              # Words cut by the tile edge are still detected, with a clipped box
+              if visible > 0.3 * (y2 - y1):
+                  y1, y2 = max(y1, top), min(y2, bottom)
+                  found.append((word["text"], ((x1, (y1 - top) / (bottom - top)), (x2, (y2 - top) / (bottom - top)))))
+          pages.append(fake_page(*found))
+      return SimpleNamespace(pages=pages)
+
+def test_tile_spans_cover_the_page_with_overlap():
+  """Tiles start at the top, end at the bottom and overlap by the requested rows."""
+  spans = tile_spans(6000, 1024, 256)
+
+  assert spans[0] == (0, 1024) and spans[-1] == (4976, 6000)
+  assert all(bottom - top == 1024 for top, bottom in spans)
+  assert all(prev[1] - nxt[0] >= 256 for prev, nxt in zip(spans, spans[1:]))
+  assert tile_spans(900, 1024, 256) == [(0, 900)]
+
+def test_tiled_strip_reads_every_word_once(tmp_path, monkeypatch):
+  """Words come back once each, in page coordinates, from bounded tiles."""
+  monkeypatch.chdir(tmp_path)
+  width, height, bubbles = PAGE_SIZES["strip"]
+  image, words = synthetic_page(width, height, bubbles, seed=7)
+  image.save(tmp_path / "strip.png")
+  spans = tile_spans(height, 1024, 256)
+  predictor = StripPredictor(words, spans, height)
+  extractor = TextExtractor(use_cache=False, predictor=predictor, tile_height=1024, pages_per_batch=3)
+
+  found = extractor.extract_words(tmp_path / "strip.png")
+
+  assert max(predictor.tile_heights) == 1024
+  assert max(predictor.batches) <= 3 and sum(predictor.batches) == len(spans)
+  assert sorted(w.text for w in found) == sorted(w["text"] for w in words)
+  truth = {(w["text"], round(w["bbox"][0][0], 6), round(w["bbox"][0][1], 6)) for w in words}
+  assert {(w.text, round(w.box[0], 6), round(w.box[1], 6)) for w in found} == truth
+  assert extractor.params()["model"]["tiling"] == {"tile_height": 1024, "overlap": 256}
+
+def test_duplicates_across_a_seam_are_dropped():
+  """A word seen on both sides of a seam is kept once, from the surer tile."""
+  spans = [(0, 100), (80, 180)]
+  above = [Word("hello", (0.1, 0.43, 0.3, 0.46), confidence=0.6)]
+  below = [Word("hello", (0.1, 0.44, 0.3, 0.47), confidence=0.9), Word("there", (0.4, 0.8, 0.6, 0.9))]
+
+  merged = merge_tiles([above, below], spans, 200)
+
+  assert [(w.text, w.confidence) for w in merged] == [("hello", 0.9), ("there", 1.0)]
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from comic_translator.translation_backends import GoogleBackend, LocalBackend, get_backend, pack_batches, split_text
+
+class FakeGoogleTranslator:
+  """Mimics deep_translator: translates line by line, optionally merging two lines."""
+  def __init__(self, merge_lines=False):
+      self.merge_lines = merge_lines
+
+  def translate(self, text):
+      lines = [f"<{line}>" for line in text.split("\n")]
+      if self.merge_lines and len(lines) > 1:
+          lines[:2] = [lines[0] + " " + lines[1]]
+      return "\n".join(lines)
+
+class LimitedGoogleTranslator(FakeGoogleTranslator):
+  """Rejects requests longer than the service limit, like the real API."""
+  def __init__(self, max_chars):
+      super().__init__()
+      self.max_chars = max_chars
+
+  def translate(self, text):
+      if len(text) > self.max_chars:
+          raise ValueError(f"text longer than {self.max_chars} characters")
+      return super().translate(text)
+
+def test_pack_batches_respects_limits():
+  """Batches stay within the character and item limits and keep order."""
+  texts = [f"text {n:02d}" for n in range(25)]  # 7 chars each
+
+  batches = pack_batches(texts, max_chars=40, max_size=10)
+
+  assert [text for batch in batches for text in batch] == texts
+  assert all(len("\n".join(batch)) <= 40 for batch in batches)
+  assert max(len(batch) for batch in pack_batches(texts, max_chars=10_000, max_size=10)) == 10
+
+def test_split_text_prefers_sentence_then_word_boundaries():
+  """Over-long texts are cut at sentence ends, then at spaces, and only then mid-word."""
+  assert split_text("Hello there. How are you? Fine.", 20) == ["Hello there.", "How are you? Fine."]
+  assert split_text("one two three four", 9) == ["one two", "three", "four"]
+  assert split_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+  assert split_text("short", 10) == ["short"]
+
+def test_text_longer_than_a_request_is_sent_in_pieces(monkeypatch):
+  """A bubble over the request limit is split, translated in pieces and joined again."""
+  backend = GoogleBackend()
+  backend.max_batch_chars = 30
+  monkeypatch.setattr(backend, "_translator", lambda target, source: LimitedGoogleTranslator(30))
+  long_text = "This is a long sentence. " * 4
+
+  result = backend.translate_many(["short", long_text.strip(), "end"], "pt")
+
+  assert result[0] == "<short>" and result[2] == "<end>"
+  assert result[1] == " ".join(["<This is a long sentence.>"] * 4)
+
+def test_async_translation_splits_long_texts_too():
+  """translate_many_async sends over-long texts in pieces as well."""
+  backend = LocalBackend()
+  backend.max_batch_chars = 10
+
+  result = asyncio.run(backend.translate_many_async(["one two three four", "hi"], "es"))
+
+  assert result == ["[es] one two [es] three four", "[es] hi"]
+
+def test_page_of_bubbles_costs_few_round_trips():
+  """Forty bubbles are packed into a handful of requests."""
+  backend = get_backend("local")
+
+  result = backend.translate_many([f"bubble {n}" for n in range(40)], "pt")
+
+  assert result[7] == "[pt] bubble 7"
+  assert backend.requests == 1
+
+def test_batches_run_concurrently():
+  """Independent batches overlap instead of queueing behind each other."""
+  backend = LocalBackend(max_concurrency=4, latency=0.1)
+  backend.max_batch_size = 5
+
+  start = time.perf_counter()
+  result = backend.translate_many([f"bubble {n}" for n in range(20)], "es")
+  elapsed = time.perf_counter() - start
+
+  assert result == [f"[es] bubble {n}" for n in range(20)]
+  assert backend.requests == 4
+  assert elapsed < 0.3
+
+def test_google_backend_packs_and_splits(monkeypatch):
+  """Packed requests split back per text, falling back when lines merge."""
+  backend = GoogleBackend()
+  monkeypatch.setattr(backend, "_translator", lambda target, source: FakeGoogleTranslator())
+
+  assert backend.translate_many(["a", "b", "c"], "pt") == ["<a>", "<b>", "<c>"]
+  assert backend.requests == 1
+
+  backend = GoogleBackend()
+  monkeypatch.setattr(backend, "_translator", lambda target, source: FakeGoogleTranslator(merge_lines=True))
+
+  assert backend.translate_many(["a", "b", "c"], "pt") == ["<a>", "<b>", "<c>"]
+  assert backend.requests == 4
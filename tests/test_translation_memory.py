@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+from comic_translator.translation_memory import TranslationMemory
+from helpers import make_translator
+
+def test_repeated_strings_are_translated_once(tmp_path, monkeypatch):
+  """Duplicates within a page and across runs never reach the backend twice."""
+  monkeypatch.chdir(tmp_path)
+  db = tmp_path / "tm.sqlite3"
+  translator = make_translator(memory=TranslationMemory(db))
+
+  result = translator.translate_texts(["Hey!", "...", "Hey!", "  Hey! ", "", "Kaito"], "pt")
+
+  assert result == ["pt:HEY!", "pt:...", "pt:HEY!", "pt:HEY!", "", "pt:KAITO"]
+  assert sorted(translator.calls) == ["...", "Hey!", "Kaito"]
+
+  again = make_translator(memory=TranslationMemory(db))
+  assert again.translate_texts(["Kaito", "..."], "pt") == ["pt:KAITO", "pt:..."]
+  assert again.calls == []
+  assert again.stats()["memory_hits"] == 2
+
+def test_memory_is_keyed_by_language_pair(tmp_path, monkeypatch):
+  """Another target language or backend is a miss."""
+  monkeypatch.chdir(tmp_path)
+  memory = TranslationMemory(tmp_path / "tm.sqlite3")
+  memory.put_many({"Hey!": "Ei!"}, "auto", "pt", "google")
+
+  assert memory.get_many(["Hey!"], "auto", "pt", "google") == {"Hey!": "Ei!"}
+  assert memory.get_many(["Hey!"], "auto", "es", "google") == {}
+  assert memory.get_many(["Hey!"], "auto", "pt", "local") == {}
+  assert memory.stats() == {"hits": 1, "misses": 2, "entries": 1}
+
+def test_concurrent_pages_share_inflight_translations(tmp_path, monkeypatch):
+  """Workers translating pages at the same time wait for each other's results."""
+  monkeypatch.chdir(tmp_path)
+  translator = make_translator(memory=TranslationMemory(tmp_path / "tm.sqlite3"), delay=0.05)
+  pages = [["Hey!", "Kaito", f"line {n}"] for n in range(8)]
+
+  with ThreadPoolExecutor(max_workers=8) as executor:
+      results = list(executor.map(lambda texts: translator.translate_texts(texts, "pt"), pages))
+
+  assert results[3] == ["pt:HEY!", "pt:KAITO", "pt:LINE 3"]
+  assert translator.calls.count("Hey!") == 1
+  assert translator.calls.count("Kaito") == 1
+  assert len(translator.calls) == 10
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time
+import pytest
+import requests
+from comic_translator.cli import main
+from comic_translator.worker import WorkerServer, submit_job
+from helpers import IMAGE, make_site_translator
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+  monkeypatch.chdir(tmp_path)
+  (tmp_path / "data/extracted_text").mkdir(parents=True)
+  with WorkerServer(translator=make_site_translator(tmp_path), port=0) as worker:
+      yield worker
+
+def test_worker_serves_jobs_from_warm_components(site, worker):
+  """Concurrent clients share one translator and get per-page results."""
+  urls = [site.add_reader_page(IMAGE, page=n, mode="payload") for n in range(1, 7)]
+
+  with ThreadPoolExecutor(max_workers=3) as executor:
+      results = list(executor.map(
+          lambda n: submit_job(worker.url(), urls[n:n + 2], [f"c{n}p1", f"c{n}p2"], "pt"), range(0, 6, 2)
+      ))
+
+  assert all(page["ok"] and page["output"] == "out.jpg" for pages in results for page in pages.values())
+  assert [list(pages) for pages in results] == [["c0p1", "c0p2"], ["c2p1", "c2p2"], ["c4p1", "c4p2"]]
+  assert worker.translator.extractor.threads == {"comic-ocr_0"}
+
+  health = requests.get(worker.url("/health")).json()
+  assert health["jobs_completed"] == 3
+  assert health["pages_completed"] == 6
+
+def test_worker_reports_failures_and_bad_requests(site, worker):
+  """Failed pages name their stage and malformed jobs are rejected."""
+  pages = submit_job(worker.url(), [site.url("/missing-page-1.html")], ["lost"])
+
+  assert pages == {"lost": {"ok": False, "output": None, "failed_stage": "download"}}
+  with pytest.raises(RuntimeError, match="400"):
+      submit_job(worker.url(), ["a", "b"], ["only-one-name"])
+
+def test_jobs_never_share_page_files(site, worker, tmp_path):
+  """Unnamed jobs get their own names, a name in use is refused and names cannot leave the data dirs."""
+  url = site.add_reader_page(IMAGE, page=1, mode="payload")
+  site.routes[url[len(site.url("")):]]["delay"] = 0.5
+
+  with ThreadPoolExecutor(max_workers=2) as executor:
+      unnamed = list(executor.map(lambda _: submit_job(worker.url(), [url]), range(2)))
+      named = executor.submit(submit_job, worker.url(), [url], ["shared"])
+      while "shared" not in worker._names_in_flight:
+          time.sleep(0.01)
+      with pytest.raises(RuntimeError, match="409"):
+          submit_job(worker.url(), [url], ["shared"])
+      assert named.result()["shared"]["ok"]
+
+  first, second = (list(pages)[0] for pages in unnamed)
+  assert first != second
+  assert (tmp_path / f"data/downloads/{first}.jpg").exists() and (tmp_path / f"data/downloads/{second}.jpg").exists()
+  for name in ("../escape", "sub/page", "..", ""):
+      with pytest.raises(RuntimeError, match="400"):
+          submit_job(worker.url(), [url], [name])
+
+def test_cli_submits_to_worker(site, worker, capsys):
+  """The thin client prints the worker's answer and exits with its status."""
+  url = site.add_reader_page(IMAGE, page=1, mode="static")
+
+  assert main(["--submit", worker.url(), url, "--names", "cli1"]) == 0
+  assert json.loads(capsys.readouterr().out)["cli1"]["ok"] is True